@@ -0,0 +1,526 @@
+"""
+Benchmark and scaling-regression suite for the DOCX generators.
+Run: python bench_generators.py [--json results.json] [--baseline previous.json] [--quick]
+
+Times (best of --repeat) and memory-profiles (tracemalloc peak of the Python
+heap in a separate run; lxml's own C allocations are not seen) every styling
+helper, every build_* section of both generators, their full main() and
+their HTML / Markdown exports, then runs synthetic scale tests: styled
+tables of 10 to 100k cells and documents of 10 to 1,000 sections, the latter
+also through streaming_docx with its peak RSS measured in a fresh process,
+and read back to Markdown by docx_reader the same way; a redline of such a
+document against a revision rewording one section in ten is timed too.
+The rendering service (docx_render/service.py) is driven by concurrent
+keep-alive clients, once with distinct cover fields per request (every
+request rendered by a worker) and once repeating them (cache hits), and
+its p50 / p99 latency and requests per second are reported.
+A power law t = a * n^k is fitted to each scale series; the run fails
+(exit 1) when k, or the slope between the two largest sizes, exceeds
+--max-exponent, i.e. when a path drifts from linear toward quadratic, or
+when streaming memory grows faster than n^--max-memory-exponent. Start-up is measured with python -X importtime:
+the generators' --list and --help must stay on the fast path (fail when
+python-docx or lxml gets imported there); a full import is timed for scale.
+--baseline compares against an earlier --json file and fails on entries more
+than --max-slowdown times slower.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+import docx
+
+import docx_render
+import generate_docx
+import generate_qa_docx
+from docx_render import StreamingDocument, build_footer, new_document
+from docx_render.merge import replace_parts
+from docx_render.redline import DOCUMENT_PART, redline_package
+from docx_render.service import RenderService, build_templates
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+TABLE_CELLS = [10, 1_000, 10_000, 100_000]
+DOCUMENT_SECTIONS = [10, 100, 1_000]
+SERVICE_REQUESTS, SERVICE_CONCURRENCY = 1_000, 32
+# name: (python arguments, fast path: must not import FAST_PATH_FORBIDDEN)
+STARTUP_COMMANDS = {
+    "generate_docx.py --list": (["generate_docx.py", "--list"], True),
+    "generate_docx.py --help": (["generate_docx.py", "--help"], True),
+    "generate_qa_docx.py --list": (["generate_qa_docx.py", "--list"], True),
+    "import generate_docx": (["-c", "import generate_docx"], False),
+}
+FAST_PATH_FORBIDDEN = ("docx", "lxml")
+CODE_SAMPLE = "\n".join(f"    step_{i} = run(step_{i - 1})  # stage {i}" for i in range(1, 21))
+
+
+# ── Measurement ──
+
+def measure(fn, repeat=3, setup=None):
+    """Best wall time of fn(setup()) over repeat runs, and its tracemalloc peak."""
+    best = math.inf
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+
+    arg = setup() if setup else None
+    tracemalloc.start()
+    try:
+        fn(arg)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "peak_kb": round(peak / 1024, 1)}
+
+
+def fit_power_law(points):
+    """Least-squares fit of log t = log a + k log n; returns k."""
+    xs = [math.log(n) for n, _ in points]
+    ys = [math.log(max(t, 1e-9)) for _, t in points]
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    var = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / var if var else 0.0
+
+
+def tail_exponent(points):
+    """Slope of the log-log curve between the two largest sizes."""
+    (n1, t1), (n2, t2) = points[-2:]
+    return math.log(max(t2, 1e-9) / max(t1, 1e-9)) / math.log(n2 / n1)
+
+
+# ── Helpers ──
+
+def table_rows(n_rows, n_cols=4):
+    return [[f"r{r}c{c}" if c else f"**row {r}**" for c in range(n_cols)] for r in range(n_rows)]
+
+
+def table_columns(n_rows):
+    """{header: column} source with a number and a status column to format."""
+    return {"#": list(range(n_rows)), "Amount": [r * 1000.5 for r in range(n_rows)],
+            "Status": ["done" if r % 3 else "todo" for r in range(n_rows)], "Note": [f"note {r}" for r in range(n_rows)]}
+
+
+TABLE_FORMATS = {"Amount": ",.1f", "Status": {"done": "✅ Complete", "todo": "🔴 TODO"}}
+
+
+def raw_cells(n_cells=100):
+    """Cells of an undecorated table, collected once (for set_cell_borders)."""
+    table = new_document().add_table(rows=n_cells // 4, cols=4)
+    return [cell for row in table.rows for cell in row.cells]
+
+
+def helper_benchmarks(repeat):
+    """Per-call cost of each docx_render styling helper, each call on a fresh document."""
+    gd = docx_render
+    cases = {
+        "add_styled_table (20x4)": (lambda doc: gd.add_styled_table(doc, ["A", "B", "C", "D"], table_rows(20)),
+                                    new_document),
+        "add_styled_table (200x4, columns + formats)": (
+            lambda doc: gd.add_styled_table(doc, None, table_columns(200), formats=TABLE_FORMATS), new_document),
+        "set_cell_borders (x100)": (lambda cells: [gd.set_cell_borders(c) for c in cells], raw_cells),
+        "add_code_block (20 lines)": (lambda doc: gd.add_code_block(doc, CODE_SAMPLE), new_document),
+        "add_bullet (x100)": (lambda doc: [gd.add_bullet(doc, f"item {i}", bold_prefix="Label")
+                                           for i in range(100)], new_document),
+        "add_heading_styled (x100)": (lambda doc: [gd.add_heading_styled(doc, f"Heading {i}", 1 + i % 3)
+                                                   for i in range(100)], new_document),
+    }
+    return {name: measure(fn, repeat, setup) for name, (fn, setup) in cases.items()}
+
+
+def section_benchmarks(repeat):
+    results = {}
+    for module in (generate_docx, generate_qa_docx):
+        for fn in module.SECTIONS:
+            results[f"{module.__name__}.{fn.__name__}"] = measure(fn, repeat, new_document)
+    return results
+
+
+def main_benchmarks(repeat):
+    """Full main() of both generators (section cache off) and their HTML / Markdown
+    exports from the document tree, writing into a temp dir."""
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            for module in (generate_docx, generate_qa_docx):
+                def run(_, module=module):
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        module.main(["--no-cache"])
+                results[f"{module.__name__}.main"] = measure(run, repeat)
+                for fmt in ("html", "md"):
+                    results[f"{module.__name__}.export.{fmt}"] = measure(
+                        lambda _, module=module, fmt=fmt: module.export(fmt, tmp), repeat)
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+# ── Start-up ──
+
+def import_times(args):
+    """Run python -X importtime with args; (seconds spent importing, imported module names)."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=HERE, capture_output=True,
+                          text=True, check=True)
+    total = 0
+    modules = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Top-level imports are indented by one space; their cumulative time covers the nested ones
+        if not name.startswith("  "):
+            total += int(cumulative)
+        modules.add(name.strip())
+    return total / 1e6, modules
+
+
+def startup_benchmarks(repeat):
+    """Best -X importtime total and wall time of each STARTUP_COMMANDS entry in a fresh process."""
+    results = {}
+    for name, (args, fast) in STARTUP_COMMANDS.items():
+        best, wall = math.inf, math.inf
+        for _ in range(repeat):
+            start = time.perf_counter()
+            seconds, modules = import_times(args)
+            wall = min(wall, time.perf_counter() - start)
+            best = min(best, seconds)
+        heavy = sorted(m for m in modules if m.split(".")[0] in FAST_PATH_FORBIDDEN)
+        results[name] = {"seconds": best, "wall_seconds": wall, "fast_path": fast, "modules": len(modules),
+                         "forbidden": heavy if fast else []}
+    return results
+
+
+# ── Synthetic Scale Tests ──
+
+def synthetic_section(doc, i):
+    """A representative section: headings, prose, bullets, a table and code."""
+    gd = docx_render
+    gd.add_heading_styled(doc, f"{i}. Synthetic Section", 1)
+    gd.add_accent_bar(doc)
+    for j in range(3):
+        gd.add_body(doc, f"Paragraph {j} of section {i}. " * 4, bold_prefix="Note: " if j == 0 else "")
+    for j in range(3):
+        gd.add_bullet(doc, f"Bullet {j}", bold_prefix="Point")
+    gd.add_heading_styled(doc, "Details", 2)
+    gd.add_styled_table(doc, ["Key", "Value", "Owner", "Status"], table_rows(5))
+    gd.add_code_block(doc, CODE_SAMPLE)
+
+
+def scale_tables(sizes, repeat):
+    points = []
+    for n_cells in sizes:
+        rows = table_rows(n_cells // 4)
+        runs = repeat if n_cells <= 10_000 else 1
+        result = measure(lambda doc: docx_render.add_styled_table(doc, ["A", "B", "C", "D"], rows),
+                         runs, new_document)
+        points.append((n_cells, result))
+    return points
+
+
+def scale_documents(sizes, repeat):
+    """Build n synthetic sections and save to memory (build + serialization)."""
+    def build(n):
+        doc = new_document()
+        for i in range(n):
+            synthetic_section(doc, i)
+        doc.save(io.BytesIO())
+
+    points = []
+    for n in sizes:
+        runs = repeat if n <= 100 else 1
+        points.append((n, measure(lambda _: build(n), runs)))
+    return points
+
+
+def stream_document(n, out):
+    """n synthetic sections plus an n * 20 row table through StreamingDocument."""
+    with StreamingDocument(out) as doc:
+        for i in range(n):
+            synthetic_section(doc, i)
+        docx_render.add_styled_table(doc, ["A", "B", "C", "D"], (row for row in table_rows(n * 20)))
+        build_footer(doc, generate_docx.FOOTER_TEXT)
+
+
+def peak_rss_kb():
+    """High-water RSS of this process. VmHWM starts afresh at exec, whereas
+    ru_maxrss carries over the parent's (Linux)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return float(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return float(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def scale_streaming(sizes):
+    """Streamed builds, each in a fresh process so its peak RSS is its own."""
+    points = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            code = (f"import time, bench_generators as b\n"
+                    f"t = time.perf_counter(); b.stream_document({n}, {os.path.join(tmp, 'stream.docx')!r})\n"
+                    f"print(time.perf_counter() - t, b.peak_rss_kb())")
+            out = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True,
+                                 check=True).stdout.split()
+            points.append((n, {"seconds": float(out[0]), "peak_kb": float(out[1])}))
+    return points
+
+
+def scale_reading(sizes):
+    """Streamed builds read back to Markdown, each read in a fresh process."""
+    points = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            path = os.path.join(tmp, "read.docx")
+            stream_document(n, path)
+            code = (f"import time, bench_generators as b\n"
+                    f"from docx_render.docx_reader import write_markdown\n"
+                    f"t = time.perf_counter(); write_markdown({path!r}, {os.path.join(tmp, 'read.md')!r})\n"
+                    f"print(time.perf_counter() - t, b.peak_rss_kb())")
+            out = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True,
+                                 check=True).stdout.split()
+            points.append((n, {"seconds": float(out[0]), "peak_kb": float(out[1])}))
+    return points
+
+
+def revise(data, every=10):
+    """A stream_document() package with the second paragraph of every
+    every-th section reworded."""
+    with zipfile.ZipFile(io.BytesIO(data)) as z:
+        xml = z.read(DOCUMENT_PART).decode("utf-8")
+    xml = re.sub(r"Paragraph 1 of section (\d*0)\. ", r"Paragraph 1 of the revised section \1. ", xml)
+    return replace_parts(data, {DOCUMENT_PART: xml.encode("utf-8")})
+
+
+def scale_redline(sizes, repeat):
+    """Redline streamed documents against their revise() revision."""
+    points = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            path = os.path.join(tmp, "old.docx")
+            stream_document(n, path)
+            with open(path, "rb") as f:
+                old = f.read()
+            new = revise(old)
+            runs = repeat if n <= 100 else 1
+            points.append((n, measure(lambda _: redline_package(old, new), runs)))
+    return points
+
+
+# ── Service ──
+
+async def _client(host, port, paths, latencies):
+    """Fetch paths over one keep-alive connection until the shared iterator runs out."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for path in paths:
+            start = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+            head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+            if not head.startswith("HTTP/1.1 200"):
+                raise RuntimeError(f"{path}: {head.splitlines()[0]}")
+            length = int(re.search(r"(?im)^content-length: *(\d+)", head).group(1))
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def _load(host, port, paths, concurrency):
+    latencies = []
+    shared = iter(paths)
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, shared, latencies) for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    return {"requests": len(latencies), "concurrency": concurrency,
+            "p50_ms": round(percentile(latencies, 0.5) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+            "requests_per_second": round(len(latencies) / wall, 1)}
+
+
+async def _service_benchmarks(templates, n_requests, concurrency, jobs):
+    start = time.perf_counter()
+    service = RenderService(templates, jobs)
+    host, port = await service.start()
+    warm = time.perf_counter() - start
+    try:
+        paths = [f"/documents/{'paper' if i % 2 else 'qa'}.docx?date=Request%20{i}" for i in range(n_requests)]
+        return {
+            "warm_seconds": round(warm, 3),
+            "workers": service.jobs,
+            "miss": await _load(host, port, paths, concurrency),
+            "hit": await _load(host, port, paths, concurrency),
+            "cache": service.cache.stats(),
+        }
+    finally:
+        await service.close()
+
+
+def service_benchmarks(n_requests, concurrency):
+    """Latency and throughput of the rendering service, rendering and from its cache."""
+    with tempfile.TemporaryDirectory() as tmp:
+        templates = build_templates({"paper": generate_docx, "qa": generate_qa_docx}, tmp)
+    return asyncio.run(_service_benchmarks(templates, n_requests, concurrency, os.cpu_count() or 1))
+
+
+def scaling_report(points):
+    series = [(n, r["seconds"]) for n, r in points]
+    memory = [(n, r["peak_kb"]) for n, r in points]
+    return {
+        "points": [{"n": n, **r} for n, r in points],
+        "exponent": round(fit_power_law(series), 3),
+        "tail_exponent": round(tail_exponent(series), 3),
+        "memory_exponent": round(fit_power_law(memory), 3),
+    }
+
+
+# ── Reporting ──
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def print_group(title, results):
+    print(f"\n{title}")
+    for name, r in results.items():
+        print(f"  {r['seconds'] * 1000:9.2f} ms  {r['peak_kb']:10.1f} KiB  {name}")
+
+
+def print_startup(title, results):
+    print(f"\n{title}")
+    for name, r in results.items():
+        print(f"  {r['seconds'] * 1000:9.2f} ms  {r['wall_seconds'] * 1000:9.2f} ms wall  "
+              f"{r['modules']:5} modules  {name}")
+
+
+def print_scaling(title, unit, report):
+    print(f"\n{title}  (fit n^{report['exponent']:.2f}, tail n^{report['tail_exponent']:.2f}, "
+          f"memory n^{report['memory_exponent']:.2f})")
+    for p in report["points"]:
+        print(f"  {p['n']:>8} {unit:<8} {p['seconds'] * 1000:10.1f} ms  "
+              f"{p['seconds'] / p['n'] * 1e6:8.1f} us/{unit[:-1]}  {p['peak_kb']:10.1f} KiB")
+
+
+def print_service(title, results):
+    print(f"\n{title}  ({results['workers']} workers, warm in {results['warm_seconds'] * 1000:.0f} ms)")
+    for name in ("miss", "hit"):
+        r = results[name]
+        print(f"  {r['p50_ms']:9.2f} ms p50  {r['p99_ms']:9.2f} ms p99  {r['requests_per_second']:9.1f} req/s  "
+              f"{name} ({r['requests']} requests, {r['concurrency']} connections)")
+
+
+def compare(results, baseline, max_slowdown):
+    """Entries slower than max_slowdown x their baseline time."""
+    slower = []
+    for group in ("helpers", "sections", "main", "startup"):
+        for name, r in results[group].items():
+            old = baseline.get(group, {}).get(name)
+            if old and r["seconds"] > old["seconds"] * max_slowdown:
+                slower.append(f"{group}/{name}: {old['seconds'] * 1000:.2f} -> {r['seconds'] * 1000:.2f} ms")
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--quick", action="store_true", help="Stop scale tests at 10k cells / 100 sections")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--baseline", help="Earlier --json results to compare against")
+    parser.add_argument("--max-exponent", type=float, default=1.3,
+                        help="Fail when a scale series grows faster than n^this (default 1.3)")
+    parser.add_argument("--max-memory-exponent", type=float, default=0.25,
+                        help="Fail when streaming peak RSS grows faster than n^this (default 0.25)")
+    parser.add_argument("--max-slowdown", type=float, default=1.5,
+                        help="Fail when an entry is this many times slower than the baseline")
+    args = parser.parse_args(argv)
+
+    cells = [n for n in TABLE_CELLS if not args.quick or n <= 10_000]
+    sections = [n for n in DOCUMENT_SECTIONS if not args.quick or n <= 100]
+    service_requests = SERVICE_REQUESTS // 10 if args.quick else SERVICE_REQUESTS
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "python_docx": docx.__version__,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "helpers": helper_benchmarks(args.repeat),
+        "sections": section_benchmarks(args.repeat),
+        "main": main_benchmarks(args.repeat),
+        "startup": startup_benchmarks(args.repeat),
+        "scaling": {
+            "table_cells": scaling_report(scale_tables(cells, args.repeat)),
+            "document_sections": scaling_report(scale_documents(sections, args.repeat)),
+            "streamed_sections": scaling_report(scale_streaming(sections)),
+            "read_sections": scaling_report(scale_reading(sections)),
+            "redline_sections": scaling_report(scale_redline(sections, args.repeat)),
+        },
+        "service": service_benchmarks(service_requests, SERVICE_CONCURRENCY),
+    }
+
+    print_group("Helpers", results["helpers"])
+    print_group("Sections", results["sections"])
+    print_group("Full builds", results["main"])
+    print_startup("Start-up (-X importtime)", results["startup"])
+    print_scaling("Styled table", "cells", results["scaling"]["table_cells"])
+    print_scaling("Document", "sections", results["scaling"]["document_sections"])
+    print_scaling("Streamed document (peak RSS)", "sections", results["scaling"]["streamed_sections"])
+    print_scaling("Read back to Markdown (peak RSS)", "sections", results["scaling"]["read_sections"])
+    print_scaling("Redline against a revision", "sections", results["scaling"]["redline_sections"])
+    print_service("Rendering service", results["service"])
+
+    failures = []
+    for name, report in results["scaling"].items():
+        worst = max(report["exponent"], report["tail_exponent"])
+        if worst > args.max_exponent:
+            failures.append(f"{name} scales as n^{worst:.2f} (limit n^{args.max_exponent})")
+    for name, r in results["startup"].items():
+        if r["forbidden"]:
+            failures.append(f"{name} imports {', '.join(r['forbidden'][:3])} on the fast path")
+    streamed = results["scaling"]["streamed_sections"]["memory_exponent"]
+    if streamed > args.max_memory_exponent:
+        failures.append(f"streamed_sections memory grows as n^{streamed:.2f} "
+                        f"(limit n^{args.max_memory_exponent})")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            failures += compare(results, json.load(f), args.max_slowdown)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n[OK] Results: {args.json}")
+
+    for failure in failures:
+        print(f"[FAIL] {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+Shared rendering library for the McKinsey-style DOCX deliverables.
+
+The palette, named styles, page setup and styling helpers live here once, so
+the generators (generate_docx.py, generate_qa_docx.py) and the Markdown
+compiler (md_to_docx.py) cannot drift apart. render_all.py builds every
+deliverable in one warm interpreter:
+
+    python render_all.py [--only NAME ...] [--no-cache] [--jobs N]
+
+The names below are imported on first use, so importing the package (or
+docx_render.cli) does not load python-docx.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "doc_styles": (
+        "NAVY", "DARK_BLUE", "ELECTRIC", "CHARCOAL", "LIGHT_GRAY", "WHITE", "WARM_GRAY",
+        "GREEN_ACCENT", "RED_ACCENT", "ORANGE_ACCENT", "ACCENT_BAR_COLOR",
+        "append_paragraph", "build_footer", "compile_theme", "is_draft", "new_document", "styled_paragraph",
+        "styled_run", "theme_hash",
+    ),
+    "helpers": (
+        "set_cell_bg", "set_cell_borders", "set_page_break_before",
+        "add_styled_table", "add_accent_bar", "add_spacer", "add_heading_styled", "add_body",
+        "add_quote", "add_code_block", "add_bullet", "add_cover_title", "add_cover_subtitle",
+        "add_cover_meta", "open_styled_table",
+    ),
+    "table_source": ("column_formatter", "table_source"),
+    "ir": ("Tree", "is_tree", "record", "export", "write_export"),
+    "ir_docx": ("docx_sections",),
+    "docx_reader": ("read_nodes", "write_markdown"),
+    "build_report": ("pages_note", "print_build_report", "write_profile", "zip_parts"),
+    "layout_estimate": ("apply_keep_hints", "estimate_layout"),
+    "section_cache": ("CACHE_DIR", "function_sections", "helper_version", "prune_cache", "render_sections"),
+    "streaming_docx": ("StreamingDocument",),
+    "optimize": ("optimize_file", "optimize_note", "optimize_package"),
+    "merge": ("bind_fields", "merge_manifest", "print_merge_report", "read_manifest"),
+    "patch": ("patch_document", "print_patch_report"),
+    "redline": ("redline_file", "redline_note", "redline_package"),
+    "service": ("PackageCache", "RenderService", "build_templates", "serve"),
+}
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+
+def __getattr__(name):
+    # Not cached in globals(): render_all.py --watch reloads the submodules
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{module}", __name__), name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_MODULE_OF))
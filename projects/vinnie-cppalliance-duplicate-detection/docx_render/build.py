@@ -0,0 +1,100 @@
+"""
+The build pipeline every deliverable goes through, and its shared CLI flags.
+
+build_document() renders a list of (name, source, render) sections into a
+fresh document (unchanged ones from the section cache) opened from the
+compiled theme with its footer (see doc_styles), adds the keep hints and
+the layout estimate, and saves it with save_atomic(): a
+byte-reproducible package (see reproducible), written next to its
+destination and renamed into place so a viewer (or the watch mode's next
+reader) never opens a half-written file, and not written at all when the
+file on disk already holds the same bytes.
+
+A draft build (--draft) is for iterating on wording: the helpers leave out
+cell decoration, accent bars and spacers, and the footer, keep hints,
+layout estimate and the reproducible repack (a second deflate pass) are
+skipped; the package is written with every entry stored, not deflated,
+to <output>.draft.docx (cli.output_name()), so a preview never replaces
+the deliverable. --release, the default, is the full styling. --optimize runs a
+release package through optimize.optimize_package() before it is written
+(unused styles and parts dropped, redundant cell borders and runs merged,
+recompressed); the savings are reported with the layout estimate.
+"""
+
+import functools
+import io
+import zipfile
+
+from docx.opc.pkgwriter import _ContentTypesItem
+
+from .cli import add_build_arguments  # re-exported for the CLIs
+from .doc_styles import new_document
+from .layout_estimate import apply_keep_hints, estimate_layout
+from .optimize import optimize_package
+from .reproducible import package_bytes, write_if_changed
+from .section_cache import CACHE_DIR, render_sections
+
+
+def save_atomic(doc, out, optimize=False):
+    """Save doc to out reproducibly and atomically (optimized if asked).
+
+    Returns (written, optimizer stats or None); written is False if out was
+    already identical.
+    """
+    data = package_bytes(doc)
+    stats = None
+    if optimize:
+        data, stats = optimize_package(data)
+    written, _ = write_if_changed(data, out)
+    return written, stats
+
+
+def stored_package(doc):
+    """doc as a .docx with every entry stored: the members python-docx's
+    PackageWriter writes, without its deflate pass."""
+    package = doc.part.package
+    parts = list(package.iter_parts())
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_STORED) as z:
+        z.writestr("[Content_Types].xml", _ContentTypesItem.from_parts(parts).blob)
+        z.writestr("_rels/.rels", package.rels.xml)
+        for part in parts:
+            z.writestr(part.partname.membername, part.blob)
+            if len(part.rels):
+                z.writestr(part.partname.rels_uri.membername, part.rels.xml)
+    return buf.getvalue()
+
+
+def save_draft(doc, out):
+    """Save doc to out atomically, uncompressed (stored_package())."""
+    written, _ = write_if_changed(stored_package(doc), out)
+    return written
+
+
+def build_document(out, sections, footer, version="", cache_dir=CACHE_DIR, jobs=1, draft=False, optimize=False):
+    """Render sections into a new document saved as out.
+
+    Returns (report, layout, written); written is False when out already
+    held the identical package and was left alone. Draft builds have no
+    layout estimate (None) and are not optimized; optimize=True adds the
+    optimizer stats to the layout as layout["optimized"].
+
+    cache_dir=None disables the section cache and the on-disk theme; jobs > 1
+    renders the uncached sections in worker processes (see
+    section_cache.render_sections).
+    """
+    # Workers open the same compiled theme (forked ones already hold it in memory);
+    # merging drops their section properties, footer included
+    factory = functools.partial(new_document, draft=draft, footer=None if draft else footer,
+                                cache_dir=cache_dir)
+    if draft:
+        version += "\0draft"
+    doc = factory()
+    report = render_sections(doc, sections, cache_dir=cache_dir, version=version,
+                             jobs=jobs, factory=factory)
+    if draft:
+        return report, None, save_draft(doc, out)
+    apply_keep_hints(doc)
+    layout = estimate_layout(doc, report)
+    written, layout["optimized"] = save_atomic(doc, out, optimize)
+    return report, layout, written
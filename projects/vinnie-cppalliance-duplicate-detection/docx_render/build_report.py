@@ -0,0 +1,136 @@
+"""
+Measured build report for the DOCX generators.
+
+render_sections() records, per section, its wall time, the peak Python-heap
+memory it allocated (only while tracemalloc is tracing, i.e. with --profile),
+the paragraphs, runs, tables and cells it emitted and the size of that XML.
+After doc.save the size of every ZIP part is added, layout_estimate adds
+the estimated pages and --optimize the optimizer savings. print_build_report()
+prints the human summary; write_profile() dumps the same data as JSON.
+"""
+
+import json
+import os
+import re
+import tracemalloc
+import zipfile
+
+from docx.oxml.ns import qn
+from lxml import etree
+
+from .optimize import optimize_note
+from .reproducible import file_digest
+
+_COUNTED = {qn("w:p"): "paragraphs", qn("w:r"): "runs", qn("w:tbl"): "tables", qn("w:tc"): "cells"}
+_XMLNS = re.compile(rb'\s+xmlns(?::\w+)?="[^"]*"')
+
+
+def xml_size(el):
+    """Bytes el occupies inside document.xml (its own serialization repeats
+    every namespace declaration in scope, which the real part declares once)."""
+    data = etree.tostring(el)
+    end = data.index(b">")
+    return len(_XMLNS.sub(b"", data[:end])) + len(data) - end
+
+
+def element_stats(elements):
+    """Paragraph, run, table and cell counts plus serialized size of body elements."""
+    stats = dict.fromkeys(_COUNTED.values(), 0)
+    stats["xml_bytes"] = 0
+    stats["blocks"] = len(elements)
+    for el in elements:
+        for node in el.iter(*_COUNTED):
+            stats[_COUNTED[node.tag]] += 1
+        stats["xml_bytes"] += xml_size(el)
+    return stats
+
+
+def memory_mark():
+    """Start a peak-memory window; None when tracemalloc is not tracing."""
+    if not tracemalloc.is_tracing():
+        return None
+    tracemalloc.reset_peak()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def memory_peak_kb(mark):
+    """Peak allocation above the mark, in KiB (None without tracing)."""
+    if mark is None or not tracemalloc.is_tracing():
+        return None
+    return round((tracemalloc.get_traced_memory()[1] - mark) / 1024, 1)
+
+
+def zip_parts(path):
+    """[{part, bytes, compressed}] for every part of a saved package, largest first."""
+    with zipfile.ZipFile(path) as z:
+        parts = [{"part": i.filename, "bytes": i.file_size, "compressed": i.compress_size}
+                 for i in z.infolist()]
+    return sorted(parts, key=lambda p: -p["bytes"])
+
+
+def totals(sections):
+    keys = list(_COUNTED.values()) + ["xml_bytes"]
+    return {key: sum(s[key] for s in sections) for key in keys}
+
+
+def _pages(s):
+    first, last = s.get("first_page"), s.get("last_page")
+    if first is None:
+        return "-"
+    return str(first) if first == last else f"{first}-{last}"
+
+
+def pages_note(layout):
+    """"~N pages, " for a one-line summary ("" without a layout estimate),
+    with the optimized size when the package was optimized."""
+    if not layout:
+        return ""
+    optimized = layout.get("optimized")
+    if not optimized:
+        return f"~{layout['pages']} pages, "
+    saved = 100 - 100 * optimized["bytes_after"] / optimized["bytes_before"]
+    return f"~{layout['pages']} pages, optimized -{saved:.0f}%, "
+
+
+def print_build_report(out, sections, parts, seconds, layout=None, written=True):
+    t = totals(sections)
+    hits = sum(1 for s in sections if s["status"] == "hit")
+    state = "Generated" if written else "Unchanged"
+    print(f"[OK] {state}: {out}  ({os.path.getsize(out) / 1024:.1f} KB in {seconds:.2f}s)")
+    print(f"     sha256: {file_digest(out)}" + ("" if written else "  (identical bytes, not rewritten)"))
+    if layout:
+        print(f"     Pages: ~{layout['pages']} (estimated from font metrics; "
+              f"{layout['moved']} blocks kept with their next block)")
+        for s in layout["stranded"]:
+            print(f"     [WARN] Heading stranded at the foot of page {s['page']}: {s['heading']}")
+        if layout.get("optimized"):
+            print(f"     Optimized: {optimize_note(layout['optimized'])}")
+    print(f"     Content: {len(sections)} sections, {t['paragraphs']} paragraphs, {t['runs']} runs, "
+          f"{t['tables']} tables, {t['cells']} cells")
+    print(f"     Sections: {hits} from cache, {len(sections) - hits} rendered")
+    print(f"     {'':<4}  {'ms':>7}  {'KiB':>7}  {'paras':>5}  {'runs':>5}  {'tbls':>4}  {'cells':>5}  {'XML KB':>7}"
+          f"  {'pages':>5}")
+    for s in sections:
+        peak = "-" if s["peak_kb"] is None else f"{s['peak_kb']:.0f}"
+        print(f"     {s['status']:<4}  {s['seconds'] * 1000:7.1f}  {peak:>7}  {s['paragraphs']:5}  "
+              f"{s['runs']:5}  {s['tables']:4}  {s['cells']:5}  {s['xml_bytes'] / 1024:7.1f}  {_pages(s):>5}  "
+              f"{s['name']}")
+    print("     Parts (uncompressed / zipped KB):")
+    for p in parts:
+        print(f"       {p['bytes'] / 1024:8.1f}  {p['compressed'] / 1024:7.1f}  {p['part']}")
+
+
+def write_profile(path, out, sections, parts, seconds, layout=None):
+    profile = {
+        "output": out,
+        "seconds": seconds,
+        "bytes": os.path.getsize(out),
+        "sha256": file_digest(out),
+        "layout": layout,
+        "totals": totals(sections),
+        "sections": sections,
+        "parts": parts,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+    return path
@@ -0,0 +1,161 @@
+"""
+Command line of the generator scripts, usable before python-docx is imported.
+
+A generator's outline (its SECTIONS list and what each build_* section is
+about) is read from the script's source with ast, so --help, --list and a
+mistyped --only answer in milliseconds. The scripts call
+parse_generator_args() at the top, ahead of their python-docx imports:
+
+    python generate_docx.py --list
+    python generate_docx.py --only resolution,costs
+    python generate_qa_docx.py --only q3 --draft
+    python generate_docx.py --format html --format md
+    python generate_docx.py --merge clients.csv --out-dir proposals
+    python generate_docx.py --patch costs
+    python generate_docx.py --redline v1.0/CONSULTANT-PAPER-AGENT-ARCHITECTURE.docx
+
+Nothing here may import python-docx or lxml (bench_generators.py checks with
+-X importtime); docx_render's own exports are loaded lazily for the same reason.
+"""
+
+import argparse
+import ast
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(os.path.dirname(HERE), ".docx-cache")
+SECTION_PREFIX = "build_"
+# The deliverable each generator script builds (md_to_docx leaves their .md twins alone)
+GENERATOR_OUTPUTS = {
+    "generate_docx": "CONSULTANT-PAPER-AGENT-ARCHITECTURE.docx",
+    "generate_qa_docx": "QA-ARCHITECTURE-DECISIONS.docx",
+}
+# --format: suffix replacing the .docx of the output name
+FORMAT_SUFFIXES = {"docx": ".docx", "html": ".preview.html", "md": ".preview.md"}
+
+
+def add_build_arguments(parser):
+    """The cache, worker, draft/release and optimize flags shared by every generator CLI."""
+    parser.add_argument("--no-cache", action="store_true", help="Render every section from scratch")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="Section cache directory")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Render uncached sections in N worker processes (0: one per CPU)")
+    profile = parser.add_mutually_exclusive_group()
+    profile.add_argument("--draft", action="store_true",
+                         help="Fast preview into <output>.draft.docx: no cell decoration, accent bars, "
+                              "spacers or footer, uncompressed")
+    profile.add_argument("--release", dest="draft", action="store_false",
+                         help="Full styling (default)")
+    parser.add_argument("--optimize", action="store_true",
+                        help="Shrink the saved package (unused styles and parts, redundant borders); renders the same")
+    return parser
+
+
+def _summary(node):
+    """First docstring line of a build_* function, else its first heading text."""
+    doc = ast.get_docstring(node)
+    if doc:
+        return doc.strip().splitlines()[0]
+    for call in ast.walk(node):
+        if (isinstance(call, ast.Call) and getattr(call.func, "id", None) == "add_heading_styled"
+                and len(call.args) > 1 and isinstance(call.args[1], ast.Constant)):
+            return call.args[1].value
+    return ""
+
+
+def outline(path):
+    """(description, [(name, summary)], merge fields) of a generator script, without running it.
+
+    name is the build_* function name without its prefix, in SECTIONS order;
+    the merge fields are the keys of the script's FIELDS dict.
+    """
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    functions = {node.name: node for node in tree.body if isinstance(node, ast.FunctionDef)}
+    sections = []
+    fields = []
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1:
+            target = getattr(node.targets[0], "id", None)
+            if target == "SECTIONS":
+                sections = [el.id for el in node.value.elts]
+            elif target == "FIELDS":
+                fields = [key.value for key in node.value.keys]
+    description = (ast.get_docstring(tree) or "").strip().splitlines()[0]
+    return description, [(name[len(SECTION_PREFIX):], _summary(functions[name])) for name in sections], fields
+
+
+def parse_generator_args(path, argv=None):
+    """Parse a generator's command line; --list prints its outline and exits.
+
+    args.only and args.patch become the selected build_* function names in
+    outline order, or None for the whole document / no patch.
+    """
+    description, sections, fields = outline(path)
+    parser = add_build_arguments(argparse.ArgumentParser(description=description))
+    parser.add_argument("--list", action="store_true", help="List the sections and exit")
+    parser.add_argument("--only", action="append", metavar="NAME[,NAME...]",
+                        help="Render only these sections (see --list; repeatable) "
+                             "into <output>.partial.docx")
+    parser.add_argument("--format", action="append", choices=FORMAT_SUFFIXES,
+                        help="docx (default), or an html / md preview from the same document tree "
+                             "(<output>.preview.html / .preview.md; repeatable)")
+    parser.add_argument("--profile", nargs="?", const="", metavar="JSON",
+                        help="Trace per-section memory and write a JSON profile "
+                             "(default: <output>.profile.json)")
+    parser.add_argument("--merge", metavar="MANIFEST",
+                        help="Render once, then write one document per record of a CSV/JSONL manifest "
+                             "of merge fields (see --list)")
+    parser.add_argument("--out-dir", default=".", help="Directory of the --merge documents")
+    parser.add_argument("--patch", action="append", metavar="NAME[,NAME...]",
+                        help="Re-render only these sections inside the existing <output>, keeping every "
+                             "other part and edit (see --list; repeatable)")
+    parser.add_argument("--redline", metavar="OLD.docx",
+                        help="Also write <output>.redline.docx: this build with every change from the "
+                             "earlier revision OLD.docx tracked (Accept / Reject in Word)")
+    args = parser.parse_args(argv)
+    args.format = list(dict.fromkeys(args.format or ["docx"]))
+    if args.merge and args.format != ["docx"]:
+        parser.error("--merge writes DOCX only")
+    if args.merge and not fields:
+        parser.error("this generator has no merge fields (FIELDS)")
+    if args.patch and (args.only or args.merge or args.draft or args.optimize or args.format != ["docx"]):
+        parser.error("--patch updates the saved release DOCX; it cannot be combined with --only, --merge, "
+                     "--draft, --optimize or --format")
+    if args.redline and (args.only or args.merge or args.patch or args.draft or "docx" not in args.format):
+        parser.error("--redline compares the full release DOCX; it cannot be combined with --only, --merge, "
+                     "--patch, --draft or a --format without docx")
+
+    if args.list:
+        width = max(len(name) for name, _ in sections)
+        for name, summary in sections:
+            print(f"{name:<{width}}  {summary}")
+        if fields:
+            print(f"\nMerge fields: {', '.join(fields)}")
+        sys.exit(0)
+    args.only = _section_names(parser, args.only, sections)
+    args.patch = _section_names(parser, args.patch, sections)
+    return args
+
+
+def _section_names(parser, values, sections):
+    """build_* names of the NAME[,NAME...] values in outline order, or None."""
+    if not values:
+        return None
+    wanted = {n.strip().removeprefix(SECTION_PREFIX) for value in values for n in value.split(",") if n.strip()}
+    unknown = wanted - {name for name, _ in sections}
+    if unknown:
+        parser.error(f"unknown section(s): {', '.join(sorted(unknown))} (see --list)")
+    return [SECTION_PREFIX + name for name, _ in sections if name in wanted]
+
+
+def output_name(output, only=None, fmt="docx", draft=False):
+    """The file a (partial, draft) build writes in fmt: a subset or a draft never
+    overwrites the full document, and a Markdown preview never the Markdown source."""
+    stem = os.path.splitext(output)[0]
+    if only:
+        stem += ".partial"
+    if draft:
+        stem += ".draft"
+    return stem + FORMAT_SUFFIXES[fmt]
@@ -0,0 +1,132 @@
+"""
+Table column widths measured from the cell text, instead of tuned by hand.
+
+col_widths may be "auto", or a list mixing per column
+
+    3.5            a fixed width in cm (as before)
+    None           an automatic width
+    (1.5, 6)       an automatic width kept between 1.5 and 6 cm (either may be None)
+
+Automatic columns are measured on the header (TableHeader, bold) and the
+first SAMPLE_ROWS rows (TableCell; **bold** cells bold) with the advance
+width tables of layout_estimate, cached per font, size and weight, and per
+distinct string, so a large table costs the same as its sample. A column
+needs at least its longest word (nothing breaks mid-word) and asks for
+its longest line. The usable width between the section margins, less the
+fixed columns, is shared in proportion to those longest lines, with every
+column held between its minimum (longest word, at least MIN_WIDTH_CM) and
+its maximum (MAX_WIDTH_SHARE of the usable width). The result is set once
+per column, on the table grid and the precomputed cell openings of
+oxml_table.TableMarkup.
+"""
+
+from itertools import chain, islice
+
+from docx.shared import Cm
+
+from .doc_styles import PARAGRAPH_STYLES
+from .layout_estimate import CELL_MARGINS, text_width
+
+SAMPLE_ROWS = 256
+MIN_WIDTH_CM = 1.0
+MAX_WIDTH_SHARE = 0.6
+PT_PER_CM = 72 / 2.54
+
+
+def is_measured(col_widths):
+    """True if any column of the spec is sized from its content."""
+    if isinstance(col_widths, str):
+        if col_widths != "auto":
+            raise ValueError(f"col_widths must be 'auto' or a list, not {col_widths!r}")
+        return True
+    return bool(col_widths) and any(w is None or isinstance(w, (tuple, list)) for w in col_widths)
+
+
+def width_spec(col_widths):
+    """col_widths as stored in a tree node: None, "auto" or a list."""
+    if not col_widths:
+        return None
+    return col_widths if isinstance(col_widths, str) else list(col_widths)
+
+
+def _text_extent(text, font, size, bold):
+    """(longest line, longest word) of text in pt."""
+    lines = text.split("\n")
+    natural = max(text_width(line, font, size, bold) for line in lines)
+    words = text.split()
+    return natural, max((text_width(word, font, size, bold) for word in words), default=0.0)
+
+
+def measure_columns(headers, rows):
+    """[(natural, minimum)] in pt per column, cell margins included."""
+    _, header_font, header_size, _, header_bold, _ = PARAGRAPH_STYLES["TableHeader"]
+    _, cell_font, cell_size, _, _, _ = PARAGRAPH_STYLES["TableCell"]
+    extents = [list(_text_extent(str(h), header_font, header_size, bool(header_bold))) for h in headers]
+    for row in rows:
+        for extent, value in zip(extents, row):
+            text = str(value)
+            bold = text.startswith("**") and text.endswith("**")
+            natural, minimum = _text_extent(text.strip("*") if bold else text, cell_font, cell_size, bold)
+            if natural > extent[0]:
+                extent[0] = natural
+            if minimum > extent[1]:
+                extent[1] = minimum
+    return [(natural + CELL_MARGINS, minimum + CELL_MARGINS) for natural, minimum in extents]
+
+
+def share_width(width, weights, lows, highs):
+    """width split in proportion to weights, each share held within [low, high].
+
+    Shares that hit a bound are fixed there and the rest is split again
+    among the others; if even the lows do not fit, they are scaled down.
+    """
+    shares = [None] * len(weights)
+    free = list(range(len(weights)))
+    while free:
+        left = width - sum(s for s in shares if s is not None)
+        total = sum(weights[i] for i in free)
+        split = {i: left * weights[i] / total if total else left / len(free) for i in free}
+        bound = {i: lows[i] if split[i] < lows[i] else highs[i] for i in free
+                 if split[i] < lows[i] or split[i] > highs[i]}
+        if not bound:
+            for i in free:
+                shares[i] = split[i]
+            break
+        for i, value in bound.items():
+            shares[i] = value
+        free = [i for i in free if i not in bound]
+    total = sum(shares)
+    if total > width:
+        shares = [s * width / total for s in shares]
+    return shares
+
+
+def solve_widths(extents, specs, usable):
+    """Widths in pt for the columns' (natural, minimum) extents, specs and usable width."""
+    fixed = sum(spec * PT_PER_CM for spec in specs if isinstance(spec, (int, float)))
+    auto = [i for i, spec in enumerate(specs) if not isinstance(spec, (int, float))]
+    lows, highs = [], []
+    for i in auto:
+        low, high = specs[i] if isinstance(specs[i], (tuple, list)) else (None, None)
+        high = high * PT_PER_CM if high is not None else usable * MAX_WIDTH_SHARE
+        low = max(low * PT_PER_CM if low is not None else MIN_WIDTH_CM * PT_PER_CM, min(extents[i][1], high))
+        lows.append(low)
+        highs.append(max(low, high))
+    shares = share_width(max(usable - fixed, 0.0), [extents[i][0] for i in auto], lows, highs)
+    widths = [spec * PT_PER_CM if isinstance(spec, (int, float)) else None for spec in specs]
+    for i, share in zip(auto, shares):
+        widths[i] = share
+    return widths
+
+
+def measured_widths(headers, rows, col_widths, usable_emu):
+    """(rows, widths in EMU) for a measured col_widths spec; rows is handed back
+    with its sample put back in front, so a lazy source is still read once."""
+    n_cols = len(headers)
+    specs = [None] * n_cols if isinstance(col_widths, str) else (list(col_widths) + [None] * n_cols)[:n_cols]
+    rows = iter(rows)
+    sample = list(islice(rows, SAMPLE_ROWS))
+    usable = usable_emu / 12700
+    widths = solve_widths(measure_columns(headers, sample), specs, usable)
+    emu = [Cm(spec) if isinstance(spec, (int, float)) else int(round(w * 12700)) for spec, w in zip(specs, widths)]
+    return chain(sample, rows), emu
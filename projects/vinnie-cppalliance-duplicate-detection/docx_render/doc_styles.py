@@ -0,0 +1,296 @@
+"""
+Color palette and named document styles shared by the DOCX generators.
+
+register_styles() adds the paragraph, character and table styles below once
+per document. The helpers reference them by name instead of stamping font
+name, size and color onto every run, so a run only carries what differs
+from its style (bold, italic, an accent color). new_document() returns a blank
+document with the shared page setup and these styles registered.
+
+The template behind it is compiled once: the stock python-docx template plus
+margins, default font, the named styles, its numbering definitions and,
+optionally, the footer line. The compiled package is cached on disk as
+.docx-cache/theme-<hash>.docx, keyed by theme_hash() (python-docx version,
+the theme code and the footer text), so a fresh process or worker opens it
+instead of redoing the setup; within a process it is cloned from memory.
+"""
+
+import hashlib
+import io
+import os
+from functools import lru_cache
+
+import docx
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.section import Section
+from docx.shared import Cm, Pt, RGBColor
+from docx.text.paragraph import Paragraph
+
+from .cli import CACHE_DIR
+from .oxml_fragments import fragment
+from .reproducible import write_if_changed
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Modules whose code shapes the compiled template
+THEME_MODULES = ("doc_styles", "oxml_fragments")
+
+# ── Color Palette (McKinsey-inspired: Navy + Electric Blue + Warm Gray) ──
+NAVY = RGBColor(0x00, 0x33, 0x66)       # Primary headings
+DARK_BLUE = RGBColor(0x00, 0x52, 0x8A)  # Secondary headings
+ELECTRIC = RGBColor(0x00, 0x96, 0xD6)   # Accents, links
+CHARCOAL = RGBColor(0x33, 0x33, 0x33)   # Body text
+LIGHT_GRAY = RGBColor(0xF5, 0xF5, 0xF5) # Table alt rows
+WHITE = RGBColor(0xFF, 0xFF, 0xFF)
+WARM_GRAY = RGBColor(0x6B, 0x6B, 0x6B)  # Subtle text
+GREEN_ACCENT = RGBColor(0x00, 0x7A, 0x33)  # Success/positive
+RED_ACCENT = RGBColor(0xCC, 0x00, 0x00)    # Rejected/negative
+ORANGE_ACCENT = RGBColor(0xE8, 0x7C, 0x00) # Warning/medium
+
+# Palette tokens of the format-neutral tree (docx_render.ir): name -> hex
+PALETTE = {
+    name: str(color) for name, color in (
+        ("NAVY", NAVY), ("DARK_BLUE", DARK_BLUE), ("ELECTRIC", ELECTRIC), ("CHARCOAL", CHARCOAL),
+        ("LIGHT_GRAY", LIGHT_GRAY), ("WHITE", WHITE), ("WARM_GRAY", WARM_GRAY),
+        ("GREEN_ACCENT", GREEN_ACCENT), ("RED_ACCENT", RED_ACCENT), ("ORANGE_ACCENT", ORANGE_ACCENT),
+    )
+}
+
+# Table header background hex
+TBL_HEADER_BG = "003366"
+TBL_ALT_BG = "F0F4F8"
+TBL_BORDER_COLOR = "B0BEC5"
+ACCENT_BAR_COLOR = "0096D6"
+
+# ── Style Definitions ──
+# Fonts, sizes and colors exactly as the helpers used to set them per run.
+PARAGRAPH_STYLES = {
+    # name: (based on, font, size pt, color, bold, italic)
+    "Body": ("Normal", "Calibri", 10.5, CHARCOAL, False, False),
+    "Quote": ("Normal", "Calibri", 10, WARM_GRAY, False, True),
+    "Code": ("Normal", "Consolas", 8.5, CHARCOAL, False, False),
+    "Bullet": ("List Bullet", "Calibri", 10, CHARCOAL, False, False),
+    "TableHeader": ("Normal", "Calibri", 9, WHITE, True, False),
+    "TableCell": ("Normal", "Calibri", 9, CHARCOAL, False, False),
+    "CoverMeta": ("Normal", "Calibri", 10, CHARCOAL, False, False),
+    # Built-in headings: recolored in place
+    "Heading 1": (None, "Calibri", 22, NAVY, None, None),
+    "Heading 2": (None, "Calibri", 16, DARK_BLUE, None, None),
+    "Heading 3": (None, "Calibri", 13, ELECTRIC, None, None),
+}
+# Paragraph spacing (before, after) in pt, as the helpers meant to set it per paragraph
+PARAGRAPH_SPACING = {
+    "Body": (2, 4),
+    "Quote": (None, 8),
+    "Code": (None, 6),
+}
+CHARACTER_STYLES = {
+    "CoverMetaLabel": (None, "Calibri", 10, WARM_GRAY, True, False),
+}
+TABLE_STYLES = {
+    "StyledTable": ("Normal Table", "Calibri", 9, CHARCOAL, False, False),
+}
+# Cover page lines, set per run: (size pt, color, bold)
+COVER_LINES = {
+    "title": (36, NAVY, True),
+    "subtitle": (20, ELECTRIC, False),
+}
+
+# Style ids as written into w:pStyle / w:tblStyle (names without spaces)
+TABLE_HEADER_STYLE_ID = "TableHeader"
+TABLE_CELL_STYLE_ID = "TableCell"
+TABLE_STYLE_ID = "StyledTable"
+
+
+def _define(doc, name, style_type, spec):
+    based_on, font_name, size, color, bold, italic = spec
+    styles = doc.styles
+    style = styles[name] if name in styles else styles.add_style(name, style_type)
+    if based_on:
+        style.base_style = styles[based_on]
+    font = style.font
+    font.name = font_name
+    # Theme fonts would win over the explicit name (as they never did per run)
+    rFonts = style.element.rPr.rFonts
+    for attr in ("w:asciiTheme", "w:hAnsiTheme"):
+        rFonts.attrib.pop(qn(attr), None)
+    font.size = Pt(size)
+    font.color.rgb = color
+    if bold is not None:
+        font.bold = bold
+    if italic is not None:
+        font.italic = italic
+    return style
+
+
+def append_body_element(doc, element):
+    """Add element at the end of the body, ahead of its trailing w:sectPr.
+
+    python-docx finds that w:sectPr by scanning every body child on each
+    insert, which makes a long build quadratic. It is always the last child.
+    A streaming document first writes out the blocks finished so far.
+    """
+    flush_blocks = getattr(doc, "flush_blocks", None)
+    if flush_blocks is not None:
+        flush_blocks()
+    body = doc.element.body
+    try:
+        last = body[-1]
+    except IndexError:
+        last = None
+    if last is not None and last.tag == qn("w:sectPr"):
+        last.addprevious(element)
+    else:
+        body.append(element)
+    return element
+
+
+def append_paragraph(doc):
+    """doc.add_paragraph() in constant time (see append_body_element)."""
+    return Paragraph(append_body_element(doc, OxmlElement("w:p")), doc._body)
+
+
+def block_width(doc):
+    """Usable width of the last section; doc._block_width searches the whole body."""
+    sectPr = doc.element.body[-1]
+    if sectPr.tag != qn("w:sectPr"):
+        return doc._block_width
+    section = Section(sectPr, doc.part)
+    return section.page_width - section.left_margin - section.right_margin
+
+
+def styled_paragraph(doc, style_id, text=""):
+    """doc.add_paragraph() with the style id written directly.
+
+    python-docx resolves a style *name* by scanning every style on each call,
+    which costs more than building the paragraph itself.
+    """
+    p = append_paragraph(doc)
+    p._p.style = style_id
+    if text:
+        p.add_run(text)
+    return p
+
+
+def styled_run(p, text, style_id):
+    """p.add_run() with a character style id, skipping the name lookup."""
+    run = p.add_run(text)
+    run._r.style = style_id
+    return run
+
+
+def register_styles(doc):
+    """Register the palette-based named styles on doc (idempotent)."""
+    for name, spec in PARAGRAPH_STYLES.items():
+        _define(doc, name, WD_STYLE_TYPE.PARAGRAPH, spec)
+    for name, (before, after) in PARAGRAPH_SPACING.items():
+        paragraph_format = doc.styles[name].paragraph_format
+        if before is not None:
+            paragraph_format.space_before = Pt(before)
+        paragraph_format.space_after = Pt(after)
+    for name, spec in CHARACTER_STYLES.items():
+        _define(doc, name, WD_STYLE_TYPE.CHARACTER, spec)
+    for name, spec in TABLE_STYLES.items():
+        style = _define(doc, name, WD_STYLE_TYPE.TABLE, spec)
+        if style.element.find(qn("w:tblPr")) is None:
+            tblPr = fragment("tblPr.styled", TBL_BORDER_COLOR, "4")
+            style.element.append(tblPr)
+    return doc
+
+
+def build_footer(doc, text):
+    """Add a centered footer line to all sections."""
+    for section in doc.sections:
+        footer = section.footer
+        footer.is_linked_to_previous = False
+        p = footer.paragraphs[0] if footer.paragraphs else footer.add_paragraph()
+        p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        run = p.add_run(text)
+        run.font.size = Pt(7)
+        run.font.color.rgb = WARM_GRAY
+        run.font.name = "Calibri"
+
+
+def theme_hash(footer=None):
+    """Key of the compiled template: python-docx, the theme modules and the footer text."""
+    h = hashlib.sha256(docx.__version__.encode())
+    for name in THEME_MODULES:
+        with open(os.path.join(HERE, name + ".py"), "rb") as f:
+            h.update(f.read())
+    h.update(b"\0" + (footer or "").encode())
+    return h.hexdigest()[:16]
+
+
+def compile_theme(footer=None):
+    """The stock template with page setup, default font, named styles and footer, as .docx bytes."""
+    doc = Document()
+
+    # ── Page Setup ──
+    for section in doc.sections:
+        section.top_margin = Cm(2)
+        section.bottom_margin = Cm(2)
+        section.left_margin = Cm(2.5)
+        section.right_margin = Cm(2.5)
+
+    # ── Default Font ──
+    style = doc.styles["Normal"]
+    font = style.font
+    font.name = "Calibri"
+    font.size = Pt(10.5)
+    font.color.rgb = CHARCOAL
+
+    # ── Named Styles ──
+    register_styles(doc)
+
+    # ── Footer ──
+    if footer:
+        build_footer(doc, footer)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+@lru_cache(maxsize=None)
+def _base_package(footer=None, cache_dir=None):
+    """The compiled template, read from or written to cache_dir (None: in memory only)."""
+    path = os.path.join(cache_dir, f"theme-{theme_hash(footer)}.docx") if cache_dir else None
+    if path:
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            pass
+    data = compile_theme(footer)
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        write_if_changed(data, path)
+    return data
+
+
+def new_document(draft=False, footer=None, cache_dir=CACHE_DIR):
+    """Create an empty document with the page setup and default font (and
+    footer line, if given).
+
+    The template is compiled once per theme and cached in cache_dir; every
+    document is opened from that package in memory. Without a cache_dir one
+    footer-less template is compiled per process and the footer is added to
+    each document, which beats compiling a template per footer text.
+    A draft document tells the helpers to leave out decoration (see is_draft).
+    """
+    if cache_dir is None:
+        doc = Document(io.BytesIO(_base_package()))
+        if footer:
+            build_footer(doc, footer)
+    else:
+        doc = Document(io.BytesIO(_base_package(footer, cache_dir)))
+    doc.draft = draft
+    return doc
+
+
+def is_draft(doc):
+    """True for documents made by new_document(draft=True): preview builds
+    without cell decoration, accent bars, spacers or footer."""
+    return getattr(doc, "draft", False)
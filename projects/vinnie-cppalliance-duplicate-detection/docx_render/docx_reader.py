@@ -0,0 +1,302 @@
+"""
+Streaming reader that turns a (client-edited) .docx back into document tree nodes.
+
+read_nodes() streams word/document.xml straight out of the ZIP with
+lxml.etree.iterparse and clears every top-level paragraph or table once it
+has become a node, so memory stays flat however long the document is. The
+house styles map back to the helpers that wrote them, giving the same
+nodes ir.record() gives for the build_* function (see ir):
+
+    Title, Heading1-3            heading (level 0-3)      add_heading_styled
+    Body, unstyled text          paragraph (leading bold run: label)  add_body
+    Bullet, ListBullet, 2, 3     bullet (level from the indent)      add_bullet
+    Quote, Code                  quote, code              add_quote, add_code_block
+    CoverMeta                    meta                     add_cover_meta
+    36 / 20 pt cover lines       title, subtitle          add_cover_title/_subtitle
+    tables                       table (**bold** cells)   add_styled_table
+    bottom-bordered, empty, page-break-only paragraphs    rule, spacer, page_break
+
+Text the client bolded or italicized inside a paragraph keeps its **/*
+markers. Track changes (w:ins / w:del, w:moveTo / w:moveFrom, and on
+paragraph marks and table rows) are accepted (default), rejected, or kept
+as CriticMarkup ({++added++}, {--removed--}) with changes="markup"; stats
+counts them and their authors.
+ir_markdown then writes the nodes in the dialect md_to_docx compiles.
+"""
+
+import hashlib
+import os
+import zipfile
+
+from lxml import etree
+
+from .doc_styles import COVER_LINES
+from .ir_markdown import markdown_blocks
+from .reproducible import file_digest
+
+DOCUMENT_PART = "word/document.xml"
+CHANGES = ("accept", "reject", "markup")
+HEADING_STYLES = {"Title": 0, "Heading1": 1, "Heading2": 2, "Heading3": 3}
+BULLET_STYLES = {"Bullet": 0, "ListBullet": 0, "ListBullet2": 1, "ListBullet3": 2}
+# add_bullet indents level n to 720 + n * 360 twips
+BULLET_INDENT, BULLET_STEP = 720, 360
+COVER_SIZES = {str(size * 2): kind for kind, (size, _, _) in COVER_LINES.items()}
+CRITIC_MARKUP = {"ins": ("{++", "++}"), "del": ("{--", "--}")}
+
+W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def w(tag):
+    return f"{{{W}}}{tag}"
+
+
+_P, _TBL, _TR, _TC, _R = w("p"), w("tbl"), w("tr"), w("tc"), w("r")
+_T, _DEL_TEXT, _TAB, _BR, _CR = w("t"), w("delText"), w("tab"), w("br"), w("cr")
+_PPR, _RPR, _VAL = w("pPr"), w("rPr"), w("val")
+_CHANGE_TAGS = {w("ins"): "ins", w("moveTo"): "ins", w("del"): "del", w("moveFrom"): "del"}
+_OFF = ("0", "false", "off")
+
+
+def _on(rPr, tag):
+    el = rPr.find(w(tag)) if rPr is not None else None
+    return el is not None and el.get(_VAL) not in _OFF
+
+
+def _val(parent, path):
+    el = parent.find(path) if parent is not None else None
+    return None if el is None else el.get(_VAL)
+
+
+# ── Runs ──
+
+def _change(r, p, stats):
+    """"ins", "del" or None for a run, counting each tracked change once."""
+    el = r.getparent()
+    while el is not None and el is not p:
+        kind = _CHANGE_TAGS.get(el.tag)
+        if kind:
+            if stats is not None:
+                key = (kind, el.get(w("id")), el.get(w("author")))
+                if key not in stats["_seen"]:
+                    stats["_seen"].add(key)
+                    stats["insertions" if kind == "ins" else "deletions"] += 1
+                    if el.get(w("author")):
+                        stats["authors"].add(el.get(w("author")))
+            return kind
+        el = el.getparent()
+    return None
+
+
+def _segments(p, changes, stats):
+    """[(text, bold, italic, change)] of a paragraph's runs, tracked changes
+    applied; neighbouring runs formatted alike (Word splits runs on every
+    edit) are one segment."""
+    out = []
+    previous = None  # character style of out[-1]
+    for r in p.iter(_R):
+        change = _change(r, p, stats)
+        if change == "ins" and changes == "reject" or change == "del" and changes == "accept":
+            continue
+        if changes != "markup":
+            change = None
+        text = []
+        for child in r:
+            if child.tag in (_T, _DEL_TEXT):
+                text.append(child.text or "")
+            elif child.tag == _TAB:
+                text.append("\t")
+            elif child.tag == _CR or child.tag == _BR and child.get(w("type")) not in ("page", "column"):
+                text.append("\n")
+        if any(text):
+            rPr = r.find(_RPR)
+            segment = ("".join(text), _on(rPr, "b"), _on(rPr, "i"), change)
+            style = _val(rPr, w("rStyle"))
+            if out and out[-1][1:] == segment[1:] and style == previous:
+                segment = (out.pop()[0] + segment[0],) + segment[1:]
+            out.append(segment)
+            previous = style
+    return out
+
+
+def _compose(segments, emphasis=True):
+    """Text of the segments, with **/* around emphasized stretches (emphasis)
+    and CriticMarkup around tracked changes."""
+    parts = []
+    previous = None
+    for text, bold, italic, change in segments:
+        style = ((bold, italic) if emphasis else (False, False), change)
+        if parts and style == previous:
+            parts[-1][0] += text
+        else:
+            parts.append([text, style])
+        previous = style
+    out = []
+    for text, ((bold, italic), change) in parts:
+        marker = "*" * ((2 if bold else 0) + (1 if italic else 0))
+        if marker and text.strip():
+            lead, core, trail = text[:len(text) - len(text.lstrip())], text.strip(), text[len(text.rstrip()):]
+            text = f"{lead}{marker}{core}{marker}{trail}"
+        if change:
+            opening, closing = CRITIC_MARKUP[change]
+            text = f"{opening}{text}{closing}"
+        out.append(text)
+    return "".join(out)
+
+
+def _labelled(segments):
+    """(label, text, bold, italic): a leading bold run followed by more text is
+    the helpers' bold label; a paragraph all bold (or italic) is bold (italic)."""
+    if not segments:
+        return "", "", False, False
+    if all(bold for _, bold, _, _ in segments) or all(italic for _, _, italic, _ in segments):
+        bold = all(s[1] for s in segments)
+        italic = all(s[2] for s in segments)
+        return "", _compose([(t, b and not bold, i and not italic, c) for t, b, i, c in segments]), bold, italic
+    if segments[0][1] and not segments[0][3] and len(segments) > 1:
+        return segments[0][0], _compose(segments[1:]), False, False
+    return "", _compose(segments), False, False
+
+
+# ── Blocks ──
+
+def _dropped(props, changes):
+    """True if a paragraph mark or table row (by its rPr / trPr) is a tracked
+    insertion being rejected or a deletion being accepted."""
+    if props is None:
+        return False
+    return (changes == "accept" and props.find(w("del")) is not None
+            or changes == "reject" and props.find(w("ins")) is not None)
+
+
+def _paragraph(p, changes, stats):
+    """The node of a top-level paragraph, or None."""
+    pPr = p.find(_PPR)
+    style = _val(pPr, w("pStyle"))
+    segments = _segments(p, changes, stats)
+    text = "".join(s[0] for s in segments)
+    if not text.strip() and _dropped(pPr.find(_RPR) if pPr is not None else None, changes):
+        return None  # a paragraph added or removed whole
+    if style in HEADING_STYLES:
+        return {"type": "heading", "text": _compose(segments, emphasis=False).strip(), "level": HEADING_STYLES[style],
+                "page_break_before": pPr.find(w("pageBreakBefore")) is not None} if text.strip() else None
+    if style in BULLET_STYLES:
+        if not text.strip():
+            return None
+        indent = pPr.find(w("ind"))
+        level = BULLET_STYLES[style]
+        if indent is not None and indent.get(w("left")):
+            level = max(level, (int(indent.get(w("left"))) - BULLET_INDENT) // BULLET_STEP)
+        label, rest, _, _ = _labelled(segments)
+        return {"type": "bullet", "text": rest, "label": label, "level": level}
+    if style in ("Quote", "Code"):
+        return {"type": style.lower(), "text": _compose(segments, emphasis=False)} if text.strip() else None
+    if style == "CoverMeta":
+        label = "".join(s[0] for s in segments[:1]).rstrip().rstrip(":")
+        return {"type": "meta", "label": label, "value": _compose(segments[1:], emphasis=False).strip()}
+    if not text.strip():
+        if any(br.get(w("type")) == "page" for br in p.iter(_BR)):
+            return {"type": "page_break"}
+        bottom = pPr.find(f"{w('pBdr')}/{w('bottom')}") if pPr is not None else None
+        if bottom is not None:
+            return {"type": "rule", "weight": int(bottom.get(w("sz"), "12"))}
+        after = pPr.find(w("spacing")) if pPr is not None else None
+        return {"type": "spacer", "space_after": int(after.get(w("after"), "0")) // 20 if after is not None else 0}
+    if style is None:
+        r = p.find(f".//{_R}")
+        kind = COVER_SIZES.get(_val(r.find(_RPR), w("sz"))) if r is not None else None
+        if kind:
+            return {"type": kind, "text": _compose(segments, emphasis=False)}
+    label, rest, bold, italic = _labelled(segments)
+    return {"type": "paragraph", "text": rest, "label": label, "bold": bold, "italic": italic, "color": None}
+
+
+def _cell_text(tc, changes, stats, emphasis):
+    return "\n".join(_compose(_segments(p, changes, stats), emphasis) for p in tc.iter(_P)).strip()
+
+
+def _row(tr, changes, stats, header):
+    return [_cell_text(tc, changes, stats, not header) for tc in tr.findall(_TC)]
+
+
+def _table(rows, repeat_header):
+    """The node of a top-level table from its rows' cell texts (nested tables
+    flatten into their cell's text)."""
+    if not rows:
+        return None
+    return {"type": "table", "headers": rows[0], "rows": rows[1:], "col_widths": None,
+            "repeat_header": repeat_header}
+
+
+def _release(el):
+    """Free a processed block and everything before it."""
+    el.clear(keep_tail=True)
+    parent = el.getparent()
+    while el.getprevious() is not None:
+        del parent[0]
+
+
+def new_stats():
+    return {"blocks": 0, "tables": 0, "insertions": 0, "deletions": 0, "authors": set(), "_seen": set()}
+
+
+def read_nodes(path, changes="accept", stats=None):
+    """Yield the document tree nodes of the .docx at path, streaming.
+
+    changes is "accept", "reject" or "markup" (CriticMarkup); stats, a
+    new_stats() dict, is filled with block, table and change counts.
+    """
+    if changes not in CHANGES:
+        raise ValueError(f"changes must be one of {', '.join(CHANGES)}, not {changes!r}")
+    with zipfile.ZipFile(path) as z, z.open(DOCUMENT_PART) as f:
+        depth = {_P: 0, _TBL: 0, _TR: 0}
+        rows, repeat_header = [], False
+        for event, el in etree.iterparse(f, events=("start", "end"), tag=(_P, _TBL, _TR)):
+            if event == "start":
+                depth[el.tag] += 1
+                continue
+            depth[el.tag] -= 1
+            if el.tag == _TR:
+                # Rows of a top-level table become text as they close, so a long table stays small too
+                if depth[_TBL] == 1 and not depth[_P] and not _dropped(el.find(w("trPr")), changes):
+                    if not rows:
+                        repeat_header = el.find(f"{w('trPr')}/{w('tblHeader')}") is not None
+                    rows.append(_row(el, changes, stats, header=not rows))
+                    _release(el)
+                continue
+            # Paragraphs in tables and text boxes belong to their table / paragraph
+            if depth[_TBL] or depth[_P]:
+                continue
+            if el.tag == _TBL:
+                node = _table(rows, repeat_header)
+                rows = []
+            else:
+                node = _paragraph(el, changes, stats)
+            _release(el)
+            if node is not None:
+                if stats is not None:
+                    stats["blocks"] += 1
+                    stats["tables"] += node["type"] == "table"
+                yield node
+
+
+def write_markdown(path, out, changes="accept"):
+    """Write the .docx at path to out as Markdown, streamed and atomically.
+
+    Returns (written, stats); written is False when out already held the same text.
+    """
+    stats = new_stats()
+    h = hashlib.sha256()
+    tmp = f"{out}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+            for block in markdown_blocks(read_nodes(path, changes, stats)):
+                f.write(block)
+                h.update(block.encode("utf-8"))
+    except BaseException:
+        os.remove(tmp)
+        raise
+    if file_digest(out) == h.hexdigest():
+        os.remove(tmp)
+        return False, stats
+    os.replace(tmp, out)
+    return True, stats
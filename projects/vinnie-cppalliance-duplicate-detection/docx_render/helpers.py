@@ -0,0 +1,202 @@
+"""
+Styling helpers shared by every deliverable (generators and Markdown compiler).
+
+Each helper appends one block in the house style. Fonts, sizes and colors
+come from the named styles in doc_styles; a helper only adds what differs
+per block (borders, shading, indents, a bold label). Purely decorative blocks
+(accent bars, spacers) are skipped in draft documents. Handed an ir.Tree
+instead of a document, each helper appends its node to the tree (see ir).
+"""
+
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import Pt
+
+from .doc_styles import (
+    ACCENT_BAR_COLOR, COVER_LINES, append_paragraph, is_draft, styled_paragraph, styled_run,
+)
+from .ir import is_tree
+from .oxml_fragments import fragment
+from .column_widths import width_spec
+from .oxml_table import StyledTableWriter, styled_table
+from .table_source import table_source
+
+
+def set_cell_bg(cell, color_hex):
+    """Set background color of a table cell."""
+    cell._tc.get_or_add_tcPr().append(fragment("shd", color_hex))
+
+
+def set_cell_borders(cell, color="B0BEC5", sz="4"):
+    """Set thin borders on a cell."""
+    cell._tc.get_or_add_tcPr().append(fragment("tcBorders", color, sz))
+
+
+def set_page_break_before(paragraph):
+    """Start this paragraph on a new page WITHOUT adding an empty paragraph.
+    Unlike doc.add_page_break(), this never creates blank pages."""
+    if isinstance(paragraph, dict):
+        paragraph["page_break_before"] = True
+        return
+    pPr = paragraph._p.get_or_add_pPr()
+    pPr.append(fragment("pageBreakBefore"))
+
+
+def add_styled_table(doc, headers, rows, col_widths=None, formats=None, repeat_header=False):
+    """Add a beautifully styled table (built in one lxml pass, see oxml_table).
+
+    rows may be a list, a lazy iterable of rows or a columnar source (DataFrame,
+    NumPy array, Arrow table, {header: column}); headers=None takes its column
+    names. col_widths is in cm, or "auto" / None entries to size columns from
+    their text (see column_widths). formats maps a column to a format spec,
+    mapping or callable (see table_source); repeat_header repeats the header
+    row on every page.
+    """
+    headers, rows = table_source(rows, headers, formats)
+    if is_tree(doc):
+        return doc.append("table", headers=headers, rows=[list(r) for r in rows],
+                          col_widths=width_spec(col_widths), repeat_header=repeat_header)
+    return styled_table(doc, headers, rows, col_widths, repeat_header)
+
+
+def open_styled_table(doc, headers, col_widths=None, formats=None, repeat_header=True):
+    """Start a styled table to append rows to in chunks as they arrive:
+
+        with open_styled_table(doc, ["PR", "Comments"], formats={"Comments": ","}) as table:
+            for batch in cursor_batches():
+                table.append(batch)
+    """
+    return StyledTableWriter(doc, headers, col_widths, formats, repeat_header)
+
+
+def add_accent_bar(doc, sz="12"):
+    """Add a thin colored accent line (sz in eighths of a point)."""
+    if is_tree(doc):
+        return doc.append("rule", weight=int(sz))
+    if is_draft(doc):
+        return None
+    p = append_paragraph(doc)
+    p.alignment = WD_ALIGN_PARAGRAPH.LEFT
+    # Use a colored horizontal rule via border
+    pPr = p._p.get_or_add_pPr()
+    pPr.append(fragment("pBorders.bottom", ACCENT_BAR_COLOR, sz))
+    p.paragraph_format.space_after = Pt(6)
+    return p
+
+
+def add_spacer(doc, space_after=4):
+    """Add an empty spacer paragraph (e.g. after a table)."""
+    if is_tree(doc):
+        return doc.append("spacer", space_after=space_after)
+    if is_draft(doc):
+        return None
+    p = append_paragraph(doc)
+    p.paragraph_format.space_after = Pt(space_after)
+    return p
+
+
+def add_heading_styled(doc, text, level=1):
+    """Add a styled heading with McKinsey colors (Heading 1-3 styles)."""
+    if is_tree(doc):
+        return doc.append("heading", text=text, level=level, page_break_before=False)
+    return styled_paragraph(doc, f"Heading{level}" if level else "Title", text)
+
+
+def add_body(doc, text, bold=False, italic=False, color=None, bold_prefix=""):
+    """Add body paragraph, optionally led by a bold label."""
+    if is_tree(doc):
+        return doc.append("paragraph", text=text, label=bold_prefix, bold=bold, italic=italic, color=color)
+    p = styled_paragraph(doc, "Body")
+    if bold_prefix:
+        run = p.add_run(bold_prefix)
+        run.bold = True
+        if color:
+            run.font.color.rgb = color
+    run = p.add_run(text)
+    if color:
+        run.font.color.rgb = color
+    if bold:
+        run.bold = True
+    if italic:
+        run.italic = True
+    return p
+
+
+def add_quote(doc, text):
+    """Add a styled blockquote."""
+    if is_tree(doc):
+        return doc.append("quote", text=text)
+    p = styled_paragraph(doc, "Quote")
+    pPr = p._p.get_or_add_pPr()
+    # Left border accent
+    pPr.append(fragment("pBorders.left", ACCENT_BAR_COLOR, "24"))
+    # Indent
+    pPr.append(fragment("ind", size="720"))
+
+    p.add_run(text)
+    return p
+
+
+def add_code_block(doc, text):
+    """Add a monospaced code block with gray background."""
+    if is_tree(doc):
+        return doc.append("code", text=text)
+    p = styled_paragraph(doc, "Code")
+    pPr = p._p.get_or_add_pPr()
+    pPr.append(fragment("shd", "F5F5F5"))
+    # Add border
+    pPr.append(fragment("pBorders.box", "DDDDDD", "4"))
+
+    p.add_run(text)
+    return p
+
+
+def add_bullet(doc, text, level=0, bold_prefix=""):
+    """Add a bullet point, optionally led by a bold label."""
+    if is_tree(doc):
+        return doc.append("bullet", text=text, label=bold_prefix, level=level)
+    p = styled_paragraph(doc, "Bullet")
+    if bold_prefix:
+        p.add_run(bold_prefix).bold = True
+    p.add_run(text)
+    if level > 0:
+        pPr = p._p.get_or_add_pPr()
+        pPr.append(fragment("ind", size=720 + level * 360))
+    return p
+
+
+def _cover_line(doc, kind, text):
+    size, color, bold = COVER_LINES[kind]
+    p = append_paragraph(doc)
+    p.alignment = WD_ALIGN_PARAGRAPH.LEFT
+    run = p.add_run(text)
+    run.font.size = Pt(size)
+    run.font.color.rgb = color
+    run.font.name = "Calibri"
+    if bold:
+        run.bold = True
+    return p
+
+
+def add_cover_title(doc, text):
+    """Add the cover page title (36 pt bold navy)."""
+    if is_tree(doc):
+        return doc.append("title", text=text)
+    return _cover_line(doc, "title", text)
+
+
+def add_cover_subtitle(doc, text):
+    """Add the cover page subtitle (20 pt electric blue; newlines break lines)."""
+    if is_tree(doc):
+        return doc.append("subtitle", text=text)
+    return _cover_line(doc, "subtitle", text)
+
+
+def add_cover_meta(doc, label, value):
+    """Add a "Label:  value" line of the cover page's meta block."""
+    if is_tree(doc):
+        return doc.append("meta", label=label, value=value)
+    p = styled_paragraph(doc, "CoverMeta")
+    p.alignment = WD_ALIGN_PARAGRAPH.LEFT
+    styled_run(p, f"{label}:  ", "CoverMetaLabel")
+    p.add_run(value)
+    return p
@@ -0,0 +1,95 @@
+"""
+Format-neutral document tree behind the DOCX, HTML and Markdown output.
+
+A Tree stands in for the python-docx document: handed to a build_* function
+(or md_to_docx.compile_markdown), the styling helpers append one node per
+block instead of writing XML. Nodes are plain dicts, so a tree can be cached
+or sent to the review dashboard as JSON:
+
+    {"type": "heading", "text": "Executive Summary", "level": 1}
+    {"type": "paragraph", "text": "...", "label": "Note: ", "bold": False,
+     "italic": False, "color": "GREEN_ACCENT"}
+
+Colors are palette tokens (doc_styles.PALETTE), or RRGGBB hex for a color
+off the palette (color_hex() resolves both); styles are the named styles
+of doc_styles. Node types and fields, one per helper:
+
+    title, subtitle        text                          add_cover_title/_subtitle
+    meta                   label, value                  add_cover_meta
+    heading                text, level, page_break_before  add_heading_styled
+    paragraph              text, label, bold, italic, color  add_body
+    bullet                 text, label, level            add_bullet
+    quote, code            text                          add_quote, add_code_block
+    table                  headers, rows, col_widths     add_styled_table,
+                           (cm, "auto" or None), repeat_header  open_styled_table
+    rule                   weight (eighths of a point)   add_accent_bar
+    spacer                 space_after (pt)              add_spacer
+    page_break                                           doc.add_page_break()
+
+A backend turns the node list into one output format: ir_docx replays it
+through the same helpers onto a real document (the generators' only DOCX
+path, so all formats come from one tree), ir_html writes a self-contained
+preview page and ir_markdown Markdown that md_to_docx compiles back.
+"""
+
+import importlib
+
+from .doc_styles import PALETTE
+from .reproducible import write_if_changed
+
+_TOKENS = {hex_: name for name, hex_ in PALETTE.items()}
+
+# format: (backend module, function(nodes) -> str)
+BACKENDS = {
+    "html": ("ir_html", "to_html"),
+    "md": ("ir_markdown", "to_markdown"),
+}
+
+
+class Tree:
+    """The nodes of one document, appended by the styling helpers."""
+
+    def __init__(self):
+        self.nodes = []
+
+    def append(self, node_type, **fields):
+        """Append a node; an RGBColor under "color" becomes its palette token
+        (or stays RRGGBB hex when it is not on the palette)."""
+        color = fields.get("color")
+        if color is not None:
+            fields["color"] = _TOKENS.get(str(color), str(color))
+        node = {"type": node_type, **fields}
+        self.nodes.append(node)
+        return node
+
+    def add_page_break(self):
+        return self.append("page_break")
+
+
+def color_hex(color):
+    """RRGGBB of a node color: a palette token or already hex."""
+    return PALETTE.get(color, color)
+
+
+def is_tree(doc):
+    return isinstance(doc, Tree)
+
+
+def record(builds):
+    """A Tree filled by each build(tree) in order."""
+    tree = Tree()
+    for build in builds:
+        build(tree)
+    return tree
+
+
+def export(nodes, fmt):
+    """nodes rendered by the fmt backend ("html" or "md") as text."""
+    module, function = BACKENDS[fmt]
+    return getattr(importlib.import_module(f".{module}", __package__), function)(nodes)
+
+
+def write_export(nodes, fmt, out):
+    """Write nodes as fmt to out atomically; False if out was already identical."""
+    written, _ = write_if_changed(export(nodes, fmt).encode("utf-8"), out)
+    return written
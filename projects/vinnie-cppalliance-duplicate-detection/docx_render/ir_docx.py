@@ -0,0 +1,67 @@
+"""
+DOCX backend of the document tree: every node replayed through its helper.
+
+emit() makes exactly the helper calls the build_* function made on the tree,
+so a document rendered through the tree is the document the build_* function
+would have written directly (draft documents still drop the decoration).
+docx_sections() wraps build_* sections for build_document(): each section is
+recorded into a Tree and emitted, which keeps the section cache and the
+worker processes working as before.
+"""
+
+import functools
+
+from docx.shared import RGBColor
+
+from .helpers import (
+    add_accent_bar, add_body, add_bullet, add_code_block, add_cover_meta, add_cover_subtitle,
+    add_cover_title, add_heading_styled, add_quote, add_spacer, add_styled_table, set_page_break_before,
+)
+from .ir import Tree, color_hex
+
+
+def _heading(doc, node):
+    p = add_heading_styled(doc, node["text"], node["level"])
+    if node["page_break_before"]:
+        set_page_break_before(p)
+
+
+def _paragraph(doc, node):
+    color = RGBColor.from_string(color_hex(node["color"])) if node["color"] else None
+    add_body(doc, node["text"], bold=node["bold"], italic=node["italic"], color=color, bold_prefix=node["label"])
+
+
+EMITTERS = {
+    "title": lambda doc, n: add_cover_title(doc, n["text"]),
+    "subtitle": lambda doc, n: add_cover_subtitle(doc, n["text"]),
+    "meta": lambda doc, n: add_cover_meta(doc, n["label"], n["value"]),
+    "heading": _heading,
+    "paragraph": _paragraph,
+    "bullet": lambda doc, n: add_bullet(doc, n["text"], level=n["level"], bold_prefix=n["label"]),
+    "quote": lambda doc, n: add_quote(doc, n["text"]),
+    "code": lambda doc, n: add_code_block(doc, n["text"]),
+    "table": lambda doc, n: add_styled_table(doc, n["headers"], n["rows"], n["col_widths"],
+                                             repeat_header=n["repeat_header"]),
+    "rule": lambda doc, n: add_accent_bar(doc, sz=str(n["weight"])),
+    "spacer": lambda doc, n: add_spacer(doc, n["space_after"]),
+    "page_break": lambda doc, n: doc.add_page_break(),
+}
+
+
+def emit(nodes, doc):
+    """Append the nodes to doc."""
+    for node in nodes:
+        EMITTERS[node["type"]](doc, node)
+    return doc
+
+
+def render_build(build, doc):
+    """Section render: record build into a Tree, then emit it onto doc."""
+    tree = Tree()
+    build(tree)
+    emit(tree.nodes, doc)
+
+
+def docx_sections(sections):
+    """(name, source, render) sections of build_* functions, rendered through the tree."""
+    return [(name, source, functools.partial(render_build, build)) for name, source, build in sections]
@@ -0,0 +1,177 @@
+"""
+HTML backend of the document tree: one self-contained page for live preview.
+
+The stylesheet is derived from the named styles and palette of doc_styles,
+so the preview follows the Word styling without a second set of colors.
+Nothing is loaded from outside the page (no fonts, scripts or images).
+Page breaks show as dashed rules on screen and break pages when printed.
+"""
+
+from functools import lru_cache
+from html import escape
+
+from .doc_styles import (
+    ACCENT_BAR_COLOR, CHARACTER_STYLES, COVER_LINES, PALETTE, PARAGRAPH_STYLES,
+    TBL_ALT_BG, TBL_BORDER_COLOR, TBL_HEADER_BG,
+)
+from .ir import color_hex
+
+# Letter page with the 2.5 cm side margins of doc_styles
+PAGE_WIDTH = "21.59cm"
+SIDE_MARGIN = "2.5cm"
+HEADING_TAGS = {"Heading 1": "h1", "Heading 2": "h2", "Heading 3": "h3"}
+
+
+def _font_css(spec):
+    _, font, size, color, bold, italic = spec
+    css = f"font-family: {font}, sans-serif; font-size: {size}pt; color: #{color};"
+    if bold is not None:
+        css += f" font-weight: {'bold' if bold else 'normal'};"
+    if italic is not None:
+        css += f" font-style: {'italic' if italic else 'normal'};"
+    return css
+
+
+@lru_cache(maxsize=None)
+def stylesheet():
+    """CSS for the named styles, cover lines, tables and decorations."""
+    rules = [
+        "body { margin: 0; background: #E9ECEF; }",
+        f"main {{ box-sizing: border-box; max-width: {PAGE_WIDTH}; margin: 1.5em auto; "
+        f"padding: 2cm {SIDE_MARGIN}; background: #FFFFFF; font-family: Calibri, sans-serif; "
+        f"font-size: 10.5pt; color: #{PALETTE['CHARCOAL']}; }}",
+        "p { margin: 0 0 4pt; }",
+        "h1, h2, h3 { margin: 12pt 0 4pt; }",
+        "h1.Title { font-size: 26pt; color: #" + PALETTE["NAVY"] + "; }",
+    ]
+    for name, spec in PARAGRAPH_STYLES.items():
+        selector = HEADING_TAGS.get(name) or "." + name.replace(" ", "")
+        rules.append(f"{selector} {{ {_font_css(spec)} }}")
+    for name, spec in CHARACTER_STYLES.items():
+        rules.append(f".{name} {{ {_font_css(spec)} }}")
+    for kind, (size, color, bold) in COVER_LINES.items():
+        rules.append(f".cover-{kind} {{ font-size: {size}pt; color: #{color}; "
+                     f"font-weight: {'bold' if bold else 'normal'}; margin: 0 0 4pt; }}")
+    rules += [
+        "ul.Bullet { margin: 0 0 4pt; padding-left: 0.5in; }",
+        f"blockquote.Quote {{ margin: 0 0 8pt; padding-left: 0.5in; border-left: 3pt solid #{ACCENT_BAR_COLOR}; }}",
+        "pre.Code { margin: 0 0 6pt; padding: 4pt; white-space: pre-wrap; background: #F5F5F5; "
+        "border: 0.5pt solid #DDDDDD; }",
+        "table.StyledTable { margin: 0 auto 4pt; border-collapse: collapse; }",
+        f"table.StyledTable td {{ padding: 2pt 4pt; vertical-align: top; border: 0.5pt solid #{TBL_BORDER_COLOR}; }}",
+        f"table.StyledTable th {{ padding: 2pt 4pt; text-align: left; vertical-align: top; "
+        f"background: #{TBL_HEADER_BG}; border: 0.75pt solid #{TBL_HEADER_BG}; }}",
+        f"table.StyledTable tbody tr:nth-child(even) td {{ background: #{TBL_ALT_BG}; }}",
+        f"hr.accent {{ margin: 0 0 6pt; border: 0; border-top: solid #{ACCENT_BAR_COLOR}; }}",
+        "div.page-break { margin: 2em -" + SIDE_MARGIN + "; border-top: 1px dashed #" + TBL_BORDER_COLOR + "; }",
+        "@media print { main { margin: 0; padding: 0; } "
+        "div.page-break { break-after: page; border: 0; margin: 0; } .break-before { break-before: page; } }",
+    ]
+    return "\n".join(rules)
+
+
+def _text(text):
+    return escape(text, quote=False).replace("\n", "<br>")
+
+
+def _run(text, bold=False, italic=False, color=None):
+    html = _text(text)
+    if bold:
+        html = f"<strong>{html}</strong>"
+    if italic:
+        html = f"<em>{html}</em>"
+    if color:
+        html = f'<span style="color: #{color_hex(color)}">{html}</span>'
+    return html
+
+
+def _cell(value):
+    text = str(value)
+    if text.startswith("**") and text.endswith("**"):
+        return f"<strong>{_text(text.strip('*'))}</strong>"
+    return _text(text)
+
+
+def _table(node):
+    headers = node["headers"]
+    out = ['<table class="StyledTable">']
+    if isinstance(node["col_widths"], list):
+        # Measured columns ("auto", None or (min, max) entries) are left to the browser's auto layout
+        out.append("<colgroup>" + "".join(f'<col style="width: {w}cm">' if isinstance(w, (int, float)) else "<col>"
+                                          for w in node["col_widths"]) + "</colgroup>")
+    out.append('<thead><tr>' + "".join(f'<th class="TableHeader">{_text(str(h))}</th>' for h in headers)
+               + "</tr></thead><tbody>")
+    for row in node["rows"]:
+        cells = [f'<td class="TableCell">{_cell(v)}</td>' for v in row]
+        cells += ["<td></td>"] * (len(headers) - len(cells))
+        out.append("<tr>" + "".join(cells) + "</tr>")
+    out.append("</tbody></table>")
+    return "".join(out)
+
+
+def _block(node):
+    kind = node["type"]
+    if kind in ("title", "subtitle"):
+        return f'<p class="cover-{kind}">{_text(node["text"])}</p>'
+    if kind == "meta":
+        return (f'<p class="CoverMeta"><span class="CoverMetaLabel">{_text(node["label"])}:&nbsp; </span>'
+                f'{_text(node["value"])}</p>')
+    if kind == "heading":
+        level = node["level"]
+        tag, cls = (f"h{level}", "") if level else ("h1", "Title")
+        if node["page_break_before"]:
+            cls = (cls + " break-before").strip()
+        attr = f' class="{cls}"' if cls else ""
+        return f"<{tag}{attr}>{_text(node['text'])}</{tag}>"
+    if kind == "paragraph":
+        label = _run(node["label"], True, False, node["color"]) if node["label"] else ""
+        return f'<p class="Body">{label}{_run(node["text"], node["bold"], node["italic"], node["color"])}</p>'
+    if kind == "quote":
+        return f'<blockquote class="Quote">{_text(node["text"])}</blockquote>'
+    if kind == "code":
+        return f'<pre class="Code">{escape(node["text"], quote=False)}</pre>'
+    if kind == "table":
+        return _table(node)
+    if kind == "rule":
+        return f'<hr class="accent" style="border-top-width: {node["weight"] / 8:g}pt">'
+    if kind == "spacer":
+        return f'<div style="height: {node["space_after"]}pt"></div>'
+    if kind == "page_break":
+        return '<div class="page-break"></div>'
+    raise ValueError(f"unknown node type {kind!r}")
+
+
+def _bullet(node):
+    label = f"<strong>{_text(node['label'])}</strong>" if node["label"] else ""
+    style = f' style="margin-left: {node["level"] * 0.25:g}in"' if node["level"] else ""
+    return f"<li{style}>{label}{_text(node['text'])}</li>"
+
+
+def document_title(nodes):
+    """Text of the first title or heading node."""
+    for node in nodes:
+        if node["type"] in ("title", "heading"):
+            return node["text"].replace("\n", " ")
+    return ""
+
+
+def to_html(nodes):
+    """The nodes as one self-contained HTML page."""
+    out = []
+    in_list = False
+    for node in nodes:
+        if node["type"] == "bullet":
+            if not in_list:
+                out.append('<ul class="Bullet">')
+                in_list = True
+            out.append(_bullet(node))
+            continue
+        if in_list:
+            out.append("</ul>")
+            in_list = False
+        out.append(_block(node))
+    if in_list:
+        out.append("</ul>")
+    return (f'<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+            f"<title>{_text(document_title(nodes))}</title>\n<style>\n{stylesheet()}\n</style>\n</head>\n"
+            f"<body>\n<main>\n" + "\n".join(out) + "\n</main>\n</body>\n</html>\n")
@@ -0,0 +1,87 @@
+"""
+Markdown backend of the document tree, in the dialect md_to_docx compiles.
+
+Headings map back the way md_to_docx maps them forward (level 1 is ##, which
+starts a page, level 2 is ###, level 3 is ####; the cover title is #), so a
+generator's Markdown export can be diffed against the hand-written source or
+compiled back to DOCX. Colors, accent bars, spacers and page breaks have no
+Markdown form and are dropped.
+"""
+
+
+def _escape_cell(text):
+    return str(text).replace("|", "\\|").replace("\n", "<br>")
+
+
+def _inline(text, bold=False, italic=False):
+    if not text:
+        return ""
+    marker = "*" * ((2 if bold else 0) + (1 if italic else 0))
+    return f"{marker}{text}{marker}".replace("\n", "  \n")
+
+
+def _labelled(label, text, bold=False, italic=False):
+    """**label** text, as split_label() in md_to_docx reads it back: the
+    label's trailing space and the text follow verbatim, as in the document."""
+    body = _inline(text, bold, italic)
+    if not label.strip():
+        return body
+    return f"**{label.strip()}**" + (label[len(label.rstrip()):] + body if body else "")
+
+
+def _table(node):
+    headers = node["headers"]
+    width = len(headers)
+    lines = ["| " + " | ".join(_escape_cell(h) for h in headers) + " |",
+             "|" + "---|" * width]
+    for row in node["rows"]:
+        cells = [_escape_cell(v) for v in row] + [""] * (width - len(row))
+        lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines)
+
+
+def _block(node):
+    """Markdown of one node, or None for nodes without a Markdown form."""
+    kind = node["type"]
+    if kind == "title":
+        return "# " + node["text"].replace("\n", " ")
+    if kind == "subtitle":
+        return _inline(node["text"])
+    if kind == "meta":
+        return f"**{node['label']}:** {node['value']}"
+    if kind == "heading":
+        return "#" * (node["level"] + 1) + " " + node["text"]
+    if kind == "paragraph":
+        return _labelled(node["label"], node["text"], node["bold"], node["italic"])
+    if kind == "bullet":
+        return "  " * node["level"] + "- " + _labelled(node["label"], node["text"])
+    if kind == "quote":
+        return "\n".join("> " + line for line in node["text"].split("\n"))
+    if kind == "code":
+        fence = "~~~" if "```" in node["text"] else "```"
+        return f"{fence}\n{node['text']}\n{fence}"
+    if kind == "table":
+        return _table(node)
+    if kind in ("rule", "spacer", "page_break"):
+        return None
+    raise ValueError(f"unknown node type {kind!r}")
+
+
+def markdown_blocks(nodes):
+    """The Markdown of the nodes piece by piece, for streaming writers
+    (docx_reader); consecutive bullets form one list."""
+    previous = None
+    for node in nodes:
+        text = _block(node)
+        if text is None:
+            continue
+        if previous is not None:
+            yield "\n" if previous == "bullet" == node["type"] else "\n\n"
+        yield text
+        previous = node["type"]
+    yield "\n"
+
+
+def to_markdown(nodes):
+    """The nodes as Markdown."""
+    return "".join(markdown_blocks(nodes))
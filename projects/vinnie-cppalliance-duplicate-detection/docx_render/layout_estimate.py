@@ -0,0 +1,515 @@
+"""
+Page-count and layout estimate for a generated document, without Word.
+
+estimate_layout() walks the body once: every paragraph is line-broken with
+Calibri / Consolas advance-width tables (cached per font, size and weight)
+at the width left by the page margins, indents and table cell widths, then
+stacked onto pages with the paragraph spacing, keepNext / keepLines,
+pageBreakBefore, page breaks, widow/orphan control and repeated header rows
+the way Word applies them. It reports pages per section and headings left
+stranded at the bottom of a page. Widths are metric approximations, so page
+numbers are estimates, but a full build is walked in a few milliseconds.
+
+apply_keep_hints() adds the keep-with-next / keep-together hints that used
+to be set by hand: a heading stays with a short list under it, a lead-in
+paragraph with its table, a table's header row with its first data row, and
+code blocks and quotes are not split.
+"""
+
+import unicodedata
+from functools import lru_cache
+
+from docx.oxml.ns import qn
+from docx.section import Section
+
+# ── Font Metrics ──
+# Advance widths in 1/1000 em for ASCII 32-126 (space .. ~)
+_CALIBRI_WIDTHS = [
+    226, 326, 401, 498, 507, 715, 682, 221, 303, 303, 498, 498, 250, 306, 252, 386,
+    507, 507, 507, 507, 507, 507, 507, 507, 507, 507, 268, 268, 498, 498, 498, 463,
+    894, 579, 544, 533, 615, 488, 459, 631, 623, 252, 319, 520, 420, 855, 646, 662,
+    517, 673, 543, 459, 487, 642, 567, 890, 519, 487, 468, 307, 386, 307, 498, 498,
+    291, 479, 525, 423, 525, 498, 305, 471, 525, 230, 239, 455, 230, 799, 525, 527,
+    525, 525, 349, 391, 335, 525, 452, 715, 433, 453, 395, 314, 460, 314, 498,
+]
+FONT_METRICS = {
+    # font: (advance widths, line height as a multiple of the font size)
+    "Calibri": (dict(zip(map(chr, range(32, 127)), _CALIBRI_WIDTHS)), 1.22),
+    "Consolas": (dict.fromkeys(map(chr, range(32, 127)), 550), 1.17),
+}
+DEFAULT_FONT = "Calibri"
+THEME_FONTS = {"minorHAnsi": "Calibri", "majorHAnsi": "Cambria"}
+BOLD_FACTOR = 1.035     # Calibri Bold runs about 3.5% wider
+FALLBACK_WIDTH = 500    # non-Latin glyphs without a table entry
+WIDE_WIDTH = 1000       # East Asian wide glyphs
+
+TAB_STOP = 36.0         # pt, settings.xml defaultTabStop 720
+CELL_MARGINS = 10.8     # pt, default left + right cell margins (0.08" each)
+LIST_INDENT = 18.0      # pt per list level (numbering w:ind left 360)
+MAX_KEPT_LIST = 6       # longest list kept together with its heading
+
+_P, _TBL, _TR, _TC, _R = qn("w:p"), qn("w:tbl"), qn("w:tr"), qn("w:tc"), qn("w:r")
+_T, _TAB, _BR, _CR = qn("w:t"), qn("w:tab"), qn("w:br"), qn("w:cr")
+_PPR, _RPR, _PSTYLE, _RSTYLE = qn("w:pPr"), qn("w:rPr"), qn("w:pStyle"), qn("w:rStyle")
+_VAL, _TYPE = qn("w:val"), qn("w:type")
+_PPR_FLAGS = [(tag, qn(f"w:{tag}")) for tag in ("keepNext", "keepLines", "pageBreakBefore", "contextualSpacing")]
+_SPACING, _LINE_RULE = qn("w:spacing"), qn("w:lineRule")
+_SPACING_ATTRS = [(attr, qn(f"w:{attr}")) for attr in ("before", "after", "line")]
+_IND = qn("w:ind")
+_IND_ATTRS = [(qn("w:left"), "ind_left"), (qn("w:start"), "ind_left"),
+              (qn("w:right"), "ind_right"), (qn("w:end"), "ind_right")]
+_W, _GRID_COL, _TCW_PATH = qn("w:w"), qn("w:gridCol"), f"{qn('w:tcPr')}/{qn('w:tcW')}"
+_KEEP_NEXT = qn("w:keepNext")
+_RANGE_MARKS = (qn("w:bookmarkStart"), qn("w:bookmarkEnd"))  # section bookmarks (section_cache)
+_NUMPR, _ILVL, _PBDR = qn("w:numPr"), qn("w:ilvl"), qn("w:pBdr")
+_RFONTS, _ASCII, _ASCII_THEME, _SZ, _B = qn("w:rFonts"), qn("w:ascii"), qn("w:asciiTheme"), qn("w:sz"), qn("w:b")
+
+
+@lru_cache(maxsize=None)
+def advance_widths(font, size, bold=False):
+    """{char: width in pt} for one font, size and weight."""
+    table, _ = FONT_METRICS.get(font, FONT_METRICS[DEFAULT_FONT])
+    scale = size / 1000 * (BOLD_FACTOR if bold else 1)
+    return {ch: w * scale for ch, w in table.items()}
+
+
+def _glyph_width(ch, font):
+    table, _ = FONT_METRICS.get(font, FONT_METRICS[DEFAULT_FONT])
+    base = unicodedata.normalize("NFKD", ch)[:1]
+    if base in table:
+        return table[base]
+    return WIDE_WIDTH if unicodedata.east_asian_width(ch) in "WF" else FALLBACK_WIDTH
+
+
+@lru_cache(maxsize=65536)
+def text_width(text, font, size, bold=False):
+    """Width of text in pt."""
+    widths = advance_widths(font, size, bold)
+    scale = size / 1000 * (BOLD_FACTOR if bold else 1)
+    return sum(widths[ch] if ch in widths else _glyph_width(ch, font) * scale for ch in text)
+
+
+def line_height(font, size, spacing):
+    """Height of one line for the paragraph's w:spacing line / lineRule."""
+    natural = size * FONT_METRICS.get(font, FONT_METRICS[DEFAULT_FONT])[1]
+    line, rule = spacing
+    if line is None:
+        return natural
+    if rule == "exact":
+        return line / 20
+    if rule == "atLeast":
+        return max(natural, line / 20)
+    return natural * line / 240
+
+
+# ── Style Resolution ──
+
+def _on(el):
+    return el is not None and el.get(_VAL, "1") not in ("0", "false", "off")
+
+
+def _overlay_ppr(props, pPr):
+    if pPr is None:
+        return
+    for key, tag in _PPR_FLAGS:
+        el = pPr.find(tag)
+        if el is not None:
+            props[key] = _on(el)
+    spacing = pPr.find(_SPACING)
+    if spacing is not None:
+        for key, attr in _SPACING_ATTRS:
+            val = spacing.get(attr)
+            if val is not None:
+                props[key] = int(val)
+        if spacing.get(_LINE_RULE):
+            props["lineRule"] = spacing.get(_LINE_RULE)
+    ind = pPr.find(_IND)
+    if ind is not None:
+        for attr, key in _IND_ATTRS:
+            val = ind.get(attr)
+            if val is not None:
+                props[key] = int(val) / 20
+    numPr = pPr.find(_NUMPR)
+    if numPr is not None:
+        ilvl = numPr.find(_ILVL)
+        props["list_level"] = int(ilvl.get(_VAL)) if ilvl is not None else props.get("list_level", 0)
+    pBdr = pPr.find(_PBDR)
+    if pBdr is not None:
+        props["border"] = sum(int(b.get(qn("w:space"), 0)) + int(b.get(qn("w:sz"), 0)) / 8
+                              for b in pBdr if b.tag in (qn("w:top"), qn("w:bottom")))
+
+
+def _overlay_rpr(props, rPr):
+    if rPr is None:
+        return
+    fonts = rPr.find(_RFONTS)
+    if fonts is not None:
+        name = fonts.get(_ASCII) or THEME_FONTS.get(fonts.get(_ASCII_THEME))
+        if name:
+            props["font"] = name
+    sz = rPr.find(_SZ)
+    if sz is not None:
+        props["size"] = int(sz.get(_VAL)) / 2
+    b = rPr.find(_B)
+    if b is not None:
+        props["bold"] = _on(b)
+
+
+class _Styles:
+    """Resolved paragraph and run properties per style id, for one document."""
+
+    def __init__(self, doc):
+        self.element = doc.styles.element
+        self.cache = {}
+        defaults = self.element.find(qn("w:docDefaults"))
+        self.base_p = {"before": 0, "after": 0, "line": None, "lineRule": "auto"}
+        self.base_r = {"font": DEFAULT_FONT, "size": 10.0, "bold": False}
+        if defaults is not None:
+            _overlay_ppr(self.base_p, defaults.find(f"{qn('w:pPrDefault')}/{qn('w:pPr')}"))
+            _overlay_rpr(self.base_r, defaults.find(f"{qn('w:rPrDefault')}/{qn('w:rPr')}"))
+        self.default_id = "Normal"
+
+    def resolve(self, style_id):
+        """(paragraph props, run props) of a style, following basedOn."""
+        if style_id in self.cache:
+            return self.cache[style_id]
+        self.cache[style_id] = (dict(self.base_p), dict(self.base_r))  # guards basedOn cycles
+        style = self.element.get_by_id(style_id) if style_id else None
+        if style is None:
+            if style_id != self.default_id:
+                self.cache[style_id] = self.resolve(self.default_id)
+            return self.cache[style_id]
+        parent = style.basedOn_val
+        p_props, r_props = self.resolve(parent) if parent else (self.base_p, self.base_r)
+        p_props, r_props = dict(p_props), dict(r_props)
+        _overlay_ppr(p_props, style.pPr)
+        _overlay_rpr(r_props, style.rPr)
+        self.cache[style_id] = (p_props, r_props)
+        return p_props, r_props
+
+    def character(self, style_id):
+        """Run properties a character style sets itself (and via basedOn)."""
+        key = ("char", style_id)
+        if key not in self.cache:
+            self.cache[key] = props = {}
+            style = self.element.get_by_id(style_id)
+            if style is not None:
+                if style.basedOn_val:
+                    props.update(self.character(style.basedOn_val))
+                _overlay_rpr(props, style.rPr)
+        return self.cache[key]
+
+
+# ── Measurement ──
+
+def _style_id(pPr):
+    el = pPr.find(_PSTYLE) if pPr is not None else None
+    return el.get(_VAL) if el is not None else None
+
+
+def _paragraph_blocks(p, width, styles):
+    """Line-break one w:p at width; returns blocks split at hard page breaks."""
+    pPr = p.find(_PPR)
+    style_id = _style_id(pPr)
+    props, para_run = styles.resolve(style_id)
+    props = dict(props)
+    _overlay_ppr(props, pPr)
+    mark = dict(para_run)
+    if pPr is not None:
+        _overlay_rpr(mark, pPr.find(_RPR))
+    avail = width - props.get("ind_left", 0) - props.get("ind_right", 0)
+    if "list_level" in props and "ind_left" not in props:
+        avail -= LIST_INDENT * (props["list_level"] + 1)
+    avail = max(avail, 24.0)
+    spacing = (props["line"], props["lineRule"])
+
+    blocks = []
+    lines = []
+    line_w = word_w = space_w = 0.0
+    line_h = 0.0
+
+    def new_line(h):
+        nonlocal line_h
+        lines.append(line_h or h)
+        line_h = 0.0
+
+    def commit_word(h):
+        nonlocal line_w, word_w, space_w
+        if word_w:
+            if line_w and line_w + space_w + word_w > avail:
+                new_line(h)
+                line_w = word_w
+            else:
+                line_w += space_w + word_w
+            while line_w > avail:  # a single word wider than the line
+                new_line(h)
+                line_w -= avail
+            space_w = 0.0
+        word_w = 0.0
+
+    h = line_height(mark["font"], mark["size"], spacing)
+    for r in p.iter(_R):
+        run = dict(para_run)
+        rPr = r.find(_RPR)
+        if rPr is not None:
+            rstyle = rPr.find(_RSTYLE)
+            if rstyle is not None:
+                run.update(styles.character(rstyle.get(_VAL)))
+            _overlay_rpr(run, rPr)
+        font, size, bold = run["font"], run["size"], run["bold"]
+        h = line_height(font, size, spacing)
+        for child in r:
+            tag = child.tag
+            if tag == _T and child.text:
+                for k, chunk in enumerate(child.text.split(" ")):
+                    if k:
+                        commit_word(h)
+                        space_w += text_width(" ", font, size, bold)
+                    if chunk:
+                        line_h = max(line_h, h)
+                        word_w += text_width(chunk, font, size, bold)
+            elif tag == _TAB:
+                commit_word(h)
+                line_w = (int((line_w + space_w) // TAB_STOP) + 1) * TAB_STOP
+                space_w = 0.0
+            elif tag in (_BR, _CR):
+                commit_word(h)
+                if child.get(_TYPE) == "page":
+                    if line_w or line_h:
+                        new_line(h)
+                    if lines:
+                        blocks.append(lines)
+                    blocks.append(None)  # page break marker
+                    lines = []
+                else:
+                    new_line(h)
+                line_w = space_w = 0.0
+    commit_word(h)
+    new_line(line_height(mark["font"], mark["size"], spacing))
+    blocks.append(lines)
+
+    text = "".join(t.text or "" for t in p.iter(_T))
+    is_heading = bool(style_id) and (style_id.startswith("Heading") or style_id == "Title")
+    out = []
+    page_break = props.get("pageBreakBefore", False)
+    for lines in blocks:
+        if lines is None:
+            page_break = True
+            continue
+        out.append({
+            "kind": "p", "lines": lines, "style": style_id, "text": text[:60], "heading": is_heading,
+            "before": props["before"] / 20, "after": props["after"] / 20 + props.get("border", 0),
+            "contextual": props.get("contextualSpacing", False),
+            "keep_next": props.get("keepNext", False), "keep_lines": props.get("keepLines", False),
+            "page_break": page_break,
+        })
+        page_break = False
+    return out
+
+
+def _cell_height(tc, width, styles):
+    height = 0.0
+    prev = None
+    for p in tc.iter(_P):
+        for block in _paragraph_blocks(p, width, styles):
+            gap = block["before"] if prev is None else _gap(prev, block)
+            height += gap + sum(block["lines"])
+            prev = block
+    return height + (prev["after"] if prev else 0)
+
+
+def _table_blocks(tbl, width, styles):
+    grid = [int(c.get(_W, 0)) / 20 for c in tbl.iter(_GRID_COL)]
+    blocks = []
+    header = 0.0        # height of the leading w:tblHeader rows, repeated on each page
+    leading = True
+    for tr in tbl.iterchildren(_TR):
+        row_h = 0.0
+        keep_next = False
+        col = 0
+        for tc in tr.iterchildren(_TC):
+            tcW = tc.find(_TCW_PATH)
+            w = int(tcW.get(_W, 0)) / 20 if tcW is not None and tcW.get(_TYPE) == "dxa" else 0
+            if not w:
+                w = grid[col] if col < len(grid) else width / max(len(grid), 1)
+            col += 1
+            row_h = max(row_h, _cell_height(tc, max(w - CELL_MARGINS, 12.0), styles))
+            if any(_on(k) for k in tc.iter(_KEEP_NEXT)):
+                keep_next = True
+        leading = leading and tr.find(f"{qn('w:trPr')}/{qn('w:tblHeader')}") is not None
+        if leading:
+            header += row_h
+        blocks.append({
+            "kind": "row", "lines": [row_h], "style": None, "text": "", "heading": False,
+            "before": 0.0, "after": 0.0, "contextual": False, "keep_next": keep_next,
+            "keep_lines": True, "page_break": False, "repeat_header": header,
+        })
+    return blocks
+
+
+def _gap(prev, block):
+    """Vertical space between two consecutive blocks."""
+    if prev["kind"] == "row" or block["kind"] == "row":
+        return prev["after"] + block["before"] if prev["kind"] != block["kind"] else 0.0
+    if block["contextual"] and prev["style"] == block["style"]:
+        return 0.0
+    return prev["after"] + block["before"]
+
+
+# ── Pagination ──
+
+def _chain_height(blocks, i, page_h):
+    """Height that must share a page with block i under its keepNext chain."""
+    height = sum(blocks[i]["lines"]) + blocks[i]["after"]
+    j = i
+    while blocks[j]["keep_next"] and j + 1 < len(blocks) and not blocks[j + 1]["page_break"]:
+        nxt = blocks[j + 1]
+        height += _gap(blocks[j], nxt) - blocks[j]["after"]
+        if not nxt["keep_next"]:
+            height += sum(nxt["lines"]) if nxt["keep_lines"] else nxt["lines"][0]
+            break
+        height += sum(nxt["lines"]) + nxt["after"]
+        j += 1
+        if height > page_h:
+            break
+    return height
+
+
+def _paginate(blocks, page_h):
+    """Assign start/end pages to blocks in place; returns (pages, blocks moved by keepNext)."""
+    page, y, moved = 1, 0.0, 0
+    header = 0.0  # repeating header height of the table being laid out
+    prev = None
+    for i, b in enumerate(blocks):
+        if b["kind"] != "row":
+            header = 0.0
+        if b["page_break"] and y > 0:
+            page, y = page + 1, 0.0
+        gap = _gap(prev, b) if prev is not None and y > 0 else 0.0
+        if b["keep_next"] and y > 0:
+            need = _chain_height(blocks, i, page_h)
+            if need <= page_h and y + gap + need > page_h:
+                page, y, gap = page + 1, header, 0.0
+                moved += 1
+        y += gap
+        b["start_page"] = page
+        rest = b["lines"]
+        while rest:
+            fit, used = 0, 0.0
+            for h in rest:
+                if y + used + h > page_h:
+                    break
+                used += h
+                fit += 1
+            if fit == len(rest):
+                y += used
+                break
+            if y > header:
+                if b["keep_lines"] or fit < 2:
+                    fit = 0
+                elif len(rest) - fit < 2:
+                    fit = len(rest) - 2 if len(rest) - 2 >= 2 else 0
+            else:
+                fit = max(fit, 1)  # taller than a page: split anyway
+            y += sum(rest[:fit])
+            rest = rest[fit:]
+            if rest:
+                page, y = page + 1, header
+        b["end_page"] = page
+        if b["kind"] == "row":
+            header = b["repeat_header"]
+        prev = b
+    return page, moved
+
+
+def estimate_layout(doc, sections=None):
+    """Estimate pages for doc; annotates build-report sections with their pages.
+
+    sections is the list returned by render_sections() (its "blocks" count maps
+    body elements to sections). Returns {"pages", "moved", "stranded"}.
+    """
+    sectPr = doc.element.body[-1]
+    section = Section(sectPr, doc.part) if sectPr.tag == qn("w:sectPr") else doc.sections[-1]
+    width = (section.page_width - section.left_margin - section.right_margin) / 12700
+    page_h = (section.page_height - section.top_margin - section.bottom_margin) / 12700
+
+    styles = _Styles(doc)
+    owners = []
+    for idx, s in enumerate(sections or []):
+        owners += [idx] * s["blocks"]
+    blocks = []
+    for n, el in enumerate(el for el in doc.element.body if el.tag not in _RANGE_MARKS):
+        if el.tag == _P:
+            new = _paragraph_blocks(el, width, styles)
+        elif el.tag == _TBL:
+            new = _table_blocks(el, width, styles)
+        else:
+            continue
+        for b in new:
+            b["owner"] = owners[n] if n < len(owners) else None
+        blocks += new
+
+    pages, moved = _paginate(blocks, page_h)
+
+    stranded = []
+    for b, nxt in zip(blocks, blocks[1:]):
+        if b["heading"] and nxt["start_page"] > b["end_page"] and not nxt["page_break"]:
+            stranded.append({"page": b["end_page"], "heading": b["text"]})
+    for idx, s in enumerate(sections or []):
+        own = [b for b in blocks if b["owner"] == idx]
+        s["first_page"] = own[0]["start_page"] if own else None
+        s["last_page"] = own[-1]["end_page"] if own else None
+    return {"pages": pages, "moved": moved, "stranded": stranded}
+
+
+# ── Keep Hints ──
+
+def _keep(p, tag):
+    pPr = p.get_or_add_pPr()
+    if tag == "keepNext":
+        pPr.get_or_add_keepNext()
+    else:
+        pPr.get_or_add_keepLines()
+
+
+def apply_keep_hints(doc):
+    """Add keepNext / keepLines where a page break would strand content.
+
+    doc is a Document or a parsed w:document element (patch.py). Returns the
+    number of paragraphs changed. Idempotent.
+    """
+    children = [el for el in getattr(doc, "element", doc).body if el.tag in (_P, _TBL)]
+    changed = set()
+
+    def keep(p, tag):
+        pPr = p.find(_PPR)
+        if pPr is None or pPr.find(qn(f"w:{tag}")) is None:
+            _keep(p, tag)
+            changed.add(p)
+
+    for i, el in enumerate(children):
+        nxt = children[i + 1] if i + 1 < len(children) else None
+        if el.tag == _TBL:
+            # Header row stays with the first data row
+            rows = list(el.iterchildren(_TR))
+            if len(rows) > 1:
+                for p in rows[0].iter(_P):
+                    keep(p, "keepNext")
+            continue
+        style = _style_id(el.find(_PPR))
+        text = "".join(t.text or "" for t in el.iter(_T)).strip()
+        if style and (style.startswith("Heading") or style == "Title"):
+            # A short list under a heading moves with it
+            items = []
+            for sib in children[i + 1:]:
+                if sib.tag != _P or _style_id(sib.find(_PPR)) not in ("Bullet", "ListBullet"):
+                    break
+                items.append(sib)
+            if 1 < len(items) <= MAX_KEPT_LIST:
+                for p in items[:-1]:
+                    keep(p, "keepNext")
+        elif style in ("Code", "Quote"):
+            keep(el, "keepLines")
+        if text and nxt is not None and (nxt.tag == _TBL or text.endswith(":")):
+            keep(el, "keepNext")
+    return len(changed)
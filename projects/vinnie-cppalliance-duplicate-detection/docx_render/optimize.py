@@ -0,0 +1,393 @@
+"""
+Post-save optimizer that shrinks a .docx package without changing how it renders.
+
+optimize_package() takes the bytes a save produced and removes what the
+document does not need, then repacks them (reproducible.repack) at the
+highest compression level:
+
+    parts     parts no longer reachable from the package relationships once
+              stylesWithEffects.xml (a Word 2010 copy of styles.xml), the
+              template thumbnail and its bibliography customXml are unlinked
+    styles    definitions nothing references (after basedOn, link and next),
+              and the latent-style table, which only feeds Word's style gallery
+    borders   cell w:tcBorders equal to the borders the cell already gets from
+              its table (tblBorders, or the table style's); when every cell
+              sets its own, the most common set first moves up into tblBorders
+    runs      adjacent runs with identical w:rPr merged; empty w:rPr / w:pPr
+
+Spacer paragraphs are kept: an empty paragraph still takes its line height.
+Run formatting already lives in named styles (doc_styles), so nothing is
+hoisted into new styles; the few remaining w:rPr are one-offs. Every pass is
+checked: render_fingerprint() (paragraph and run properties, text, effective
+cell borders, the definitions of the styles in use) must be identical before
+and after, or optimize_package() raises instead of returning a package that
+could render differently.
+
+    python -m docx_render.optimize CONSULTANT-PAPER-AGENT-ARCHITECTURE.docx
+"""
+
+import datetime as dt
+import hashlib
+import io
+import posixpath
+import sys
+import zipfile
+from collections import Counter
+
+from lxml import etree
+
+from .reproducible import repack, write_if_changed
+
+W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+RELS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+TYPES_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+COMPRESS_LEVEL = 9
+DOCUMENT_PART = "word/document.xml"
+STYLES_PART = "word/styles.xml"
+# Relationships unlinked before the unreachable parts are dropped
+DROP_RELATIONSHIPS = (
+    "http://schemas.microsoft.com/office/2007/relationships/stylesWithEffects",
+    "http://schemas.openxmlformats.org/package/2006/relationships/metadata/thumbnail",
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/customXml",
+)
+STYLE_REFS = {f"{{{W}}}{tag}" for tag in ("pStyle", "rStyle", "tblStyle", "numStyleLink", "styleLink")}
+SIDES = ("top", "left", "bottom", "right")
+TABLE_SIDES = SIDES + ("insideH", "insideV")
+# tblPr children that come after w:tblBorders in schema order
+_AFTER_TBL_BORDERS = {f"{{{W}}}{tag}" for tag in ("shd", "tblLayout", "tblCellMar", "tblLook", "tblCaption",
+                                                   "tblDescription")}
+_RUN_CONTENT = {f"{{{W}}}{tag}" for tag in ("t", "tab", "br", "cr")}
+
+
+def w(tag):
+    return f"{{{W}}}{tag}"
+
+
+def _xml(el):
+    return b"" if el is None else etree.tostring(el)
+
+
+def _val(el, tag):
+    child = el.find(w(tag))
+    return None if child is None else child.get(w("val"))
+
+
+def _serialize(root):
+    return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+# ── Parts ──
+
+def _rels_name(part):
+    return posixpath.join(posixpath.dirname(part), "_rels", posixpath.basename(part) + ".rels")
+
+
+def _target(part, rel):
+    return posixpath.normpath(posixpath.join(posixpath.dirname(part), rel.get("Target"))).lstrip("/")
+
+
+def drop_parts(parts, trees):
+    """Unlink DROP_RELATIONSHIPS and drop every part no longer reachable; returns the dropped names."""
+    for name, root in trees.items():
+        if name.endswith(".rels"):
+            for rel in list(root):
+                if rel.get("Type") in DROP_RELATIONSHIPS:
+                    root.remove(rel)
+    keep = {"[Content_Types].xml", "_rels/.rels"}
+    todo = [""]
+    while todo:
+        part = todo.pop()
+        rels = "_rels/.rels" if part == "" else _rels_name(part)
+        if rels not in trees:
+            continue
+        keep.add(rels)
+        for rel in trees[rels]:
+            if rel.get("TargetMode") == "External":
+                continue
+            target = _target(part, rel)
+            if target not in keep:
+                keep.add(target)
+                todo.append(target)
+    dropped = [name for name in parts if name not in keep]
+    types = trees["[Content_Types].xml"]
+    for override in list(types.iter(f"{{{TYPES_NS}}}Override")):
+        if override.get("PartName").lstrip("/") in dropped:
+            types.remove(override)
+    for name in dropped:
+        del parts[name]
+        trees.pop(name, None)
+    return dropped
+
+
+# ── Styles ──
+
+def prune_styles(trees):
+    """Drop style definitions nothing references, and w:latentStyles; returns the dropped ids."""
+    styles = trees[STYLES_PART]
+    by_id = {s.get(w("styleId")): s for s in styles.iter(w("style"))}
+    wanted = [s_id for s_id, s in by_id.items() if s.get(w("default")) in ("1", "true")]
+    for name, root in trees.items():
+        if name != STYLES_PART and not name.endswith(".rels") and name != "[Content_Types].xml":
+            wanted += [el.get(w("val")) for el in root.iter(*STYLE_REFS)]
+    used = set()
+    while wanted:
+        s_id = wanted.pop()
+        if s_id in used or s_id not in by_id:
+            continue
+        used.add(s_id)
+        wanted += [v for v in (_val(by_id[s_id], tag) for tag in ("basedOn", "link", "next")) if v]
+    dropped = [s_id for s_id in by_id if s_id not in used]
+    for s_id in dropped:
+        styles.remove(by_id[s_id])
+    for latent in styles.findall(w("latentStyles")):
+        styles.remove(latent)
+    return dropped
+
+
+# ── Table Borders ──
+
+def _borders(el):
+    """{side: (attributes)} of a w:tblBorders / w:tcBorders, or None without one."""
+    if el is None:
+        return None
+    return {child.tag.split("}")[1]: tuple(sorted(child.attrib.items())) for child in el}
+
+
+def _style_borders(by_id, s_id):
+    while s_id and s_id in by_id:
+        found = by_id[s_id].find(f"{w('tblPr')}/{w('tblBorders')}")
+        if found is not None:
+            return _borders(found)
+        s_id = _val(by_id[s_id], "basedOn")
+    return {}
+
+
+def table_borders(tbl, by_id):
+    """The table-level borders of tbl: its own tblBorders, else its style's."""
+    tblPr = tbl.find(w("tblPr"))
+    own = _borders(tblPr.find(w("tblBorders"))) if tblPr is not None else None
+    if own is not None:
+        return own
+    return _style_borders(by_id, _val(tblPr, "tblStyle") if tblPr is not None else None)
+
+
+def _cells(tbl):
+    """(tc, {side: table border it takes}) for every cell of tbl (not of nested tables)."""
+    rows = tbl.findall(w("tr"))
+    for r, tr in enumerate(rows):
+        tcs = tr.findall(w("tc"))
+        for c, tc in enumerate(tcs):
+            yield tc, {"top": "top" if r == 0 else "insideH", "bottom": "bottom" if r == len(rows) - 1 else "insideH",
+                       "left": "left" if c == 0 else "insideV", "right": "right" if c == len(tcs) - 1 else "insideV"}
+
+
+def effective_borders(tc, position, table):
+    """[border attributes] a cell renders with per side: its own tcBorders, else the table's."""
+    own = _borders(tc.find(f"{w('tcPr')}/{w('tcBorders')}")) or {}
+    return [own.get(side, table.get(position[side])) for side in SIDES]
+
+
+def _hoist(tbl, by_id):
+    """Put the most common cell border set into tblBorders when every cell
+    sets all four sides, the set is the same top/bottom and left/right, and
+    the table (or its style) does not already draw it; True if done."""
+    tblPr = tbl.find(w("tblPr"))
+    if tblPr is None or tblPr.find(w("tblBorders")) is not None:
+        return False
+    sets = []
+    for tc, _ in _cells(tbl):
+        own = _borders(tc.find(f"{w('tcPr')}/{w('tcBorders')}"))
+        if own is None or set(own) != set(SIDES):
+            return False
+        sets.append(tuple(own[side] for side in SIDES))
+    if not sets:
+        return False
+    top, left, bottom, right = Counter(sets).most_common(1)[0][0]
+    if top != bottom or left != right:
+        return False
+    if table_borders(tbl, by_id) == dict(zip(TABLE_SIDES, (top, left, bottom, right, top, left))):
+        return False
+    borders = etree.Element(w("tblBorders"))
+    for side, attrs in zip(TABLE_SIDES, (top, left, bottom, right, top, left)):
+        etree.SubElement(borders, w(side), dict(attrs))
+    following = [child for child in tblPr if child.tag in _AFTER_TBL_BORDERS]
+    if following:
+        following[0].addprevious(borders)
+    else:
+        tblPr.append(borders)
+    return True
+
+
+def hoist_cell_borders(document, by_id):
+    """Drop cell borders the table already supplies; returns (cells cleared, tables hoisted)."""
+    cleared = hoisted = 0
+    for tbl in document.iter(w("tbl")):
+        hoisted += _hoist(tbl, by_id)
+        table = table_borders(tbl, by_id)
+        for tc, position in _cells(tbl):
+            own = tc.find(f"{w('tcPr')}/{w('tcBorders')}")
+            sides = _borders(own)
+            if sides and set(sides) <= set(SIDES) and all(attrs == table.get(position[side])
+                                                          for side, attrs in sides.items()):
+                own.getparent().remove(own)
+                cleared += 1
+    return cleared, hoisted
+
+
+# ── Runs ──
+
+def _coalesce_text(run):
+    previous = None
+    for child in list(run):
+        if child.tag == w("t") and previous is not None and previous.tag == w("t"):
+            previous.text = (previous.text or "") + (child.text or "")
+            run.remove(child)
+            if previous.text != previous.text.strip():
+                previous.set("{http://www.w3.org/XML/1998/namespace}space", "preserve")
+            continue
+        previous = child
+
+
+def merge_runs(document):
+    """Merge adjacent runs with identical properties; drop empty w:rPr / w:pPr. Returns runs removed."""
+    merged = 0
+    for p in document.iter(w("p")):
+        previous = None
+        for child in list(p):
+            if child.tag != w("r") or child.attrib or any(c.tag not in _RUN_CONTENT and c.tag != w("rPr")
+                                                         for c in child):
+                previous = None
+                continue
+            if previous is not None and _xml(previous.find(w("rPr"))) == _xml(child.find(w("rPr"))):
+                for content in [c for c in child if c.tag != w("rPr")]:
+                    previous.append(content)
+                p.remove(child)
+                _coalesce_text(previous)
+                merged += 1
+                continue
+            previous = child
+    for tag in ("rPr", "pPr"):
+        for el in list(document.iter(w(tag))):
+            if len(el) == 0 and not el.attrib:
+                el.getparent().remove(el)
+    return merged
+
+
+# ── Render Fingerprint ──
+
+def _runs_fingerprint(p):
+    """[(rPr, content)] of a paragraph, adjacent runs with equal rPr joined."""
+    out = []
+    for r in p.iter(w("r")):
+        rPr = _xml(r.find(w("rPr"))) if r.find(w("rPr")) is not None and len(r.find(w("rPr"))) else b""
+        content = "".join(c.text or "" if c.tag == w("t") else f"<{c.tag.split('}')[1]}>"
+                          for c in r if c.tag != w("rPr"))
+        if out and out[-1][0] == rPr:
+            out[-1] = (rPr, out[-1][1] + content)
+        else:
+            out.append((rPr, content))
+    return out
+
+
+def render_fingerprint(trees):
+    """Digest of everything the document body renders from (see module docstring)."""
+    by_id = {s.get(w("styleId")): s for s in trees[STYLES_PART].iter(w("style"))}
+    document = trees[DOCUMENT_PART]
+    h = hashlib.sha256(_xml(trees[STYLES_PART].find(w("docDefaults"))))
+    used = set()
+    for el in document.iter(w("p"), w("tc"), w("tblPr"), w("sectPr")):
+        if el.tag == w("p"):
+            pPr = el.find(w("pPr"))
+            h.update(_xml(pPr) if pPr is not None and len(pPr) else b"")
+            h.update(repr(_runs_fingerprint(el)).encode())
+        elif el.tag == w("tc"):
+            tcPr = el.find(w("tcPr"))
+            h.update(b"".join(_xml(c) for c in (tcPr if tcPr is not None else ()) if c.tag != w("tcBorders")))
+        elif el.tag == w("tblPr"):
+            h.update(b"".join(_xml(c) for c in el if c.tag != w("tblBorders")))
+        else:
+            h.update(_xml(el))
+    for tbl in document.iter(w("tbl")):
+        table = table_borders(tbl, by_id)
+        for tc, position in _cells(tbl):
+            h.update(repr(effective_borders(tc, position, table)).encode())
+    for el in document.iter(*STYLE_REFS):
+        used.add(el.get(w("val")))
+    for s_id in sorted(used):
+        while s_id in by_id:
+            h.update(_xml(by_id[s_id]))
+            s_id = _val(by_id[s_id], "basedOn")
+    return h.hexdigest()
+
+
+# ── Package ──
+
+def _element_count(trees):
+    return sum(sum(1 for _ in root.iter()) for root in trees.values())
+
+
+def optimize_package(data):
+    """(optimized package bytes, stats) for a saved .docx; raises RuntimeError if a
+    pass would change the rendering fingerprint."""
+    with zipfile.ZipFile(io.BytesIO(data)) as z:
+        parts = {info.filename: z.read(info.filename) for info in z.infolist()}
+        when = dt.datetime(*z.infolist()[0].date_time, tzinfo=dt.timezone.utc)
+    trees = {name: etree.fromstring(body) for name, body in parts.items()
+             if name.endswith((".xml", ".rels"))}
+    elements = _element_count(trees)
+    before = render_fingerprint(trees)
+
+    dropped_parts = drop_parts(parts, trees)
+    dropped_styles = prune_styles(trees)
+    by_id = {s.get(w("styleId")): s for s in trees[STYLES_PART].iter(w("style"))}
+    cleared, hoisted = hoist_cell_borders(trees[DOCUMENT_PART], by_id)
+    merged = merge_runs(trees[DOCUMENT_PART])
+
+    if render_fingerprint(trees) != before:
+        raise RuntimeError("optimizer pass changed the rendering; package left as saved")
+    for name, root in trees.items():
+        parts[name] = _serialize(root)
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w") as z:
+        for name, body in parts.items():
+            z.writestr(name, body)
+    optimized = repack(out.getvalue(), when, COMPRESS_LEVEL)
+    return optimized, {
+        "bytes_before": len(data),
+        "bytes_after": len(optimized),
+        "elements_before": elements,
+        "elements_after": _element_count(trees),
+        "parts_dropped": dropped_parts,
+        "styles_dropped": len(dropped_styles),
+        "cell_borders_dropped": cleared,
+        "tables_hoisted": hoisted,
+        "runs_merged": merged,
+    }
+
+
+def optimize_note(stats):
+    """One-line summary of optimize_package() stats."""
+    s = stats
+    return (f"{s['bytes_before'] / 1024:.1f} -> {s['bytes_after'] / 1024:.1f} KB "
+            f"(-{100 - 100 * s['bytes_after'] / s['bytes_before']:.0f}%), "
+            f"{s['elements_before']} -> {s['elements_after']} XML elements; "
+            f"dropped {len(s['parts_dropped'])} parts, {s['styles_dropped']} styles, "
+            f"{s['cell_borders_dropped']} cell borders; merged {s['runs_merged']} runs")
+
+
+def optimize_file(path, out=None):
+    """Optimize the .docx at path into out (default: in place); returns (written, stats)."""
+    with open(path, "rb") as f:
+        data, stats = optimize_package(f.read())
+    written, _ = write_if_changed(data, out or path)
+    return written, stats
+
+
+def main(argv=None):
+    for path in argv if argv is not None else sys.argv[1:]:
+        _, stats = optimize_file(path)
+        print(f"[OK] Optimized: {path}  {optimize_note(stats)}")
+
+
+if __name__ == "__main__":
+    main()
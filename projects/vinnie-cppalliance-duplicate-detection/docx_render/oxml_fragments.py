@@ -0,0 +1,78 @@
+"""
+Interned OOXML fragments shared by the DOCX generators.
+
+set_cell_bg / set_cell_borders used to run parse_xml on an f-string for every
+table cell. fragment() parses each distinct (kind, color, size) element once,
+keeps the parsed prototype, and hands out deep copies of it.
+Benchmark: python bench_fragments.py
+"""
+
+import copy
+from functools import lru_cache
+
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+
+# ── Fragment Templates ({color} / {size} are filled from the cache key) ──
+TEMPLATES = {
+    # Table cell shading / background
+    "shd": '<w:shd {ns} w:fill="{color}"/>',
+    # Thin box around a table cell
+    "tcBorders": (
+        '<w:tcBorders {ns}>'
+        '<w:top w:val="single" w:sz="{size}" w:space="0" w:color="{color}"/>'
+        '<w:left w:val="single" w:sz="{size}" w:space="0" w:color="{color}"/>'
+        '<w:bottom w:val="single" w:sz="{size}" w:space="0" w:color="{color}"/>'
+        '<w:right w:val="single" w:sz="{size}" w:space="0" w:color="{color}"/>'
+        '</w:tcBorders>'
+    ),
+    # Accent bar: bottom rule under a paragraph
+    "pBorders.bottom": (
+        '<w:pBorders {ns}>'
+        '<w:bottom w:val="single" w:sz="{size}" w:space="1" w:color="{color}"/>'
+        '</w:pBorders>'
+    ),
+    # Blockquote: thick left rule
+    "pBorders.left": (
+        '<w:pBorders {ns}>'
+        '<w:left w:val="single" w:sz="{size}" w:space="8" w:color="{color}"/>'
+        '</w:pBorders>'
+    ),
+    # Code block: box around the paragraph
+    "pBorders.box": (
+        '<w:pBorders {ns}>'
+        '<w:top w:val="single" w:sz="{size}" w:space="1" w:color="{color}"/>'
+        '<w:left w:val="single" w:sz="{size}" w:space="4" w:color="{color}"/>'
+        '<w:bottom w:val="single" w:sz="{size}" w:space="1" w:color="{color}"/>'
+        '<w:right w:val="single" w:sz="{size}" w:space="4" w:color="{color}"/>'
+        '</w:pBorders>'
+    ),
+    # Table style properties: centered, thin grid
+    "tblPr.styled": (
+        '<w:tblPr {ns}><w:jc w:val="center"/><w:tblBorders>'
+        '<w:top w:val="single" w:sz="{size}" w:space="0" w:color="{color}"/>'
+        '<w:left w:val="single" w:sz="{size}" w:space="0" w:color="{color}"/>'
+        '<w:bottom w:val="single" w:sz="{size}" w:space="0" w:color="{color}"/>'
+        '<w:right w:val="single" w:sz="{size}" w:space="0" w:color="{color}"/>'
+        '<w:insideH w:val="single" w:sz="{size}" w:space="0" w:color="{color}"/>'
+        '<w:insideV w:val="single" w:sz="{size}" w:space="0" w:color="{color}"/>'
+        '</w:tblBorders></w:tblPr>'
+    ),
+    # Left indent in twips (size)
+    "ind": '<w:ind {ns} w:left="{size}"/>',
+    # Pagination flags (no parameters)
+    "keepNext": '<w:keepNext {ns}/>',
+    "keepLines": '<w:keepLines {ns}/>',
+    "pageBreakBefore": '<w:pageBreakBefore {ns}/>',
+}
+
+
+@lru_cache(maxsize=None)
+def prototype(kind, color="", size=""):
+    """Parse a fragment once per (kind, color, size). Never mutate the result."""
+    return parse_xml(TEMPLATES[kind].format(ns=nsdecls("w"), color=color, size=size))
+
+
+def fragment(kind, color="", size=""):
+    """Return a fresh, appendable copy of the cached fragment."""
+    return copy.deepcopy(prototype(kind, color, str(size)))
@@ -0,0 +1,246 @@
+"""
+One-pass construction of the styled w:tbl behind add_styled_table.
+
+python-docx rebuilds a row's grid of cell proxies on every `.cells` access, so
+styling a table cell by cell gets slower much faster than the table grows.
+styled_table() instead writes the whole table (grid, header row, zebra rows,
+borders, widths) as a single XML string, parses it in one lxml call and
+appends it to the body, so the cost is linear in the number of cells.
+table_xml() produces that string row by row, so a streaming document can
+write a table of any length without holding it, and StyledTableWriter
+appends rows in chunks as they arrive (see table_source for row sources).
+"""
+
+import re
+from xml.sax.saxutils import escape
+
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+from docx.shared import Cm
+from docx.table import Table
+
+from .doc_styles import (
+    TBL_HEADER_BG, TBL_ALT_BG, TBL_BORDER_COLOR,
+    TABLE_STYLE_ID, TABLE_HEADER_STYLE_ID, TABLE_CELL_STYLE_ID,
+    append_body_element, block_width, is_draft,
+)
+from .column_widths import is_measured, measured_widths, width_spec
+from .ir import is_tree
+from .oxml_fragments import TEMPLATES
+from .table_source import table_source
+
+_SPECIAL = re.compile(r"([\t\r\n])")
+_CLOSE = "</w:r></w:p></w:tc>"
+_BOLD_RPR = "<w:rPr><w:b/></w:rPr>"
+
+
+def _fragment_xml(kind, color="", size=""):
+    """Fragment markup without its own namespace declaration (the w:tbl carries it)."""
+    return TEMPLATES[kind].format(ns="", color=color, size=size).replace("  ", " ")
+
+
+def _t_xml(text):
+    """Run content for text, matching python-docx: tabs -> w:tab, newlines -> w:br."""
+    if not text:
+        return ""
+    if _SPECIAL.search(text) is None:
+        if len(text.strip()) < len(text):
+            return f'<w:t xml:space="preserve">{escape(text)}</w:t>'
+        return f"<w:t>{escape(text)}</w:t>"
+    out = []
+    for piece in _SPECIAL.split(text):
+        if piece == "\t":
+            out.append("<w:tab/>")
+        elif piece in ("\r", "\n"):
+            out.append("<w:br/>")
+        elif piece:
+            out.append(_t_xml(piece))
+    return "".join(out)
+
+
+class TableMarkup:
+    """The styled w:tbl markup of one table, in pieces: head() (table properties,
+    grid and header row), rows() as they come, then TAIL.
+
+    decorate=False (draft builds) leaves out the per-cell borders and zebra
+    shading; the header keeps its fill, which its white text needs.
+    repeat_header marks the header row to repeat at the top of every page.
+    """
+
+    TAIL = "</w:tbl>"
+
+    def __init__(self, headers, twips, *, header_bg=TBL_HEADER_BG, alt_bg=TBL_ALT_BG,
+                 border_color=TBL_BORDER_COLOR, decorate=True, repeat_header=False):
+        self.headers = list(headers)
+        self.twips = twips
+        self.repeat_header = repeat_header
+        self.n_rows = 0
+        header_border = _fragment_xml("tcBorders", header_bg, "6") if decorate else ""
+        body_border = _fragment_xml("tcBorders", border_color, "4") if decorate else ""
+        alt_shd = _fragment_xml("shd", alt_bg) if decorate else ""
+        header_shd = _fragment_xml("shd", header_bg)
+
+        # Cell openings per column and row kind, up to (not including) the run properties
+        header_p = f'<w:p><w:pPr><w:pStyle w:val="{TABLE_HEADER_STYLE_ID}"/><w:jc w:val="left"/></w:pPr><w:r>'
+        p_open = f'<w:p><w:pPr><w:pStyle w:val="{TABLE_CELL_STYLE_ID}"/><w:jc w:val="left"/></w:pPr><w:r>'
+        self._header_open = [f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{t}"/>{header_border}{header_shd}</w:tcPr>'
+                             f'{header_p}' for t in twips]
+        self._even_open = [f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{t}"/>{body_border}</w:tcPr>{p_open}'
+                           for t in twips]
+        self._odd_open = [f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{t}"/>{body_border}{alt_shd}</w:tcPr>{p_open}'
+                          for t in twips]
+        self._empty_open = [f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{t}"/></w:tcPr><w:p/></w:tc>' for t in twips]
+
+    def head(self):
+        parts = [
+            f'<w:tbl {nsdecls("w")}><w:tblPr><w:tblStyle w:val="{TABLE_STYLE_ID}"/>'
+            '<w:tblW w:type="auto" w:w="0"/><w:jc w:val="center"/><w:tblLayout w:type="autofit"/>'
+            '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" '
+            'w:noHBand="0" w:noVBand="1" w:val="04A0"/></w:tblPr><w:tblGrid>',
+            "".join(f'<w:gridCol w:w="{t}"/>' for t in self.twips),
+            "</w:tblGrid><w:tr><w:trPr><w:tblHeader/></w:trPr>" if self.repeat_header else "</w:tblGrid><w:tr>",
+        ]
+        for i, h in enumerate(self.headers):
+            parts.append(self._header_open[i] + _t_xml(str(h)) + _CLOSE)
+        parts.append("</w:tr>")
+        return "".join(parts)
+
+    def rows(self, rows):
+        """Yield one w:tr per row; the zebra striping continues across calls."""
+        n_cols = len(self.headers)
+        for row_data in rows:
+            r_idx = self.n_rows
+            opens = self._odd_open if r_idx % 2 == 1 else self._even_open
+            parts = ["<w:tr>"]
+            c_idx = -1
+            for c_idx, val in enumerate(row_data):
+                if c_idx >= n_cols:
+                    raise IndexError(f"row {r_idx} has more than {n_cols} cells")
+                text = str(val)
+                if text.startswith("**") and text.endswith("**"):
+                    parts.append(opens[c_idx] + _BOLD_RPR + _t_xml(text.strip("*")) + _CLOSE)
+                else:
+                    parts.append(opens[c_idx] + _t_xml(text) + _CLOSE)
+            # Short rows keep their remaining cells, unstyled, like doc.add_table() did
+            for c in range(c_idx + 1, n_cols):
+                parts.append(self._empty_open[c])
+            parts.append("</w:tr>")
+            self.n_rows += 1
+            yield "".join(parts)
+
+
+def table_xml(headers, rows, twips, **options):
+    """Yield the styled w:tbl markup in pieces: table properties, grid and header
+    row first, then one piece per row of rows, then the closing tag (see TableMarkup)."""
+    markup = TableMarkup(headers, twips, **options)
+    yield markup.head()
+    yield from markup.rows(rows)
+    yield TableMarkup.TAIL
+
+
+def column_twips(doc, headers, rows, col_widths):
+    """(rows, column widths in twips): col_widths in cm, measured (see
+    column_widths), or None for equal columns."""
+    n_cols = len(headers)
+    if is_measured(col_widths):
+        rows, widths = measured_widths(headers, rows, col_widths, block_width(doc))
+    else:
+        default_w = int(block_width(doc) / n_cols)
+        widths = [default_w] * n_cols
+        for i, w in enumerate((col_widths or [])[:n_cols]):
+            widths[i] = Cm(w)
+    return rows, [int(round(w / 635)) for w in widths]
+
+
+def styled_table(doc, headers, rows, col_widths=None, repeat_header=False, **colors):
+    """Append a fully styled table to doc's body in one pass; returns the Table proxy.
+
+    rows may be any iterable of row sequences; it is consumed exactly once.
+    A cell whose text is wrapped in **…** is rendered bold without the markers.
+    Fonts and colors come from the named styles (doc_styles.register_styles).
+    On a streaming_docx.StreamingDocument the rows are written straight to the
+    output as they are produced and None is returned. Draft documents get
+    undecorated cells (see TableMarkup).
+    """
+    rows, twips = column_twips(doc, headers, rows, col_widths)
+    chunks = table_xml(headers, rows, twips, decorate=not is_draft(doc), repeat_header=repeat_header, **colors)
+    write_xml = getattr(doc, "write_block_xml", None)
+    if write_xml is not None:
+        write_xml(chunks)
+        return None
+    tbl = parse_xml("".join(chunks))
+    append_body_element(doc, tbl)
+    return Table(tbl, doc._body)
+
+
+class StyledTableWriter:
+    """A styled table that rows are appended to in chunks, as they arrive.
+
+    The header row repeats on every page by default; measured col_widths
+    are taken from the first chunk. On a python-docx
+    document each chunk is parsed and moved into the table (.table is the
+    Table proxy); on a StreamingDocument it is written straight out, so
+    nothing else may be added to the document until close(). A Tree gets
+    one table node whose rows grow. Chunks go through table_source, so any
+    row source and column formats work as in add_styled_table.
+    """
+
+    def __init__(self, doc, headers, col_widths=None, formats=None, repeat_header=True, **colors):
+        self.doc = doc
+        self.headers = list(headers)
+        self.formats = formats
+        self.table = None
+        self._node = None
+        self._stream = None
+        if is_tree(doc):
+            self._node = doc.append("table", headers=self.headers, rows=[], col_widths=width_spec(col_widths),
+                                    repeat_header=repeat_header)
+            return
+        self._col_widths = col_widths
+        self._options = dict(decorate=not is_draft(doc), repeat_header=repeat_header, **colors)
+        self._markup = None
+        if not is_measured(col_widths):
+            self._start(())
+
+    def _start(self, rows):
+        """Write the table head, with measured widths taken from the first chunk."""
+        rows, twips = column_twips(self.doc, self.headers, rows, self._col_widths)
+        self._markup = TableMarkup(self.headers, twips, **self._options)
+        if hasattr(self.doc, "begin_block_xml"):
+            self._stream = self.doc
+            self.doc.begin_block_xml(self._markup.head())
+        else:
+            self._tbl = parse_xml(self._markup.head() + TableMarkup.TAIL)
+            append_body_element(self.doc, self._tbl)
+            self.table = Table(self._tbl, self.doc._body)
+        return rows
+
+    def append(self, rows):
+        """Append a chunk: a list or iterable of rows, or a columnar source."""
+        _, rows = table_source(rows, self.headers, self.formats)
+        if self._node is not None:
+            self._node["rows"].extend(list(r) for r in rows)
+            return self
+        if self._markup is None:
+            rows = self._start(rows)
+        if self._stream is not None:
+            for piece in self._markup.rows(rows):
+                self._stream.write_xml(piece)
+        else:
+            chunk = "".join(self._markup.rows(rows))
+            if chunk:
+                self._tbl.extend(list(parse_xml(f'<w:tbl {nsdecls("w")}>{chunk}</w:tbl>')))
+        return self
+
+    def close(self):
+        if self._node is None and self._markup is None:
+            self._start(())
+        if self._stream is not None:
+            self._stream.end_block_xml(TableMarkup.TAIL)
+            self._stream = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,173 @@
+"""
+Render document sections in worker processes and merge their bodies in order.
+
+python-docx is single-threaded, so one generator process uses one core. With
+render_in_workers() every section is built into its own fresh document (made
+by the same factory as the master) inside a ProcessPoolExecutor worker, which
+ships back the section's body XML together with the style and numbering
+definitions it references. merge_fragment() then reconciles those with the
+master document:
+
+  - styles: style ids missing from the master are copied over; ids the master
+    already has keep the master's definition (same factory, same styles)
+  - numbering: each referenced w:num / w:abstractNum pair is matched against
+    the master's by content and reused, or copied in under fresh ids, and the
+    fragment's numId references are rewritten to match ("List Bullet")
+  - section properties: the worker's trailing w:sectPr is dropped; margins,
+    footers and headers stay with the master's own sectPr
+
+Sections whose XML refers to a part relationship (images, hyperlinks,
+headers) cannot be moved between packages and are rendered in the master.
+"""
+
+import copy
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+from lxml import etree
+
+_NS = {
+    "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+}
+PART_REFS = etree.XPath(".//@r:id | .//@r:embed | .//@r:link", namespaces=_NS)
+_STYLE_REFS = etree.XPath(".//w:pStyle/@w:val | .//w:rStyle/@w:val | .//w:tblStyle/@w:val", namespaces=_NS)
+_NUM_IDS = etree.XPath(".//w:numPr/w:numId", namespaces=_NS)
+
+
+def _wrap(elements):
+    """Serialize body elements inside a bare w:body."""
+    wrapper = parse_xml(f'<w:body {nsdecls("w", "r")}/>')
+    for el in elements:
+        wrapper.append(copy.deepcopy(el))
+    etree.cleanup_namespaces(wrapper)
+    return etree.tostring(wrapper)
+
+
+def _style_closure(doc, fragment):
+    """Style elements used by fragment, plus the styles they are based on."""
+    styles = doc.styles.element
+    pending = list(dict.fromkeys(_STYLE_REFS(fragment)))
+    seen = {}
+    while pending:
+        style_id = pending.pop()
+        if style_id in seen:
+            continue
+        style = styles.get_by_id(style_id)
+        if style is None:
+            continue
+        seen[style_id] = style
+        if style.basedOn_val:
+            pending.append(style.basedOn_val)
+    return list(seen.values())
+
+
+def _numbering_defs(doc, elements):
+    """{numId: (w:num xml, w:abstractNum xml)} for every numId the elements use."""
+    ids = {num_id.get(qn("w:val")) for el in elements for num_id in _NUM_IDS(el)}
+    if not ids:
+        return {}
+    numbering = doc.part.numbering_part.element
+    defs = {}
+    for num in numbering.num_lst:
+        num_id = num.get(qn("w:numId"))
+        if num_id in ids:
+            abstract_id = num.find(qn("w:abstractNumId")).get(qn("w:val"))
+            abstract = numbering.find(f'{qn("w:abstractNum")}[@{qn("w:abstractNumId")}="{abstract_id}"]')
+            defs[num_id] = (etree.tostring(num), etree.tostring(abstract))
+    return defs
+
+
+def _render_worker(factory, render):
+    """Run one section in a fresh document; returns its portable payload."""
+    doc = factory()
+    start = time.perf_counter()
+    body = doc.element.body
+    tail = 1 if body.find(qn("w:sectPr")) is not None else 0
+    first = len(body) - tail
+    render(doc)
+    elements = body[first:len(body) - tail]
+    if any(PART_REFS(el) for el in elements):
+        return None, [], {}, time.perf_counter() - start
+    fragment_xml = _wrap(elements)
+    styles = _style_closure(doc, parse_xml(fragment_xml))
+    num_defs = _numbering_defs(doc, elements + styles)
+    return fragment_xml, [etree.tostring(s) for s in styles], num_defs, time.perf_counter() - start
+
+
+def render_in_workers(factory, renders, jobs):
+    """Render each callable in its own document across `jobs` processes.
+
+    factory must be a picklable zero-argument function returning the kind of
+    document the master was created with. Results come back in input order as
+    (fragment xml or None, style xml list, numbering defs, seconds).
+    """
+    with ProcessPoolExecutor(max_workers=min(jobs, len(renders))) as pool:
+        return list(pool.map(_render_worker, repeat(factory), renders))
+
+
+def _canonical(el, id_attr):
+    el = copy.deepcopy(el)
+    el.attrib.pop(qn(id_attr), None)
+    for child in el.findall(qn("w:abstractNumId")):
+        el.remove(child)
+    return etree.tostring(el, method="c14n", exclusive=True)
+
+
+def _merge_numbering(doc, defs):
+    """Match or copy the fragment's numbering into doc; returns {old numId: new numId}."""
+    if not defs:
+        return {}
+    numbering = doc.part.numbering_part.element
+    abstracts = numbering.findall(qn("w:abstractNum"))
+    by_content = {}
+    for num in numbering.num_lst:
+        abstract_id = num.find(qn("w:abstractNumId")).get(qn("w:val"))
+        for abstract in abstracts:
+            if abstract.get(qn("w:abstractNumId")) == abstract_id:
+                key = (_canonical(num, "w:numId"), _canonical(abstract, "w:abstractNumId"))
+                by_content.setdefault(key, num.get(qn("w:numId")))
+
+    mapping = {}
+    for old_id, (num_xml, abstract_xml) in defs.items():
+        num, abstract = parse_xml(num_xml), parse_xml(abstract_xml)
+        key = (_canonical(num, "w:numId"), _canonical(abstract, "w:abstractNumId"))
+        if key in by_content:
+            mapping[old_id] = by_content[key]
+            continue
+        # Unknown list definition: copy it in under fresh ids
+        new_abstract_id = str(1 + max([int(a.get(qn("w:abstractNumId"))) for a in abstracts] or [-1]))
+        abstract.set(qn("w:abstractNumId"), new_abstract_id)
+        if abstracts:
+            abstracts[-1].addnext(abstract)
+        else:
+            numbering.insert(0, abstract)
+        abstracts.append(abstract)
+        new_num = numbering.add_num(int(new_abstract_id))
+        for child in list(num):
+            if child.tag != qn("w:abstractNumId"):
+                new_num.append(child)
+        mapping[old_id] = by_content[key] = str(new_num.numId)
+    return mapping
+
+
+def merge_fragment(doc, payload):
+    """Reconcile a worker payload with doc; returns the body elements to insert."""
+    fragment_xml, style_xml, num_defs, _ = payload
+    fragment = parse_xml(fragment_xml)
+    styles = [parse_xml(s) for s in style_xml]
+
+    mapping = _merge_numbering(doc, num_defs)
+    if mapping:
+        for el in [fragment] + styles:
+            for num_id in _NUM_IDS(el):
+                num_id.set(qn("w:val"), mapping.get(num_id.get(qn("w:val")), num_id.get(qn("w:val"))))
+
+    master_styles = doc.styles.element
+    for style in styles:
+        if master_styles.get_by_id(style.get(qn("w:styleId"))) is None:
+            master_styles.append(style)
+    return list(fragment)
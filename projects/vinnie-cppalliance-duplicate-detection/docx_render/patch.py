@@ -0,0 +1,169 @@
+"""
+In-place section patching of a saved deliverable.
+
+Every section of a build sits between its bookmarks (section_cache.
+section_bookmarks(), hidden in Word). patch_document() re-renders only the
+named sections into a scratch document opened from the compiled theme
+(cached sections come straight from the section cache), parses
+word/document.xml of the existing package, swaps each section's range for
+the fresh one, re-applies the keep hints around it and rewrites that one ZIP
+entry; every other part is copied as its compressed bytes (merge.
+replace_parts()). Edits made in Word outside the patched sections, comments,
+headers and the core properties survive; a patched package is
+byte-identical to a full build when nothing else was edited.
+
+    python generate_docx.py --patch costs
+
+Word may move a bookmark into the paragraph next to it when it saves; a
+start or end mark inside a paragraph still delimits the whole paragraph.
+A section whose fresh XML refers to a relationship, or to a style the
+package does not define (e.g. pruned by --optimize), needs a full build.
+"""
+
+import io
+import os
+import re
+import time
+import zipfile
+
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from lxml import etree
+
+from .doc_styles import new_document
+from .layout_estimate import apply_keep_hints
+from .merge import replace_parts
+from .parallel_render import PART_REFS
+from .reproducible import write_if_changed
+from .section_cache import CACHE_DIR, bookmark_range, render_sections, section_bookmarks
+
+DOCUMENT_PART = "word/document.xml"
+STYLES_PART = "word/styles.xml"
+_START, _END, _R = qn("w:bookmarkStart"), qn("w:bookmarkEnd"), qn("w:r")
+_NAME, _ID = qn("w:name"), qn("w:id")
+_STYLE_IDS = re.compile(rb'w:styleId="([^"]+)"')
+_STYLE_REFS = etree.XPath(".//w:pStyle/@w:val | .//w:rStyle/@w:val | .//w:tblStyle/@w:val",
+                          namespaces={"w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"})
+
+
+def _block(body, mark):
+    """The body child holding a bookmark mark (the mark itself at body level)."""
+    while mark.getparent() is not body:
+        mark = mark.getparent()
+    return mark
+
+
+def _before_text(mark, block):
+    """True if the mark comes ahead of every run of its block."""
+    for el in block.iter():
+        if el is mark:
+            return True
+        if el.tag == _R:
+            return False
+    return True
+
+
+def section_range(body, bookmark):
+    """(first, last, bookmark id) of the body children a section bookmark spans, or None."""
+    starts = [el for el in body.iter(_START) if el.get(_NAME) == bookmark]
+    if not starts:
+        return None
+    bookmark_id = starts[0].get(_ID)
+    ends = [el for el in body.iter(_END) if el.get(_ID) == bookmark_id]
+    if not ends:
+        raise ValueError(f"section bookmark {bookmark} has no end")
+    children = list(body)
+    first = children.index(_block(body, starts[0]))
+    last = children.index(_block(body, ends[0]))
+    if last > first and ends[0] is not children[last] and _before_text(ends[0], children[last]):
+        # Word moved the end mark into the next section's first paragraph
+        last -= 1
+        while last > first and children[last].tag in (_START, _END):
+            last -= 1  # the next section's own mark
+    return first, last, bookmark_id
+
+
+def fresh_sections(sections, version="", cache_dir=CACHE_DIR):
+    """Render sections into a scratch document; ([body elements of each
+    section, without its marks], section report)."""
+    doc = new_document(cache_dir=cache_dir)
+    report = render_sections(doc, sections, cache_dir=cache_dir, version=version)
+    body = doc.element.body
+    out = []
+    for bookmark in section_bookmarks([name for name, _, _ in sections]):
+        first, last, _ = section_range(body, bookmark)
+        out.append(list(body)[first + 1:last])
+    return out, report
+
+
+def patch_document(path, sections, all_names, version="", cache_dir=CACHE_DIR):
+    """Re-render sections inside the saved package at path.
+
+    all_names are the names of every section of the full build, in order
+    (bookmark names depend on them). Returns (section report, written, stats).
+    """
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        data = f.read()
+    with zipfile.ZipFile(io.BytesIO(data)) as z:
+        document = parse_xml(z.read(DOCUMENT_PART))
+        style_ids = {m.decode() for m in _STYLE_IDS.findall(z.read(STYLES_PART))}
+    bookmarks = dict(zip(all_names, section_bookmarks(all_names)))
+    body = document.body
+    ranges = {}
+    for name, _, _ in sections:
+        found = section_range(body, bookmarks[name])
+        if found is None:
+            raise ValueError(f"{path} has no bookmark for section {name}; build it once in full")
+        ranges[name] = found
+
+    loaded = time.perf_counter()
+    fresh, report = fresh_sections(sections, version, cache_dir)
+    rendered = time.perf_counter()
+    fresh = dict(zip([name for name, _, _ in sections], fresh))
+    replaced = 0
+    # Back to front, so the ranges ahead keep their positions
+    for name, (first, last, bookmark_id) in sorted(ranges.items(), key=lambda item: -item[1][0]):
+        elements = fresh[name]
+        for el in elements:
+            if PART_REFS(el):
+                raise ValueError(f"section {name} refers to a part relationship; build it in full")
+            missing = set(_STYLE_REFS(el)) - style_ids
+            if missing:
+                raise ValueError(f"section {name} uses styles {', '.join(sorted(missing))} "
+                                 f"that {path} does not define; build it in full")
+        old = list(body)[first:last + 1]
+        replaced += len([el for el in old if el.tag not in (_START, _END)])
+        mark_start, mark_end = bookmark_range(bookmarks[name], bookmark_id)
+        old[0].addprevious(mark_start)
+        for el in old:
+            body.remove(el)
+        for mark in [el for el in body.iter(_START, _END) if el.get(_ID) == bookmark_id and el is not mark_start]:
+            mark.getparent().remove(mark)
+        anchor = mark_start
+        for el in elements + [mark_end]:
+            anchor.addnext(el)
+            anchor = el
+    apply_keep_hints(document)
+    xml = etree.tostring(document, encoding="UTF-8", standalone=True)
+    written, _ = write_if_changed(replace_parts(data, {DOCUMENT_PART: xml}), path)
+    return report, written, {
+        "sections": [name for name, _, _ in sections],
+        "blocks_replaced": replaced,
+        "blocks_inserted": sum(len(els) for els in fresh.values()),
+        "document_bytes": len(xml),
+        "parse_seconds": loaded - start,
+        "render_seconds": rendered - loaded,
+        "write_seconds": time.perf_counter() - rendered,
+    }
+
+
+def print_patch_report(out, report, seconds, stats, written=True):
+    s = stats
+    state = "Patched" if written else "Unchanged"
+    print(f"[OK] {state}: {out}  ({', '.join(s['sections'])} in {seconds * 1000:.0f} ms)")
+    print(f"     Blocks: {s['blocks_replaced']} replaced by {s['blocks_inserted']}; "
+          f"{os.path.basename(DOCUMENT_PART)} rewritten ({s['document_bytes'] / 1024:.1f} KB), other parts copied")
+    hits = sum(1 for r in report if r["status"] == "hit")
+    print(f"     Time: read {s['parse_seconds'] * 1000:.0f} ms, render {s['render_seconds'] * 1000:.0f} ms "
+          f"({hits}/{len(report)} from cache), write {s['write_seconds'] * 1000:.0f} ms")
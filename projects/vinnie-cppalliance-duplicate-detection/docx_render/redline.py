@@ -0,0 +1,570 @@
+"""
+Redline: two revisions of a deliverable as one .docx with native tracked changes.
+
+redline_package() aligns the body blocks (paragraphs, tables, section
+bookmarks) of the old and the new package by a hash of their content, so
+unchanged blocks cost one hash each and the edit script is found on the
+short sequence of blocks, not on the text. Only where blocks differ does it
+go further:
+
+    block kept                 the new block, as is
+    block added / removed      every run in w:ins / w:del, the paragraph mark
+                               and table rows marked too
+    paragraph edited           a token-level diff of its runs: w:ins / w:del
+                               around the changed words, w:rPrChange where
+                               only the formatting changed, w:pPrChange where
+                               the paragraph properties did
+    table edited               rows aligned the same way, edited rows cell by
+                               cell down to their paragraphs
+
+Both alignments are Myers' O((N+M)D) diff after the common head and tail
+are trimmed, so a revision with a few edits costs close to a linear scan.
+Removed and edited blocks within a change are paired by word overlap
+inside a small window. The result is the new package with only
+word/document.xml rewritten (merge.replace_parts()), so its styles,
+numbering, footer and properties are the new render's; Word shows the
+changes with Accept / Reject as for edits made in Word.
+
+    python redline_docx.py v1.0/CONSULTANT-PAPER-AGENT-ARCHITECTURE.docx CONSULTANT-PAPER-AGENT-ARCHITECTURE.docx
+    python generate_docx.py --redline v1.0/CONSULTANT-PAPER-AGENT-ARCHITECTURE.docx
+
+Changes carry an author and, only when given, a date, so the same two
+revisions always give the same redline. Blocks that refer to a part of the
+old package (images, hyperlinks) cannot be carried over and are an error.
+"""
+
+import copy
+import datetime as dt
+import hashlib
+import io
+import itertools
+import re
+import zipfile
+
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from lxml import etree
+
+from .merge import replace_parts
+from .parallel_render import PART_REFS
+from .reproducible import write_if_changed
+
+DOCUMENT_PART = "word/document.xml"
+DEFAULT_AUTHOR = "SG Consulting"
+REDLINE_SUFFIX = ".redline.docx"
+# Removed and added blocks of one change are paired when they share this much
+# of their words, looking this many blocks ahead
+PAIR_SIMILARITY = 0.5
+PAIR_WINDOW = 8
+# Past this many block edits the changed stretch is treated as replaced outright
+MAX_EDITS = 2000
+TOKEN = re.compile(r"\w+|\s+|[^\w\s]")
+WORD = re.compile(r"\w+")
+
+_P, _TBL, _TR, _TC, _R = qn("w:p"), qn("w:tbl"), qn("w:tr"), qn("w:tc"), qn("w:r")
+_PPR, _RPR, _TRPR, _TCPR, _SECTPR = qn("w:pPr"), qn("w:rPr"), qn("w:trPr"), qn("w:tcPr"), qn("w:sectPr")
+_T, _DEL_TEXT, _INSTR, _DEL_INSTR = qn("w:t"), qn("w:delText"), qn("w:instrText"), qn("w:delInstrText")
+_START, _END, _ID = qn("w:bookmarkStart"), qn("w:bookmarkEnd"), qn("w:id")
+_MARKS = (_START, _END)
+_INS, _DEL = qn("w:ins"), qn("w:del")
+# Old-revision annotations that would clash with, or dangle in, the new package
+_OLD_ANNOTATIONS = _MARKS + (qn("w:commentRangeStart"), qn("w:commentRangeEnd"), qn("w:commentReference"))
+# Word's editing noise, left out of every comparison
+_NOISE = (qn("w:proofErr"), qn("w:lastRenderedPageBreak"))
+# Paragraph children a token diff understands; anything else is redlined whole
+_TOKEN_CHILDREN = (_PPR, _R) + _MARKS + _NOISE
+# pPr children that follow its rPr (CT_PPr sequence)
+_AFTER_PARA_RPR = (_SECTPR, qn("w:pPrChange"))
+_XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+_XMLNS = re.compile(rb' xmlns(?::\w+)?="[^"]*"')
+_IGNORED_MARKERS = (b"w:rsid", b"<w:bookmark", b"<w:proofErr", b"<w:lastRenderedPageBreak")
+_IGNORED = re.compile(rb' w:rsid\w*="[^"]*"|<w:(?:bookmarkStart|bookmarkEnd|proofErr|lastRenderedPageBreak)\b[^>]*/>')
+_IDS = etree.XPath(".//@w:id", namespaces={"w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"})
+# Plain lxml elements: python-docx's classes override .text on paragraphs and runs
+_PARSER = etree.XMLParser(resolve_entities=False, huge_tree=True)
+
+
+# ── Hashing ──
+
+def _digest(el):
+    """Hash of el's XML without bookmarks, rsids and proofing marks (which
+    Word adds on every save), nor the namespace declarations tostring()
+    copies onto it from the document (Word declares more of them)."""
+    xml = etree.tostring(el, with_tail=False)
+    end = xml.index(b">")
+    xml = _XMLNS.sub(b"", xml[:end]) + xml[end:]
+    if any(marker in xml for marker in _IGNORED_MARKERS):
+        xml = _IGNORED.sub(b"", xml)
+    return hashlib.blake2b(xml, digest_size=16).digest()
+
+
+def block_key(el):
+    """Content hash of a block (a bookmark mark: its tag and name)."""
+    if el.tag in _MARKS:
+        return (el.tag, el.get(qn("w:name")) or el.get(_ID))
+    return _digest(el)
+
+
+def _props_key(el):
+    return b"" if el is None else _digest(el)
+
+
+# ── Myers diff ──
+
+def _edit_path(a, b, max_edits):
+    """[(x, y) of every step] of a shortest edit script from a to b, or None past max_edits."""
+    n, m = len(a), len(b)
+    v = {1: 0}
+    trace = []
+    for d in range(min(n + m, max_edits) + 1):
+        trace.append(v.copy())
+        for k in range(-d, d + 1, 2):
+            if k == -d or k != d and v[k - 1] < v[k + 1]:
+                x = v[k + 1]
+            else:
+                x = v[k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, n, m)
+    return None
+
+
+def _backtrack(trace, x, y):
+    path = [(x, y)]
+    for d in range(len(trace) - 1, -1, -1):
+        v = trace[d]
+        k = x - y
+        prev_k = k + 1 if k == -d or k != d and v[k - 1] < v[k + 1] else k - 1
+        prev_x = v[prev_k] if d else 0
+        prev_y = prev_x - prev_k if d else 0
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            path.append((x, y))
+        if d:
+            x, y = prev_x, prev_y
+            path.append((x, y))
+    return path[::-1]
+
+
+def diff_opcodes(a, b, max_edits=None):
+    """[(tag, i1, i2, j1, j2)] turning a into b, tags "equal", "delete",
+    "insert" and "replace" as in difflib, by Myers' algorithm."""
+    head = 0
+    while head < len(a) and head < len(b) and a[head] == b[head]:
+        head += 1
+    tail = 0
+    while tail < len(a) - head and tail < len(b) - head and a[-1 - tail] == b[-1 - tail]:
+        tail += 1
+    mid_a, mid_b = a[head:len(a) - tail], b[head:len(b) - tail]
+    path = _edit_path(mid_a, mid_b, max_edits if max_edits is not None else len(mid_a) + len(mid_b))
+    if path is None:
+        path = [(0, 0), (len(mid_a), len(mid_b))]
+    ops = [("equal", 0, head, 0, head)] if head else []
+    for (x0, y0), (x1, y1) in zip(path, path[1:]):
+        tag = "equal" if x1 - x0 == y1 - y0 == 1 and mid_a[x0] == mid_b[y0] else \
+            "delete" if y1 == y0 else "insert" if x1 == x0 else "replace"
+        x0, x1, y0, y1 = x0 + head, x1 + head, y0 + head, y1 + head
+        if ops and (ops[-1][0] == tag or {ops[-1][0], tag} <= {"delete", "insert", "replace"}):
+            last = ops[-1]
+            tag = tag if last[0] == tag else "replace"
+            ops[-1] = (tag, last[1], x1, last[3], y1)
+        else:
+            ops.append((tag, x0, x1, y0, y1))
+    if tail:
+        ops.append(("equal", len(a) - tail, len(a), len(b) - tail, len(b)))
+    return [op for op in ops if op[1] != op[2] or op[3] != op[4]]
+
+
+# ── Marking ──
+
+class Redline:
+    """Author, date and revision ids of one redline; counts what it marks."""
+
+    def __init__(self, author=DEFAULT_AUTHOR, date=None, first_id=1):
+        self.author = author
+        self.date = date
+        self._ids = itertools.count(first_id)
+        self.stats = {"blocks": 0, "kept": 0, "inserted": 0, "deleted": 0, "edited": 0,
+                      "words_inserted": 0, "words_deleted": 0, "reformatted": 0}
+
+    def mark(self, kind):
+        """A w:ins / w:del / w:rPrChange / w:pPrChange element."""
+        attrs = {qn("w:id"): str(next(self._ids)), qn("w:author"): self.author}
+        if self.date:
+            attrs[qn("w:date")] = self.date
+        return OxmlElement(f"w:{kind}", attrs)
+
+    def wrap(self, kind, runs):
+        el = self.mark(kind)
+        for r in runs:
+            el.append(r)
+        return el
+
+
+def _words(el):
+    return set(TOKEN.findall("".join(el.itertext()))) - {" "}
+
+
+def _similar(a, b):
+    words_a, words_b = _words(a), _words(b)
+    if not words_a and not words_b:
+        return True
+    return len(words_a & words_b) / len(words_a | words_b) >= PAIR_SIMILARITY
+
+
+def _deleted_run(r):
+    for el in r.iter(_T, _INSTR):
+        el.tag = _DEL_TEXT if el.tag == _T else _DEL_INSTR
+    return r
+
+
+def _mark_paragraph(p, kind, redline):
+    """p with its runs and paragraph mark marked inserted or deleted."""
+    for r in list(p.iter(_R)):
+        if r.getparent().tag in (_INS, _DEL):
+            continue
+        redline.stats["words_inserted" if kind == "ins" else "words_deleted"] += len(WORD.findall("".join(r.itertext())))
+        r.addprevious(redline.wrap(kind, []))
+        r.getprevious().append(_deleted_run(r) if kind == "del" else r)
+    pPr = p.find(_PPR)
+    if pPr is None:
+        pPr = OxmlElement("w:pPr")
+        p.insert(0, pPr)
+    rPr = pPr.find(_RPR)
+    if rPr is None:
+        rPr = OxmlElement("w:rPr")
+        after = [el for el in pPr if el.tag in _AFTER_PARA_RPR]
+        if after:
+            after[0].addprevious(rPr)
+        else:
+            pPr.append(rPr)
+    rPr.insert(0, redline.mark(kind))
+    return p
+
+
+def _mark_row(tr, kind, redline):
+    trPr = tr.find(_TRPR)
+    if trPr is None:
+        trPr = OxmlElement("w:trPr")
+        tr.insert(1 if len(tr) and tr[0].tag == qn("w:tblPrEx") else 0, trPr)
+    change = trPr.find(qn("w:trPrChange"))
+    if change is not None:
+        change.addprevious(redline.mark(kind))
+    else:
+        trPr.append(redline.mark(kind))
+    return tr
+
+
+def mark_block(el, kind, redline):
+    """A copy of a whole paragraph or table, marked inserted ("ins") or deleted ("del")."""
+    el = copy.deepcopy(el)
+    for tr in el.iter(_TR):
+        _mark_row(tr, kind, redline)
+    for p in list(el.iter(_P)):
+        _mark_paragraph(p, kind, redline)
+    return el
+
+
+# ── Paragraphs ──
+
+def _tokens(p):
+    """[(key, text or element, rPr)] of the runs of p; text splits into words."""
+    out = []
+    for r in p.iter(_R):
+        rPr = r.find(_RPR)
+        for child in r:
+            if child.tag == _RPR or child.tag in _NOISE:
+                continue
+            if child.tag == _T:
+                out += [(word, word, rPr) for word in TOKEN.findall(child.text or "")]
+            else:
+                out.append((etree.tostring(child), child, rPr))
+    return out
+
+
+def _word_count(tokens):
+    return sum(1 for _, value, _ in tokens if isinstance(value, str) and WORD.match(value))
+
+
+def _run(tokens, deleted=False):
+    """One run holding tokens that share their properties."""
+    r = OxmlElement("w:r")
+    rPr = tokens[0][2]
+    if rPr is not None:
+        r.append(copy.deepcopy(rPr))
+    text = []
+    for _, value, _ in tokens + [(None, None, None)]:
+        if isinstance(value, str):
+            text.append(value)
+            continue
+        if text:
+            t = OxmlElement("w:delText" if deleted else "w:t")
+            t.text = "".join(text)
+            if t.text != t.text.strip() or "  " in t.text:
+                t.set(_XML_SPACE, "preserve")
+            r.append(t)
+            text = []
+        if value is not None:
+            el = copy.deepcopy(value)
+            r.append(_deleted_run(el) if deleted else el)
+    return r
+
+
+def _runs(tokens, deleted=False):
+    return [_run(list(group), deleted) for _, group in itertools.groupby(tokens, key=lambda t: _props_key(t[2]))]
+
+
+def _paragraph_changed(old, new, redline):
+    """new with the token-level changes from old marked, or None when the two
+    are not token-diffable (fields spanning runs, hyperlinks, earlier revisions)."""
+    if any(el.tag not in _TOKEN_CHILDREN for p in (old, new) for el in p):
+        return None
+    a, b = _tokens(old), _tokens(new)
+    out = new
+    for el in list(out):
+        if el.tag not in (_PPR,) + _MARKS:
+            out.remove(el)
+    for tag, i1, i2, j1, j2 in diff_opcodes([t[0] for t in a], [t[0] for t in b]):
+        if tag in ("delete", "replace"):
+            redline.stats["words_deleted"] += _word_count(a[i1:i2])
+            out.append(redline.wrap("del", _runs(a[i1:i2], deleted=True)))
+        if tag in ("insert", "replace"):
+            redline.stats["words_inserted"] += _word_count(b[j1:j2])
+            out.append(redline.wrap("ins", _runs(b[j1:j2])))
+        if tag == "equal":
+            # Same words: a run per new formatting, noting the old one where it differs
+            pairs = list(zip(a[i1:i2], b[j1:j2]))
+            for _, group in itertools.groupby(pairs, key=lambda ab: (_props_key(ab[1][2]), _props_key(ab[0][2]))):
+                group = list(group)
+                r = _run([new_token for _, new_token in group])
+                old_rPr, new_rPr = group[0][0][2], group[0][1][2]
+                if _props_key(old_rPr) != _props_key(new_rPr):
+                    redline.stats["reformatted"] += 1
+                    rPr = r.find(_RPR)
+                    if rPr is None:
+                        rPr = OxmlElement("w:rPr")
+                        r.insert(0, rPr)
+                    change = redline.mark("rPrChange")
+                    change.append(copy.deepcopy(old_rPr) if old_rPr is not None else OxmlElement("w:rPr"))
+                    rPr.append(change)
+                out.append(r)
+    _note_paragraph_properties(old, out, redline)
+    return out
+
+
+def _note_paragraph_properties(old, new, redline):
+    """Add a w:pPrChange to new when its paragraph properties differ from old's."""
+    def bare(p):
+        pPr = p.find(_PPR)
+        if pPr is None:
+            return None
+        pPr = copy.deepcopy(pPr)
+        for el in pPr.findall(_RPR) + [el for el in pPr if el.tag in _AFTER_PARA_RPR]:
+            pPr.remove(el)
+        return pPr
+    old_pPr, new_pPr = bare(old), bare(new)
+    if _props_key(old_pPr) == _props_key(new_pPr):
+        return
+    pPr = new.find(_PPR)
+    if pPr is None:
+        pPr = OxmlElement("w:pPr")
+        new.insert(0, pPr)
+    change = redline.mark("pPrChange")
+    change.append(old_pPr if old_pPr is not None else OxmlElement("w:pPr"))
+    pPr.append(change)
+
+
+# ── Tables ──
+
+def _cell_blocks(tc):
+    return [el for el in tc if el.tag != _TCPR]
+
+
+def _columns(tbl):
+    grid = tbl.find(qn("w:tblGrid"))
+    return 0 if grid is None else len(grid)
+
+
+def _row_changed(old, new, redline):
+    old_cells, new_cells = old.findall(_TC), new.findall(_TC)
+    if len(old_cells) != len(new_cells):
+        return None
+    for old_tc, tc in zip(old_cells, new_cells):
+        blocks = redline_blocks(_cell_blocks(old_tc), _cell_blocks(tc), redline, count=False)
+        for el in _cell_blocks(tc):
+            tc.remove(el)
+        tc.extend(blocks)
+    return new
+
+
+def _table_changed(old, new, redline):
+    """new with its rows aligned against old's and the changes marked, or
+    None when the column grids differ."""
+    if _columns(old) != _columns(new):
+        return None
+    old_rows, new_rows = old.findall(_TR), new.findall(_TR)
+    ops = diff_opcodes([block_key(tr) for tr in old_rows], [block_key(tr) for tr in new_rows], MAX_EDITS)
+    out = new
+    for tr in new_rows:
+        out.remove(tr)
+    for tag, i1, i2, j1, j2 in ops:
+        if tag == "equal":
+            out.extend(new_rows[j1:j2])
+            continue
+        for old_tr, new_tr in _pair(old_rows[i1:i2], new_rows[j1:j2]):
+            row = _row_changed(old_tr, new_tr, redline) if old_tr is not None and new_tr is not None else None
+            if row is not None:
+                out.append(row)
+                continue
+            if old_tr is not None:
+                out.append(mark_block(old_tr, "del", redline))
+            if new_tr is not None:
+                out.append(mark_block(new_tr, "ins", redline))
+    return out
+
+
+# ── Blocks ──
+
+def _pair(removed, added):
+    """[(old or None, new or None)] in document order: a removed block meets the
+    first added block of its kind within PAIR_WINDOW that shares enough words."""
+    out = []
+    j = 0
+    for old in removed:
+        match = None
+        for k in range(j, min(j + PAIR_WINDOW, len(added))):
+            if added[k].tag == old.tag and _similar(old, added[k]):
+                match = k
+                break
+        if match is None:
+            out.append((old, None))
+            continue
+        out += [(None, new) for new in added[j:match]] + [(old, added[match])]
+        j = match + 1
+    return out + [(None, new) for new in added[j:]]
+
+
+def _changed(old, new, redline):
+    if old.tag == _P:
+        return _paragraph_changed(old, new, redline)
+    if old.tag == _TBL:
+        return _table_changed(old, new, redline)
+    return None
+
+
+def redline_blocks(old, new, redline, count=True):
+    """The new block elements with the changes from the old ones marked."""
+    out = []
+    stats = redline.stats
+    ops = diff_opcodes([block_key(el) for el in old], [block_key(el) for el in new], MAX_EDITS)
+    for tag, i1, i2, j1, j2 in ops:
+        if tag == "equal":
+            out += new[j1:j2]
+            if count:
+                stats["kept"] += sum(1 for el in new[j1:j2] if el.tag not in _MARKS)
+            continue
+        # Section bookmarks of the new revision pass through unmarked, in place
+        marks = iter(new[j1:j2])
+        for old_el, new_el in _pair(old[i1:i2], [el for el in new[j1:j2] if el.tag not in _MARKS]):
+            if new_el is not None:
+                out += itertools.takewhile(lambda el: el is not new_el, marks)
+            if old_el is not None and PART_REFS(old_el):
+                raise ValueError("a changed block of the old revision refers to one of its parts "
+                                 "(image, link); it cannot be carried into the redline")
+            changed = _changed(old_el, new_el, redline) if old_el is not None and new_el is not None else None
+            if changed is not None:
+                out.append(changed)
+                if count:
+                    stats["edited"] += 1
+                continue
+            if old_el is not None:
+                out.append(mark_block(old_el, "del", redline))
+                if count:
+                    stats["deleted"] += 1
+            if new_el is not None:
+                out.append(mark_block(new_el, "ins", redline))
+                if count:
+                    stats["inserted"] += 1
+        out += marks
+    return out
+
+
+def _body_blocks(body):
+    return [el for el in body if el.tag != _SECTPR and el.tag not in _NOISE]
+
+
+def _document(data, name):
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as z:
+            return etree.fromstring(z.read(DOCUMENT_PART), _PARSER)
+    except (zipfile.BadZipFile, KeyError) as e:
+        raise ValueError(f"{name} is not a Word document ({e})") from e
+
+
+def redline_package(old_data, new_data, author=DEFAULT_AUTHOR, date=None):
+    """(package bytes, stats): the new package with the changes from the old
+    one tracked in word/document.xml."""
+    documents = [_document(old_data, "the old revision"), _document(new_data, "the new revision")]
+    old_body, body = (document.find(qn("w:body")) for document in documents)
+    for el in list(old_body.iter(*_OLD_ANNOTATIONS)):
+        el.getparent().remove(el)
+    ids = [int(i) for i in _IDS(body) if i.isdigit()]
+    redline = Redline(author, date, max(ids, default=0) + 1)
+    new_blocks = _body_blocks(body)
+    blocks = redline_blocks(_body_blocks(old_body), new_blocks, redline)
+    redline.stats["blocks"] = len(blocks)
+    # Kept blocks stay where they are (in order); marked copies go in after
+    # the block ahead of them, and replaced blocks come out
+    originals = set(new_blocks)
+    anchor = None
+    for el in blocks:
+        if el not in originals:
+            if anchor is None:
+                body.insert(0, el)
+            else:
+                anchor.addnext(el)
+        anchor = el
+    for el in originals - set(blocks):
+        body.remove(el)
+    xml = etree.tostring(documents[1], encoding="UTF-8", standalone=True)
+    return replace_parts(new_data, {DOCUMENT_PART: xml}), redline.stats
+
+
+def date_stamp(value):
+    """An ISO 8601 date or date and time as a w:date value (UTC)."""
+    when = dt.datetime.fromisoformat(value)
+    if when.tzinfo is not None:
+        when = when.astimezone(dt.timezone.utc)
+    return when.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def redline_name(path):
+    """<stem>.redline.docx next to path."""
+    return path[:-len(".docx")] + REDLINE_SUFFIX if path.endswith(".docx") else path + REDLINE_SUFFIX
+
+
+def redline_file(old, new, out=None, author=DEFAULT_AUTHOR, date=None):
+    """Write the redline of the .docx at old against the one at new; returns (out, written, stats)."""
+    with open(old, "rb") as f:
+        old_data = f.read()
+    with open(new, "rb") as f:
+        new_data = f.read()
+    data, stats = redline_package(old_data, new_data, author, date)
+    out = out or redline_name(new)
+    written, _ = write_if_changed(data, out)
+    return out, written, stats
+
+
+def redline_note(stats):
+    """One line summary of a redline's stats."""
+    s = stats
+    if not (s["inserted"] or s["deleted"] or s["edited"]):
+        return "no changes"
+    return (f"{s['edited']} blocks edited, {s['inserted']} added, {s['deleted']} removed, {s['kept']} kept; "
+            f"+{s['words_inserted']} / -{s['words_deleted']} words"
+            + (f", {s['reformatted']} formatting changes" if s["reformatted"] else ""))
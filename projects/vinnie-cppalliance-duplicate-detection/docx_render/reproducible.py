@@ -0,0 +1,105 @@
+"""
+Byte-reproducible .docx packages and skip-if-unchanged writes.
+
+python-docx stamps every ZIP entry with the time of the save, so the same
+content never gives the same file. package_bytes() normalizes the core
+properties and repacks the saved package: entries in a fixed order, one
+fixed timestamp, fixed compression level and host attributes. The
+timestamp comes from SOURCE_DATE_EPOCH when that is set, otherwise from the
+template's creation date. Relationship ids need no rewriting, since
+python-docx numbers them in build order, which the section cache and the
+worker merge keep. write_if_changed() compares the digest with the file
+already on disk and leaves it untouched when they match, so the committed
+.docx files, artifact caches and CI can key on the hash.
+"""
+
+import datetime as dt
+import hashlib
+import io
+import os
+import zipfile
+
+ZIP_EPOCH = dt.datetime(1980, 1, 1, tzinfo=dt.timezone.utc)
+COMPRESS_LEVEL = 6
+# OPC consumers read [Content_Types].xml and the package rels first
+LEADING_PARTS = ("[Content_Types].xml", "_rels/.rels")
+
+
+def build_time(doc=None):
+    """SOURCE_DATE_EPOCH, else the template's creation date, else the ZIP epoch (UTC)."""
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if epoch:
+        return max(dt.datetime.fromtimestamp(int(epoch), dt.timezone.utc), ZIP_EPOCH)
+    created = doc.core_properties.created if doc is not None else None
+    if created is None:
+        return ZIP_EPOCH
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=dt.timezone.utc)
+    return max(created, ZIP_EPOCH)
+
+
+def normalize_core_properties(doc, when):
+    """Pin docProps/core.xml: created = modified = when, revision 1, no last editor."""
+    props = doc.core_properties
+    stamp = when.replace(tzinfo=None)
+    props.created = stamp
+    props.modified = stamp
+    props.revision = 1
+    props.last_modified_by = ""
+
+
+def repack(data, when=ZIP_EPOCH, level=COMPRESS_LEVEL):
+    """The package data with fixed entry order, timestamps and attributes."""
+    date_time = when.timetuple()[:6]
+    out = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(data)) as src, zipfile.ZipFile(out, "w") as dst:
+        names = [i.filename for i in src.infolist()]
+        ordered = [n for n in LEADING_PARTS if n in names] + sorted(n for n in names if n not in LEADING_PARTS)
+        for name in ordered:
+            info = zipfile.ZipInfo(name, date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.create_system = 0
+            info.external_attr = 0
+            dst.writestr(info, src.read(name), compresslevel=level)
+    return out.getvalue()
+
+
+def package_bytes(doc):
+    """doc saved as a reproducible .docx (see module docstring)."""
+    when = build_time(doc)
+    normalize_core_properties(doc, when)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return repack(buf.getvalue(), when)
+
+
+def file_digest(path):
+    """sha256 hex digest of a file, or None if it does not exist."""
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                h.update(block)
+    except FileNotFoundError:
+        return None
+    return h.hexdigest()
+
+
+def write_if_changed(data, out):
+    """Atomically write data to out unless out already holds exactly these bytes.
+
+    Returns (written, sha256 hex digest of data).
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    if file_digest(out) == digest:
+        return False, digest
+    tmp = os.path.join(os.path.dirname(out) or ".", f".{os.path.basename(out)}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, out)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return True, digest
@@ -0,0 +1,246 @@
+"""
+Incremental per-section build cache for the DOCX generators.
+
+Each section (a build_* function or a Markdown chunk) renders to a run of
+body elements. render_sections() stores that XML under .docx-cache/, keyed by
+a hash of the section's source plus a version hash of the helpers and styles
+it is rendered with. On the next build unchanged sections are spliced
+straight back into the body and only dirty sections run through python-docx.
+The cache is shared by every document, so it is not cleared per build but
+capped: a hit refreshes its entry's mtime, and a build that stored new
+entries prunes the least recently used files past CACHE_MAX_BYTES.
+
+Every section's run of body elements is bracketed by a hidden bookmark
+named after the section (section_bookmarks()), so patch.py can find and
+replace one section inside a saved package. The bookmarks are not part of
+the cached XML.
+"""
+
+import ast
+import copy
+import hashlib
+import os
+import re
+import sys
+import time
+
+import docx
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+from lxml import etree
+
+from .build_report import element_stats, memory_mark, memory_peak_kb
+from .cli import CACHE_DIR
+from .parallel_render import PART_REFS, merge_fragment, render_in_workers
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Package modules whose code shapes every section's XML
+SHARED_MODULES = ("doc_styles", "oxml_fragments", "table_source", "layout_estimate", "column_widths", "oxml_table",
+                  "helpers", "ir", "ir_docx", "section_cache", "parallel_render")
+# Word hides bookmarks whose name starts with "_"; names are limited to 40 characters
+BOOKMARK_PREFIX = "_Section_"
+BOOKMARK_LENGTH = 40
+# Size of .docx-cache/ (all deliverables together need a few MB)
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+def function_sources(module):
+    """{name: source} for the module's top-level functions, from one ast.parse
+    of its file (inspect.getsource re-tokenizes the file for every function)."""
+    with open(module.__file__, encoding="utf-8") as f:
+        text = f.read()
+    lines = text.splitlines(keepends=True)
+    sources = {}
+    for node in ast.parse(text).body:
+        if isinstance(node, ast.FunctionDef):
+            first = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            sources[node.name] = "".join(lines[first - 1:node.end_lineno])
+    return sources
+
+
+def helper_version(*modules, sections=()):
+    """Hash of what a section's output depends on besides its own source:
+    python-docx, the shared rendering modules and the modules' non-section functions."""
+    h = hashlib.sha256(docx.__version__.encode())
+    for name in SHARED_MODULES:
+        with open(os.path.join(HERE, name + ".py"), "rb") as f:
+            h.update(f.read())
+    skip = {fn.__name__ for fn in sections}
+    for module in modules:
+        for name, source in sorted(function_sources(module).items()):
+            if name not in skip:
+                h.update(source.encode())
+    return h.hexdigest()
+
+
+def function_sections(functions):
+    """(name, source, render) triples for build_* functions taking a doc.
+
+    A functools.partial of one (merge.bind_fields) keys on its bound arguments too.
+    """
+    by_module = {}
+    out = []
+    for fn in functions:
+        build = getattr(fn, "func", fn)
+        module = sys.modules[build.__module__]
+        if module not in by_module:
+            by_module[module] = function_sources(module)
+        source = by_module[module][build.__name__]
+        if build is not fn:
+            source += f"# bound: {fn.args!r} {fn.keywords!r}\n"
+        out.append((build.__name__, source, fn))
+    return out
+
+
+def section_key(name, source, version):
+    return hashlib.sha256(f"{version}\0{name}\0{source}".encode()).hexdigest()[:32]
+
+
+def _splice(body, elements):
+    """Insert elements at the end of the body, ahead of its trailing w:sectPr."""
+    sectPr = body.find(qn("w:sectPr"))
+    for el in elements:
+        if sectPr is not None:
+            sectPr.addprevious(el)
+        else:
+            body.append(el)
+
+
+def section_bookmarks(names):
+    """The bookmark name of each section: prefix + the name as a word, made unique."""
+    out = []
+    for name in names:
+        stem = (BOOKMARK_PREFIX + re.sub(r"\W+", "_", name).strip("_"))[:BOOKMARK_LENGTH]
+        bookmark, n = stem, 1
+        while bookmark in out:
+            n += 1
+            bookmark = f"{stem[:BOOKMARK_LENGTH - len(str(n)) - 1]}_{n}"
+        out.append(bookmark)
+    return out
+
+
+def bookmark_range(bookmark, bookmark_id):
+    """The bookmarkStart / bookmarkEnd pair bracketing a section in the body."""
+    start = parse_xml(f'<w:bookmarkStart {nsdecls("w")} w:id="{bookmark_id}" w:name="{bookmark}"/>')
+    end = parse_xml(f'<w:bookmarkEnd {nsdecls("w")} w:id="{bookmark_id}"/>')
+    return start, end
+
+
+def _mark(body, elements, bookmark, bookmark_id):
+    """Bracket a section's elements (already in the body) with its bookmark."""
+    start, end = bookmark_range(bookmark, bookmark_id)
+    if elements:
+        elements[0].addprevious(start)
+        elements[-1].addnext(end)
+    else:
+        _splice(body, [start, end])
+
+
+def _store(path, elements):
+    """Write elements as one fragment file (atomically); False if not cacheable."""
+    wrapper = parse_xml(f'<w:body {nsdecls("w", "r")}/>')
+    for el in elements:
+        if PART_REFS(el):
+            return False  # refers to a part relationship of this document
+        wrapper.append(copy.deepcopy(el))
+    etree.cleanup_namespaces(wrapper)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(etree.tostring(wrapper))
+    os.replace(tmp, path)
+    return True
+
+
+def render_sections(doc, sections, cache_dir=CACHE_DIR, version="", jobs=1, factory=None):
+    """Render (name, source, render) sections into doc in order, reusing cached XML.
+
+    cache_dir=None disables the cache. With jobs > 1 the sections that are not
+    cached are rendered in worker processes, each into a document made by
+    factory (see parallel_render), and merged in order. Returns one dict per
+    section: name, status ("hit", "miss" or "off"), seconds, peak_kb and the
+    element counts of build_report.element_stats(). Each section is bracketed
+    by its bookmark (section_bookmarks()), numbered in section order.
+    """
+    body = doc.element.body
+    paths = [os.path.join(cache_dir, section_key(name, source, version) + ".xml") if cache_dir else None
+             for name, source, _ in sections]
+    # Hits are read here, where they are decided: another build's prune_cache() may delete any file later
+    cached = {}
+    for i, path in enumerate(paths):
+        if path:
+            try:
+                with open(path, "rb") as f:
+                    cached[i] = f.read()
+            except FileNotFoundError:
+                pass
+    todo = [i for i in range(len(sections)) if i not in cached]
+    bookmarks = section_bookmarks([name for name, _, _ in sections])
+    payloads = {}
+    if jobs > 1 and factory is not None and len(todo) > 1:
+        results = render_in_workers(factory, [sections[i][2] for i in todo], jobs)
+        payloads = dict(zip(todo, results))
+
+    report = []
+    stored = False
+    for i, (name, _, render) in enumerate(sections):
+        start = time.perf_counter()
+        mark = memory_mark()
+        path = paths[i]
+        status = "miss" if path else "off"
+        payload = payloads.get(i)
+        if i in cached:
+            status = "hit"
+            elements = list(parse_xml(cached.pop(i)))
+            try:
+                os.utime(path)  # recently used: kept by prune_cache()
+            except FileNotFoundError:
+                pass
+            _splice(body, elements)
+        elif payload and payload[0] is not None:
+            elements = merge_fragment(doc, payload)
+            _splice(body, elements)
+            start -= payload[-1]  # rendered in a worker: report its time
+        else:
+            tail = 1 if body.find(qn("w:sectPr")) is not None else 0
+            first = len(body) - tail
+            render(doc)
+            elements = body[first:len(body) - tail]
+        seconds = time.perf_counter() - start
+        peak_kb = memory_peak_kb(mark)
+        if path and status != "hit":
+            stored = _store(path, elements) or stored
+        _mark(body, elements, bookmarks[i], i)
+        report.append({"name": name, "status": status, "seconds": seconds, "peak_kb": peak_kb,
+                       **element_stats(elements)})
+    if stored:
+        prune_cache(cache_dir, keep={p for p in paths if p})
+    return report
+
+
+def prune_cache(cache_dir, max_bytes=CACHE_MAX_BYTES, keep=()):
+    """Delete the least recently used files of cache_dir (oldest mtime first)
+    until it holds at most max_bytes; the paths in keep stay. Returns the
+    number of files deleted."""
+    entries = []
+    total = 0
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if entry.is_file() and not entry.name.endswith(".tmp"):  # .tmp: a write in progress
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+    deleted = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path in keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError:  # already gone (another build pruned it)
+            continue
+        total -= size
+        deleted += 1
+    return deleted
@@ -0,0 +1,320 @@
+"""
+Local rendering service: .docx deliverables over HTTP, straight from memory.
+
+RenderService answers on an asyncio server (no web framework needed):
+
+    GET  /documents                      ids, output names and merge fields
+    GET  /documents/<id>.docx?f=v&...    the document with those field values
+    POST /documents/<id>.docx            the same, fields as a JSON object
+    GET  /stats                          cache and worker counters
+
+Every document is rendered once at start-up, with a placeholder for each
+merge field (build_templates(), as for --merge), into a merge.Template. A
+pool of worker processes is warmed with those templates before the first
+request, so a request costs one placeholder join and one deflate per
+patched part (word/document.xml, word/footer1.xml); python-docx is not
+touched again. Finished packages go into a PackageCache: an LRU capped at
+a total size, keyed by the digest of the document id and every field
+value (defaults filled in), so a repeated request is answered from memory
+without reaching a worker, and identical requests in flight share one
+render. The event loop only parses requests and writes responses, so it
+stays responsive while the workers render.
+
+    python serve_docx.py --port 8765 --jobs 4
+    curl -o proposal.docx "http://127.0.0.1:8765/documents/paper.docx?prepared_for=ACME&version=1.1"
+"""
+
+import asyncio
+import collections
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from .merge import Template, placeholders
+from .section_cache import CACHE_DIR
+
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+CACHE_BYTES = 64 * 1024 * 1024
+MAX_BODY = 64 * 1024
+DOCUMENT_PREFIX, DOCUMENT_SUFFIX = "/documents/", ".docx"
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+
+_templates = None  # the worker's {id: Template}, set by _init_worker
+
+
+class RequestError(Exception):
+    """A request the service answers with an HTTP error status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ── Templates ──
+
+def build_templates(documents, cache_dir=CACHE_DIR):
+    """{id: (Template, output name)} of {id: generator module}, each rendered once
+    with placeholders (unchanged sections come from the section cache)."""
+    templates = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for doc_id, module in documents.items():
+            path = module.render(tmp, cache_dir, fields=placeholders(module.FIELDS))[0]
+            with open(path, "rb") as f:
+                templates[doc_id] = (Template(f.read(), module.FIELDS), module.OUTPUT)
+    return templates
+
+
+def normalize_fields(template, overrides):
+    """Every field of template with overrides applied, as Template.merge() writes
+    them; raises RequestError for unknown fields or non-text values."""
+    unknown = set(overrides) - set(template.fields)
+    if unknown:
+        raise RequestError(400, f"unknown field(s) {', '.join(sorted(unknown))} "
+                                f"(fields: {', '.join(template.fields)})")
+    fields = {}
+    for name, default in template.fields.items():
+        value = overrides.get(name, default)
+        if not isinstance(value, str):
+            raise RequestError(400, f"field {name} must be a string")
+        fields[name] = " ".join(value.strip().splitlines()) or default
+    return fields
+
+
+def input_digest(doc_id, fields):
+    return hashlib.sha256(json.dumps([doc_id, fields], sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# ── Cache ──
+
+class PackageCache:
+    """Rendered packages by input digest; least recently used go first once
+    the total size passes max_bytes."""
+
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self._entries = collections.OrderedDict()
+
+    def get(self, key):
+        data = self._entries.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes or key in self._entries:
+            return
+        self._entries[key] = data
+        self.bytes += len(data)
+        while self.bytes > self.max_bytes:
+            _, old = self._entries.popitem(last=False)
+            self.bytes -= len(old)
+            self.evictions += 1
+
+    def stats(self):
+        return {"entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+# ── Workers ──
+
+def _init_worker(templates):
+    global _templates
+    _templates = templates
+
+
+def _merge(doc_id, fields):
+    return _templates[doc_id].merge(fields)
+
+
+def _ready():
+    return os.getpid()
+
+
+# ── Service ──
+
+class RenderService:
+    """Warm worker pool, package cache and HTTP front end for a set of templates."""
+
+    def __init__(self, templates, jobs=1, cache_bytes=CACHE_BYTES):
+        self.templates = {doc_id: template for doc_id, (template, _) in templates.items()}
+        self.outputs = {doc_id: output for doc_id, (_, output) in templates.items()}
+        self.jobs = max(1, jobs)
+        self.cache = PackageCache(cache_bytes)
+        self.requests = self.renders = 0
+        self._pool = None
+        self._server = None
+        self._pending = {}  # digest: future of a render in flight
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Start the workers (warm before this returns) and the server; returns (host, port)."""
+        self._pool = ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_worker,
+                                         initargs=(self.templates,))
+        loop = asyncio.get_running_loop()
+        # Each submit finds every started worker still busy in its initializer, so all of them start
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _ready) for _ in range(self.jobs)))
+        self._server = await asyncio.start_server(self._serve, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._pool is not None:
+            self._pool.shutdown()
+
+    async def render(self, doc_id, overrides):
+        """(package bytes, digest, cached) of a document with the overrides."""
+        template = self.templates.get(doc_id)
+        if template is None:
+            raise RequestError(404, f"unknown document {doc_id} (documents: {', '.join(self.templates)})")
+        fields = normalize_fields(template, overrides)
+        key = input_digest(doc_id, fields)
+        data = self.cache.get(key)
+        if data is not None:
+            return data, key, True
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._render(key, doc_id, fields))
+            self._pending[key] = pending
+            self.renders += 1
+        # Shielded for every caller: one that is cancelled must not cancel the render the others share
+        return await asyncio.shield(pending), key, False
+
+    async def _render(self, key, doc_id, fields):
+        try:
+            data = await asyncio.get_running_loop().run_in_executor(self._pool, _merge, doc_id, fields)
+        finally:
+            del self._pending[key]
+        self.cache.put(key, data)
+        return data
+
+    def stats(self):
+        return {"documents": list(self.templates), "workers": self.jobs, "requests": self.requests,
+                "renders": self.renders, "in_flight": len(self._pending), "cache": self.cache.stats()}
+
+    # ── HTTP ──
+
+    async def _serve(self, reader, writer):
+        """One connection: requests until the client closes or asks to."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 431, *self._error("request headers too large"), close=True)
+                    break
+                try:
+                    method, target, version, headers = _parse_head(head)
+                    length = int(headers.get("content-length", "0") or 0)
+                    if length < 0:
+                        raise ValueError(f"Content-Length {length}")
+                except ValueError as e:  # no way to tell where the next request starts
+                    await self._respond(writer, 400, *self._error(f"malformed request: {e}"), close=True)
+                    break
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, *self._error("request body too large"), close=True)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                close = headers.get("connection", "").lower() == "close" or version == "HTTP/1.0"
+                self.requests += 1
+                try:
+                    status, content_type, payload, extra = await self._route(method, target, body)
+                except RequestError as e:
+                    status, (content_type, payload, extra) = e.status, self._error(str(e))
+                except Exception as e:  # a failed render must not take the server down
+                    status, (content_type, payload, extra) = 500, self._error(f"{type(e).__name__}: {e}")
+                await self._respond(writer, status, content_type, payload, extra, close)
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, target, body):
+        url = urlsplit(target)
+        path = unquote(url.path)
+        if path == "/documents" or path == "/stats":
+            if method != "GET":
+                raise RequestError(405, f"{path} takes GET")
+            if path == "/stats":
+                return 200, "application/json", _json(self.stats()), {}
+            listing = {doc_id: {"output": self.outputs[doc_id], "fields": t.fields}
+                       for doc_id, t in self.templates.items()}
+            return 200, "application/json", _json(listing), {}
+        if not (path.startswith(DOCUMENT_PREFIX) and path.endswith(DOCUMENT_SUFFIX)):
+            raise RequestError(404, f"no route {path}")
+        doc_id = path[len(DOCUMENT_PREFIX):-len(DOCUMENT_SUFFIX)]
+        if method == "GET":
+            overrides = dict(parse_qsl(url.query, keep_blank_values=True))
+        elif method == "POST":
+            try:
+                overrides = json.loads(body or b"{}")
+            except ValueError as e:
+                raise RequestError(400, f"body is not JSON: {e}") from e
+            if not isinstance(overrides, dict):
+                raise RequestError(400, "body must be a JSON object of field values")
+        else:
+            raise RequestError(405, "documents take GET or POST")
+        data, key, cached = await self.render(doc_id, overrides)
+        return 200, DOCX_TYPE, data, {
+            "ETag": f'"{key}"',
+            "X-Cache": "hit" if cached else "miss",
+            "Content-Disposition": f'attachment; filename="{self.outputs[doc_id]}"',
+        }
+
+    @staticmethod
+    def _error(message):
+        return "application/json", _json({"error": message}), {}
+
+    @staticmethod
+    async def _respond(writer, status, content_type, payload, extra, close=False):
+        lines = [f"HTTP/1.1 {status} {REASONS[status]}", f"Content-Type: {content_type}",
+                 f"Content-Length: {len(payload)}", f"Connection: {'close' if close else 'keep-alive'}"]
+        lines += [f"{name}: {value}" for name, value in extra.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
+        await writer.drain()
+
+
+def _parse_head(head):
+    """(method, target, version, {lower-case header: value}) of a request head."""
+    lines = head.decode("latin-1").split("\r\n")
+    parts = lines[0].split(" ")
+    if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+        raise ValueError(f"bad request line {lines[0][:80]!r}")
+    method, target, version = parts
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return method, target, version, headers
+
+
+def _json(value):
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+async def serve(templates, host="127.0.0.1", port=8765, jobs=1, cache_bytes=CACHE_BYTES, on_ready=None):
+    """Run a RenderService until cancelled; on_ready(address, seconds to warm) once it listens."""
+    start = time.perf_counter()
+    service = RenderService(templates, jobs, cache_bytes)
+    try:
+        address = await service.start(host, port)
+        if on_ready:
+            on_ready(address, time.perf_counter() - start)
+        await service._server.serve_forever()
+    finally:
+        await service.close()
@@ -0,0 +1,196 @@
+"""
+Streaming DOCX writer with bounded memory, for reports too long to hold.
+
+A python-docx Document keeps the whole body as an lxml tree until save().
+StreamingDocument takes the same helpers (add_heading_styled, add_body,
+add_styled_table, ...) but serializes each finished block straight into the
+word/document.xml entry of an open ZIP stream and drops it from the tree. A
+block counts as finished once the next one is started, so a helper may keep
+editing the paragraph it just added. Styled tables are written row by row
+from their row iterable (oxml_table.table_xml) and never exist as a tree;
+open_styled_table() appends rows in chunks as they arrive.
+
+Styles, numbering, settings, footers and every other part are copied from
+a template document when the stream is closed, so section and footer
+changes made on the StreamingDocument (e.g. build_footer) are kept.
+
+    with StreamingDocument("report.docx") as doc:
+        add_heading_styled(doc, "Duplicates", 1)
+        add_styled_table(doc, ["Left", "Right", "Score"], pairs)
+        build_footer(doc, "SG Consulting  |  Duplicate Report")
+
+Blocks leave the tree as soon as they are written, so this does not combine
+with section_cache.render_sections() or layout_estimate, which need them.
+"""
+
+import io
+import re
+import zipfile
+
+import docx
+from docx.oxml.ns import qn
+from lxml import etree
+
+from .doc_styles import new_document
+
+DOCUMENT_PART = "word/document.xml"
+FLUSH_BYTES = 1 << 16
+
+_XMLNS = re.compile(rb'\s+xmlns(?::([\w.-]+))?="([^"]*)"')
+
+
+class StreamingDocument:
+    """Write-once document whose body streams to out (a path or binary file).
+
+    template is a Document or .docx path supplying styles, numbering, page
+    setup and the other parts (default: doc_styles.new_document()); its body
+    content is discarded. Everything python-docx offers on a Document is
+    available through delegation to the template, but the body only ever
+    holds the block being built.
+    """
+
+    def __init__(self, out, template=None):
+        if template is None:
+            template = new_document()
+        elif isinstance(template, str):
+            template = docx.Document(template)
+        self._doc = template
+        body = template.element.body
+        for child in list(body):
+            if child.tag != qn("w:sectPr"):
+                body.remove(child)
+        self._declared = {(prefix.encode() if prefix else None, uri.encode())
+                          for prefix, uri in template.element.nsmap.items()}
+
+        self.path = out if isinstance(out, str) else None
+        self._zip = zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED)
+        info = zipfile.ZipInfo(DOCUMENT_PART)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        self._part = self._zip.open(info, "w", force_zip64=True)
+        self._pending = []
+        self._pending_bytes = 0
+        self.blocks = 0
+
+        head = etree.tostring(template.element, xml_declaration=True, encoding="UTF-8", standalone=True)
+        self._write(head[:head.index(b"<w:body>") + len(b"<w:body>")])
+
+    def __getattr__(self, name):
+        if name == "_doc":
+            raise AttributeError(name)
+        return getattr(self._doc, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._part.close()
+            self._zip.close()
+
+    # ── Body ──
+
+    def _write(self, data):
+        self._pending.append(data)
+        self._pending_bytes += len(data)
+        if self._pending_bytes >= FLUSH_BYTES:
+            self._part.write(b"".join(self._pending))
+            self._pending = []
+            self._pending_bytes = 0
+
+    def _serialize(self, el):
+        """el's markup without the namespace declarations the root already makes."""
+        data = etree.tostring(el)
+        end = data.index(b">")
+        start_tag = _XMLNS.sub(lambda m: b"" if (m.group(1), m.group(2)) in self._declared else m.group(0),
+                               data[:end])
+        return start_tag + data[end:]
+
+    def flush_blocks(self):
+        """Write every block in the body (all of them are finished) and drop them."""
+        body = self._doc.element.body
+        for child in list(body):
+            if child.tag == qn("w:sectPr"):
+                continue
+            self._write(self._serialize(child))
+            body.remove(child)
+            self.blocks += 1
+
+    def begin_block_xml(self, chunk):
+        """Start a block with its first piece of w: markup (which may declare xmlns:w)."""
+        self.flush_blocks()
+        data = chunk.encode("utf-8")
+        end = data.index(b">")
+        self._write(_XMLNS.sub(b"", data[:end]) + data[end:])
+
+    def write_xml(self, chunk):
+        """Continue the block begun by begin_block_xml()."""
+        self._write(chunk.encode("utf-8"))
+
+    def end_block_xml(self, chunk=""):
+        self._write(chunk.encode("utf-8"))
+        self.blocks += 1
+
+    def write_block_xml(self, chunks):
+        """Write one block given as pieces of w: markup (the first may declare xmlns:w)."""
+        chunks = iter(chunks)
+        self.begin_block_xml(next(chunks))
+        for chunk in chunks:
+            self.write_xml(chunk)
+        self.end_block_xml()
+
+    def add_paragraph(self, text="", style=None):
+        self.flush_blocks()
+        return self._doc.add_paragraph(text, style)
+
+    def add_heading(self, text="", level=1):
+        self.flush_blocks()
+        return self._doc.add_heading(text, level)
+
+    def add_page_break(self):
+        self.flush_blocks()
+        return self._doc.add_page_break()
+
+    def add_table(self, rows, cols, style=None):
+        self.flush_blocks()
+        return self._doc.add_table(rows, cols, style)
+
+    def add_picture(self, image_path_or_stream, width=None, height=None):
+        self.flush_blocks()
+        return self._doc.add_picture(image_path_or_stream, width, height)
+
+    def add_section(self, start_type=None):
+        self.flush_blocks()
+        if start_type is None:
+            return self._doc.add_section()
+        return self._doc.add_section(start_type)
+
+    # ── Package ──
+
+    def close(self):
+        """Finish document.xml and copy the template's other parts."""
+        if self._zip.fp is None:
+            return
+        self.flush_blocks()
+        sectPr = self._doc.element.body.find(qn("w:sectPr"))
+        if sectPr is not None:
+            self._write(self._serialize(sectPr))
+        self._part.write(b"".join(self._pending) + b"</w:body></w:document>")
+        self._pending = []
+        self._part.close()
+
+        # The template's package, minus its (empty) document.xml
+        rest = io.BytesIO()
+        self._doc.save(rest)
+        with zipfile.ZipFile(rest) as src:
+            for info in src.infolist():
+                if info.filename != DOCUMENT_PART:
+                    self._zip.writestr(info, src.read(info))
+        self._zip.close()
+
+    def save(self, path=None):
+        """Close the stream; path, if given, must be the one it was opened on."""
+        if path is not None and path != self.path:
+            raise ValueError(f"StreamingDocument writes to {self.path!r}, not {path!r}")
+        self.close()
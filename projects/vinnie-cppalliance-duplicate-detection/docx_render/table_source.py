@@ -0,0 +1,158 @@
+"""
+Row sources and column formats for add_styled_table and open_styled_table.
+
+A table's rows may come as a list of rows, any lazy iterable of rows (a
+generator, a DB cursor), or columnar data: a pandas DataFrame, a 2-D or
+structured NumPy array, a pyarrow Table, RecordBatch or RecordBatchReader,
+or a {header: column} dict. Columnar sources are recognized by their
+attributes, so none of those libraries is imported (or needed) here, and
+they are read CHUNK_ROWS rows at a time, never converted whole.
+
+A column format is applied to a whole column of a chunk with one map()
+instead of cell by cell. It may be
+
+    ",.2f" / "{:,} PRs"     a format spec, or a str.format template
+    {"done": "✅ Complete"}  a mapping; values it lacks are shown as str(value)
+    callable                any function of the cell value
+
+and is keyed by header text or column index. None cells format as "".
+"""
+
+from itertools import islice
+
+CHUNK_ROWS = 512
+
+
+def column_formatter(spec):
+    """A function value -> text for a format spec, mapping or callable."""
+    if callable(spec):
+        return spec
+    if isinstance(spec, str):
+        if "{" in spec:
+            return lambda value: "" if value is None else spec.format(value)
+        return lambda value: "" if value is None else format(value, spec)
+    if hasattr(spec, "get"):
+        return lambda value: "" if value is None else spec.get(value, str(value))
+    raise TypeError(f"column format must be a format spec, mapping or callable, not {type(spec).__name__}")
+
+
+def column_formatters(formats, headers):
+    """{column index: function} for formats keyed by header text or index."""
+    formatters = {}
+    for key, spec in (formats or {}).items():
+        if isinstance(key, int):
+            index = key
+        elif key in headers:
+            index = headers.index(key)
+        else:
+            raise KeyError(f"no column {key!r} to format (columns: {', '.join(map(str, headers))})")
+        formatters[index] = column_formatter(spec)
+    return formatters
+
+
+# ── Columnar Sources ──
+
+def _frame_chunks(df, size):
+    for start in range(0, len(df), size):
+        block = df.iloc[start:start + size]
+        yield [block.iloc[:, k].tolist() for k in range(block.shape[1])]
+
+
+def _array_chunks(array, size):
+    names = array.dtype.names
+    for start in range(0, len(array), size):
+        block = array[start:start + size]
+        if names:
+            yield [block[name].tolist() for name in names]
+        else:
+            yield [block[:, k].tolist() for k in range(block.shape[1])]
+
+
+def _batch_columns(batch, size):
+    for start in range(0, batch.num_rows, size):
+        block = batch.slice(start, size)
+        yield [block.column(k).to_pylist() for k in range(block.num_columns)]
+
+
+def _arrow_chunks(source, size):
+    if hasattr(source, "to_batches"):  # Table
+        batches = source.to_batches()
+    elif hasattr(source, "read_next_batch"):  # RecordBatchReader
+        batches = source
+    else:  # RecordBatch
+        batches = [source]
+    for batch in batches:
+        yield from _batch_columns(batch, size)
+
+
+def _dict_chunks(columns, size):
+    columns = list(columns.values())
+    rows = len(columns[0]) if columns else 0
+    for start in range(0, rows, size):
+        yield [list(col[start:start + size]) for col in columns]
+
+
+def columnar(source):
+    """(headers, chunks(size)) for a columnar source, or None for an iterable of rows."""
+    if hasattr(source, "iloc") and hasattr(source, "columns"):
+        return [str(c) for c in source.columns], lambda size: _frame_chunks(source, size)
+    if hasattr(source, "schema") and (hasattr(source, "num_rows") or hasattr(source, "read_next_batch")):
+        return list(source.schema.names), lambda size: _arrow_chunks(source, size)
+    if hasattr(source, "ndim") and hasattr(source, "dtype"):
+        names = source.dtype.names
+        if not names and source.ndim != 2:
+            raise ValueError(f"a table needs a 2-D or structured array, not {source.ndim}-D")
+        return list(names) if names else None, lambda size: _array_chunks(source, size)
+    if isinstance(source, dict):
+        return [str(k) for k in source], lambda size: _dict_chunks(source, size)
+    return None
+
+
+# ── Rows ──
+
+def _format_columns(columns, formatters):
+    """Rows of the column chunk, each formatted column mapped in one pass."""
+    columns = [list(map(formatters[k], col)) if k in formatters else col for k, col in enumerate(columns)]
+    return zip(*columns)
+
+
+def _format_rows(rows, formatters):
+    """The chunk of rows with the formatted columns rewritten (short rows keep their length)."""
+    rows = [list(row) for row in rows]
+    for k, fmt in formatters.items():
+        cells = [row for row in rows if len(row) > k]
+        for row, text in zip(cells, map(fmt, [row[k] for row in cells])):
+            row[k] = text
+    return rows
+
+
+def _formatted_rows(rows, formatters, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield from _format_rows(chunk, formatters)
+
+
+def table_source(source, headers=None, formats=None, chunk_rows=CHUNK_ROWS):
+    """(headers, rows) for any row source; rows is a lazy iterable of row sequences.
+
+    headers=None takes a columnar source's column names. A plain iterable
+    of rows without formats is returned as it is.
+    """
+    found = columnar(source)
+    if found is not None:
+        names, chunks = found
+        headers = list(headers) if headers is not None else names
+        if headers is None:
+            raise ValueError("headers are required for an unnamed array")
+        formatters = column_formatters(formats, headers)
+        return headers, (row for columns in chunks(chunk_rows) for row in _format_columns(columns, formatters))
+    if headers is None:
+        raise ValueError("headers are required for an iterable of rows")
+    headers = list(headers)
+    formatters = column_formatters(formats, headers)
+    if not formatters:
+        return headers, source
+    return headers, _formatted_rows(source, formatters, chunk_rows)
@@ -0,0 +1,127 @@
+"""
+File watching for render_all.py --watch, with inotify or polling.
+
+Watcher(dirs) watches the *.md and *.py files directly inside dirs. On Linux
+it uses inotify through ctypes (no extra package). Editors that save by
+writing a temp file and renaming it over the original are covered because
+whole directories are watched. Elsewhere, or when inotify is unavailable, it
+falls back to comparing file mtimes every POLL_SECONDS.
+changes() blocks until something changed and returns the changed paths,
+after a short DEBOUNCE_SECONDS window that folds an editor's burst of
+writes into one rebuild.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+WATCHED_SUFFIXES = (".md", ".py")
+POLL_SECONDS = 0.1
+DEBOUNCE_SECONDS = 0.05
+
+# inotify(7)
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+_EVENT = struct.Struct("iIII")
+
+
+def _libc_inotify():
+    """libc with inotify_init1, or None."""
+    if not hasattr(os, "O_NONBLOCK"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.inotify_init1
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class Watcher:
+    """Changed *.md / *.py files in a fixed set of directories."""
+
+    def __init__(self, dirs, poll=False):
+        self.dirs = [os.path.abspath(d) for d in dirs]
+        self._fd = None
+        self._wds = {}
+        libc = None if poll else _libc_inotify()
+        if libc is not None:
+            fd = libc.inotify_init1(os.O_NONBLOCK | getattr(os, "O_CLOEXEC", 0))
+            if fd >= 0:
+                mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_MODIFY
+                for d in self.dirs:
+                    wd = libc.inotify_add_watch(fd, os.fsencode(d), mask)
+                    if wd >= 0:
+                        self._wds[wd] = d
+                if len(self._wds) == len(self.dirs):
+                    self._fd = fd
+                else:
+                    os.close(fd)
+        self.mode = "inotify" if self._fd is not None else "polling"
+        self._snapshot = None if self._fd is not None else self._scan()
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _scan(self):
+        state = {}
+        for d in self.dirs:
+            with os.scandir(d) as entries:
+                for entry in entries:
+                    if entry.name.endswith(WATCHED_SUFFIXES) and entry.is_file():
+                        st = entry.stat()
+                        state[entry.path] = (st.st_mtime_ns, st.st_size)
+        return state
+
+    def _poll(self):
+        state = self._scan()
+        old, self._snapshot = self._snapshot, state
+        return {p for p in state.keys() | old.keys() if state.get(p) != old.get(p)}
+
+    def _read_events(self, timeout):
+        """Watched paths named by the inotify events arriving within timeout."""
+        changed = set()
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return changed
+        data = os.read(self._fd, 64 * 1024)
+        offset = 0
+        while offset < len(data):
+            wd, _, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            if wd in self._wds and name.endswith(WATCHED_SUFFIXES):
+                changed.add(os.path.join(self._wds[wd], name))
+        return changed
+
+    def changes(self, timeout=None):
+        """Block until watched files change; returns their paths (empty on timeout)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed = set()
+        while not changed:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return changed
+            if self._fd is not None:
+                changed = self._read_events(remaining)
+            else:
+                time.sleep(POLL_SECONDS if remaining is None else min(POLL_SECONDS, remaining))
+                changed = self._poll()
+        # Fold the rest of an editor's save (temp file, rename, chmod) into this batch
+        time.sleep(DEBOUNCE_SECONDS)
+        if self._fd is None:
+            return changed | self._poll()
+        more = self._read_events(0)
+        while more:
+            changed |= more
+            more = self._read_events(0)
+        return changed
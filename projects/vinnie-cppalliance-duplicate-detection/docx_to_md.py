@@ -0,0 +1,54 @@
+"""
+Read client-edited Word deliverables back into Markdown.
+Run: python docx_to_md.py FILE.docx [...] [--out-dir DIR] [--changes accept|reject|markup]
+Output: <name>.edited.md for every document (md_to_docx does not pick these up)
+
+Streams word/document.xml and maps the house styles back to Markdown in the
+dialect md_to_docx compiles (see docx_render/docx_reader.py), so a client's
+edits can be diffed against the .md source and merged by hand:
+
+    python docx_to_md.py QA-ARCHITECTURE-DECISIONS.docx --changes markup
+    diff QA-ARCHITECTURE-DECISIONS.md QA-ARCHITECTURE-DECISIONS.edited.md
+"""
+
+import argparse
+import os
+import sys
+import time
+import zipfile
+
+from docx_render.docx_reader import CHANGES, write_markdown
+
+EDITED_SUFFIX = ".edited.md"
+APPLIED = {"accept": "accepted", "reject": "rejected", "markup": "marked up"}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read Word deliverables back into Markdown.")
+    parser.add_argument("sources", nargs="+", help=".docx files")
+    parser.add_argument("--out-dir", help="Directory for the .edited.md files (default: next to each .docx)")
+    parser.add_argument("--changes", choices=CHANGES, default="accept",
+                        help="Tracked changes: accept (default), reject, or keep as CriticMarkup {++ ++} / {-- --}")
+    args = parser.parse_args(argv)
+
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+    total = time.perf_counter()
+    for src in args.sources:
+        start = time.perf_counter()
+        stem = os.path.splitext(os.path.basename(src))[0]
+        out = os.path.join(args.out_dir or os.path.dirname(src), stem + EDITED_SUFFIX)
+        try:
+            written, stats = write_markdown(src, out, args.changes)
+        except (OSError, KeyError, zipfile.BadZipFile) as e:  # missing file, not a .docx package
+            sys.exit(f"[ERROR] {src}: {e}")
+        changes = stats["insertions"] + stats["deletions"]
+        tracked = (f", {stats['insertions']} insertions / {stats['deletions']} deletions {APPLIED[args.changes]}"
+                   + (f" ({', '.join(sorted(stats['authors']))})" if stats["authors"] else "")) if changes else ""
+        print(f"[OK] {'Generated' if written else 'Unchanged'}: {out}  ({stats['blocks']} blocks, "
+              f"{stats['tables']} tables{tracked}, {time.perf_counter() - start:.2f}s)")
+    print(f"     {len(args.sources)} documents in {time.perf_counter() - total:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,271 +1,79 @@
 """
 Generate McKinsey-style Word document from the Consultant Paper.
-Run: python generate_docx.py
+Run: python generate_docx.py [--list] [--only NAME,...] [--draft] [--optimize] [--no-cache] [--jobs N]
+     python generate_docx.py --patch NAME[,NAME...]   (re-render sections inside the saved .docx)
+     python generate_docx.py --merge clients.csv [--out-dir DIR]   (one proposal per record)
+     python generate_docx.py --redline OLD.docx   (also <output>.redline.docx, changes since OLD tracked)
 Output: CONSULTANT-PAPER-AGENT-ARCHITECTURE.docx
 """
 
-from docx import Document
-from docx.shared import Inches, Pt, Cm, RGBColor, Emu
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.enum.table import WD_TABLE_ALIGNMENT
-from docx.enum.section import WD_ORIENT
-from docx.oxml.ns import qn, nsdecls
-from docx.oxml import parse_xml
-import re
-
-# ── Color Palette (McKinsey-inspired: Navy + Electric Blue + Warm Gray) ──
-NAVY = RGBColor(0x00, 0x33, 0x66)       # Primary headings
-DARK_BLUE = RGBColor(0x00, 0x52, 0x8A)  # Secondary headings
-ELECTRIC = RGBColor(0x00, 0x96, 0xD6)   # Accents, links
-CHARCOAL = RGBColor(0x33, 0x33, 0x33)   # Body text
-LIGHT_GRAY = RGBColor(0xF5, 0xF5, 0xF5) # Table alt rows
-WHITE = RGBColor(0xFF, 0xFF, 0xFF)
-WARM_GRAY = RGBColor(0x6B, 0x6B, 0x6B)  # Subtle text
-GREEN_ACCENT = RGBColor(0x00, 0x7A, 0x33)  # Success/positive
-RED_ACCENT = RGBColor(0xCC, 0x00, 0x00)    # Rejected/negative
-ORANGE_ACCENT = RGBColor(0xE8, 0x7C, 0x00) # Warning/medium
-
-# Table header background hex
-TBL_HEADER_BG = "003366"
-TBL_ALT_BG = "F0F4F8"
-TBL_BORDER_COLOR = "B0BEC5"
-ACCENT_BAR_COLOR = "0096D6"
-
-
-def set_cell_bg(cell, color_hex):
-    """Set background color of a table cell."""
-    shading = parse_xml(f'<w:shd {nsdecls("w")} w:fill="{color_hex}"/>')
-    cell._tc.get_or_add_tcPr().append(shading)
-
-
-def set_cell_borders(cell, color="B0BEC5", sz="4"):
-    """Set thin borders on a cell."""
-    tc = cell._tc
-    tcPr = tc.get_or_add_tcPr()
-    borders = parse_xml(
-        f'<w:tcBorders {nsdecls("w")}>'
-        f'  <w:top w:val="single" w:sz="{sz}" w:space="0" w:color="{color}"/>'
-        f'  <w:left w:val="single" w:sz="{sz}" w:space="0" w:color="{color}"/>'
-        f'  <w:bottom w:val="single" w:sz="{sz}" w:space="0" w:color="{color}"/>'
-        f'  <w:right w:val="single" w:sz="{sz}" w:space="0" w:color="{color}"/>'
-        f'</w:tcBorders>'
-    )
-    tcPr.append(borders)
-
-
-def add_styled_table(doc, headers, rows, col_widths=None):
-    """Add a beautifully styled table."""
-    table = doc.add_table(rows=1 + len(rows), cols=len(headers))
-    table.alignment = WD_TABLE_ALIGNMENT.CENTER
-    table.autofit = True
-
-    # Header row
-    for i, h in enumerate(headers):
-        cell = table.rows[0].cells[i]
-        cell.text = ""
-        p = cell.paragraphs[0]
-        run = p.add_run(h)
-        run.bold = True
-        run.font.size = Pt(9)
-        run.font.color.rgb = WHITE
-        run.font.name = "Calibri"
-        p.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        set_cell_bg(cell, TBL_HEADER_BG)
-        set_cell_borders(cell, TBL_HEADER_BG, "6")
-
-    # Data rows
-    for r_idx, row_data in enumerate(rows):
-        for c_idx, val in enumerate(row_data):
-            cell = table.rows[r_idx + 1].cells[c_idx]
-            cell.text = ""
-            p = cell.paragraphs[0]
-            # Handle bold markers
-            text = str(val)
-            if text.startswith("**") and text.endswith("**"):
-                run = p.add_run(text.strip("*"))
-                run.bold = True
-            else:
-                run = p.add_run(text)
-            run.font.size = Pt(9)
-            run.font.color.rgb = CHARCOAL
-            run.font.name = "Calibri"
-            p.alignment = WD_ALIGN_PARAGRAPH.LEFT
-            set_cell_borders(cell, TBL_BORDER_COLOR)
-            if r_idx % 2 == 1:
-                set_cell_bg(cell, TBL_ALT_BG)
-
-    # Set column widths if provided
-    if col_widths:
-        for row in table.rows:
-            for i, w in enumerate(col_widths):
-                if i < len(row.cells):
-                    row.cells[i].width = Cm(w)
-
-    return table
-
-
-def add_accent_bar(doc):
-    """Add a thin colored accent line."""
-    p = doc.add_paragraph()
-    p.alignment = WD_ALIGN_PARAGRAPH.LEFT
-    # Use a colored horizontal rule via border
-    pPr = p._p.get_or_add_pPr()
-    borders = parse_xml(
-        f'<w:pBorders {nsdecls("w")}>'
-        f'  <w:bottom w:val="single" w:sz="12" w:space="1" w:color="{ACCENT_BAR_COLOR}"/>'
-        f'</w:pBorders>'
-    )
-    pPr.append(borders)
-    p.space_after = Pt(6)
-
-
-def add_heading_styled(doc, text, level=1):
-    """Add a styled heading with McKinsey colors."""
-    h = doc.add_heading(text, level=level)
-    for run in h.runs:
-        if level == 1:
-            run.font.color.rgb = NAVY
-            run.font.size = Pt(22)
-        elif level == 2:
-            run.font.color.rgb = DARK_BLUE
-            run.font.size = Pt(16)
-        elif level == 3:
-            run.font.color.rgb = ELECTRIC
-            run.font.size = Pt(13)
-        run.font.name = "Calibri"
-    return h
-
-
-def add_body(doc, text, bold=False, italic=False, color=None):
-    """Add body paragraph."""
-    p = doc.add_paragraph()
-    run = p.add_run(text)
-    run.font.size = Pt(10.5)
-    run.font.name = "Calibri"
-    run.font.color.rgb = color or CHARCOAL
-    run.bold = bold
-    run.italic = italic
-    p.space_after = Pt(4)
-    p.space_before = Pt(2)
-    return p
-
-
-def add_quote(doc, text):
-    """Add a styled blockquote."""
-    p = doc.add_paragraph()
-    pPr = p._p.get_or_add_pPr()
-    # Left border accent
-    borders = parse_xml(
-        f'<w:pBorders {nsdecls("w")}>'
-        f'  <w:left w:val="single" w:sz="24" w:space="8" w:color="{ACCENT_BAR_COLOR}"/>'
-        f'</w:pBorders>'
-    )
-    pPr.append(borders)
-    # Indent
-    ind = parse_xml(f'<w:ind {nsdecls("w")} w:left="720"/>')
-    pPr.append(ind)
-
-    run = p.add_run(text)
-    run.font.size = Pt(10)
-    run.font.name = "Calibri"
-    run.font.color.rgb = WARM_GRAY
-    run.italic = True
-    p.space_after = Pt(8)
-    return p
-
-
-def add_code_block(doc, text):
-    """Add a monospaced code block with gray background."""
-    p = doc.add_paragraph()
-    pPr = p._p.get_or_add_pPr()
-    shading = parse_xml(f'<w:shd {nsdecls("w")} w:fill="F5F5F5"/>')
-    pPr.append(shading)
-    # Add border
-    borders = parse_xml(
-        f'<w:pBorders {nsdecls("w")}>'
-        f'  <w:top w:val="single" w:sz="4" w:space="1" w:color="DDDDDD"/>'
-        f'  <w:left w:val="single" w:sz="4" w:space="4" w:color="DDDDDD"/>'
-        f'  <w:bottom w:val="single" w:sz="4" w:space="1" w:color="DDDDDD"/>'
-        f'  <w:right w:val="single" w:sz="4" w:space="4" w:color="DDDDDD"/>'
-        f'</w:pBorders>'
-    )
-    pPr.append(borders)
-
-    run = p.add_run(text)
-    run.font.size = Pt(8.5)
-    run.font.name = "Consolas"
-    run.font.color.rgb = CHARCOAL
-    p.space_after = Pt(6)
-    return p
-
-
-def add_bullet(doc, text, level=0):
-    """Add a bullet point."""
-    p = doc.add_paragraph(style="List Bullet")
-    p.clear()
-    run = p.add_run(text)
-    run.font.size = Pt(10)
-    run.font.name = "Calibri"
-    run.font.color.rgb = CHARCOAL
-    if level > 0:
-        pPr = p._p.get_or_add_pPr()
-        ind = parse_xml(f'<w:ind {nsdecls("w")} w:left="{720 + level * 360}"/>')
-        pPr.append(ind)
-    return p
-
-
-def build_cover_page(doc):
+import os
+import sys
+import time
+import tracemalloc
+
+from docx_render.cli import GENERATOR_OUTPUTS, output_name, parse_generator_args
+
+if __name__ == "__main__":
+    # --help, --list and a mistyped --only are answered before python-docx loads
+    parse_generator_args(__file__)
+
+from docx_render import (
+    WARM_GRAY, GREEN_ACCENT, RED_ACCENT,
+    add_cover_title, add_cover_subtitle, add_cover_meta,
+    add_styled_table, add_accent_bar, add_spacer, add_heading_styled, add_body,
+    add_quote, add_code_block, add_bullet,
+    print_build_report, write_profile, zip_parts,
+    CACHE_DIR, function_sections, helper_version, record, write_export,
+    bind_fields, merge_manifest, print_merge_report,
+)
+from docx_render.build import build_document
+from docx_render.patch import patch_document, print_patch_report
+from docx_render.redline import redline_file, redline_note
+from docx_render.ir_docx import docx_sections
+
+OUTPUT = GENERATOR_OUTPUTS["generate_docx"]
+FOOTER_TEXT = "SG Consulting  |  Technical Architecture Proposal  |  February 2026  |  CONFIDENTIAL"
+
+# Merge fields: what changes per client and revision (--merge MANIFEST sets them per record)
+FIELDS = {
+    "prepared_for": "C++ Alliance — Vinnie Falco, Will Pak",
+    "prepared_by": "SG Consulting",
+    "date": "February 10, 2026",
+    "version": "1.0",
+    "classification": "Client-Facing Deliverable",
+    "footer": FOOTER_TEXT,
+}
+
+
+def build_cover_page(doc, fields=FIELDS):
     """Build a striking cover page."""
     # Add lots of space at top
     for _ in range(4):
-        doc.add_paragraph().space_after = Pt(20)
+        add_spacer(doc, 20)
 
     # Accent bar at top
     add_accent_bar(doc)
 
     # Title
-    p = doc.add_paragraph()
-    p.alignment = WD_ALIGN_PARAGRAPH.LEFT
-    run = p.add_run("Technical Architecture Proposal")
-    run.font.size = Pt(36)
-    run.font.color.rgb = NAVY
-    run.font.name = "Calibri"
-    run.bold = True
-    p.space_after = Pt(4)
+    add_cover_title(doc, "Technical Architecture Proposal")
 
     # Subtitle
-    p = doc.add_paragraph()
-    p.alignment = WD_ALIGN_PARAGRAPH.LEFT
-    run = p.add_run("Multi-Agent Code Review System\nfor LLVM/Clang")
-    run.font.size = Pt(20)
-    run.font.color.rgb = ELECTRIC
-    run.font.name = "Calibri"
-    p.space_after = Pt(30)
+    add_cover_subtitle(doc, "Multi-Agent Code Review System\nfor LLVM/Clang")
 
     # Bottom accent bar
     add_accent_bar(doc)
 
     # Meta info
     meta = [
-        ("Prepared for", "C++ Alliance — Vinnie Falco, Will Pak"),
-        ("Prepared by", "SG Consulting"),
-        ("Date", "February 10, 2026"),
-        ("Version", "1.0"),
-        ("Classification", "Client-Facing Deliverable"),
+        ("Prepared for", fields["prepared_for"]),
+        ("Prepared by", fields["prepared_by"]),
+        ("Date", fields["date"]),
+        ("Version", fields["version"]),
+        ("Classification", fields["classification"]),
     ]
     for label, value in meta:
-        p = doc.add_paragraph()
-        p.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        run = p.add_run(f"{label}:  ")
-        run.font.size = Pt(10)
-        run.font.color.rgb = WARM_GRAY
-        run.font.name = "Calibri"
-        run.bold = True
-        run = p.add_run(value)
-        run.font.size = Pt(10)
-        run.font.color.rgb = CHARCOAL
-        run.font.name = "Calibri"
-        p.space_after = Pt(2)
+        add_cover_meta(doc, label, value)
 
     doc.add_page_break()
 
@@ -294,10 +102,10 @@ def build_exec_summary(doc):
             ["Observability", "None — black box", "Real-time dashboard with logs, costs, agent steps"],
             ["Session continuity", "Every run starts from scratch", "Persistent sessions with state resume"],
         ],
-        col_widths=[4, 5.5, 6.5]
+        col_widths="auto"
     )
 
-    doc.add_paragraph().space_after = Pt(4)
+    add_spacer(doc, 4)
     add_body(doc, "Estimated infrastructure cost: ~$65/month on Azure (covered by $5,000 Microsoft startup credits for 76+ months of runway).", bold=True, color=GREEN_ACCENT)
 
 
@@ -324,7 +132,7 @@ def build_situation(doc):
             ["Data Pipeline", "🟡 Partial", "JSON format, needs MD conversion"],
             ["GitHub Runners", "⚠️ Slow", "Up to 2 hours delay, sometimes full day"],
         ],
-        col_widths=[5, 3, 8]
+        col_widths="auto"
     )
 
 
@@ -345,10 +153,10 @@ def build_complication(doc):
             ["4", "No observability", "Cannot monitor what agents do", "No logging, no dashboard, no cost tracking"],
             ["5", "No data integrity", "Unknown data loss in pipeline", "No verification that scraped == indexed == embedded data"],
         ],
-        col_widths=[1, 3.5, 4.5, 7]
+        col_widths="auto"
     )
 
-    doc.add_paragraph().space_after = Pt(6)
+    add_spacer(doc, 6)
     add_body(doc, (
         "Business impact: Developer time is wasted waiting for agents. The feedback loop is "
         "measured in hours, not seconds. Without orchestration, quality degrades as context grows. "
@@ -379,11 +187,11 @@ def build_resolution(doc):
             ["3", "Intelligence", "Specialized Subagents (3 roles)", "Knowledge retrieval, code generation, code review"],
             ["4", "Data & Knowledge", "SQLite + Pinecone + Fidelity Gates", "Structured queries + semantic search + integrity verification"],
         ],
-        col_widths=[1.5, 3, 5, 6.5]
+        col_widths="auto"
     )
 
     # 3.2 Tech Decision
-    doc.add_paragraph().space_after = Pt(4)
+    add_spacer(doc, 4)
     add_heading_styled(doc, "3.2 Technology Decision: Claude Agent SDK", 2)
 
     add_styled_table(doc,
@@ -397,7 +205,7 @@ def build_resolution(doc):
         col_widths=[5.5, 3, 7.5]
     )
 
-    doc.add_paragraph().space_after = Pt(4)
+    add_spacer(doc, 4)
     add_quote(doc, (
         "The Agent SDK gives us the full power of Claude Code — file reading, editing, terminal "
         "execution, Git operations, and MCP integration — without subprocess management overhead. "
@@ -415,10 +223,10 @@ def build_resolution(doc):
             ["Coordination", "Orchestrator manages all routing", "Shared task list, self-organizing", "Controlled routing needed → Subagents"],
             ["Complexity", "Simpler to implement/debug", "Requires team config, inboxes", "MVP timeline → Subagents"],
         ],
-        col_widths=[3, 4, 4, 5]
+        col_widths="auto"
     )
 
-    doc.add_paragraph().space_after = Pt(4)
+    add_spacer(doc, 4)
     add_quote(doc, (
         "The manager pattern empowers a central LLM — the 'manager' — to orchestrate a network "
         "of specialized agents seamlessly through tool calls. Instead of losing context or control, "
@@ -441,11 +249,11 @@ def build_resolution(doc):
     add_styled_table(doc,
         ["Agent", "Model", "Tools", "Cost/Invocation", "Responsibility"],
         agents_data,
-        col_widths=[3, 2, 4, 3, 4]
+        col_widths="auto"
     )
 
     # 3.5 Pipeline
-    doc.add_paragraph().space_after = Pt(4)
+    add_spacer(doc, 4)
     add_heading_styled(doc, "3.5 Pipeline Workflow", 2)
 
     pipeline_text = (
@@ -498,10 +306,10 @@ def build_fidelity(doc):
             ["2. Index", "Index 45,891 into SQLite", "Indexed 45,891, 0 duplicates", "✅ PASSED (Δ = 0)"],
             ["3. Embed", "Generate 45,891 embeddings", "Generated 45,891, all valid", "✅ PASSED (Δ = 0)"],
         ],
-        col_widths=[2, 5, 5, 4]
+        col_widths="auto"
     )
 
-    doc.add_paragraph().space_after = Pt(6)
+    add_spacer(doc, 6)
 
     add_heading_styled(doc, "5. Database-First Knowledge Layer", 2)
 
@@ -511,10 +319,10 @@ def build_fidelity(doc):
             ["SQLite (structured)", "Exact lookups, statistics", "Deterministic", "\"How many template PRs did Richard Smith review?\" → SELECT COUNT(*)"],
             ["Pinecone (semantic)", "Similarity search, patterns", "Probabilistic", "\"Find similar review comments\" → vector cosine similarity"],
         ],
-        col_widths=[3, 3.5, 3, 6.5]
+        col_widths="auto"
     )
 
-    doc.add_paragraph().space_after = Pt(4)
+    add_spacer(doc, 4)
     add_body(doc, (
         "SQLite serves as ground truth — facts the LLM cannot hallucinate. Pinecone provides "
         "semantic context for nuanced understanding. This dual approach was validated by TheAuditor's "
@@ -541,10 +349,10 @@ def build_costs(doc):
             ["Total infrastructure", "", "~$66/month", "Credits: 76+ months"],
             ["Total with API usage", "", "~$216–766/month", "Depends on volume"],
         ],
-        col_widths=[4, 3, 3.5, 5.5]
+        col_widths="auto"
     )
 
-    doc.add_paragraph().space_after = Pt(6)
+    add_spacer(doc, 6)
 
     add_heading_styled(doc, "Cost Optimization Strategy", 3)
 
@@ -571,12 +379,13 @@ def build_risks(doc):
             ["Data pipeline integrity", "Medium", "High", "Fidelity Gates with manifest-receipt verification"],
             ["Token cost overrun", "Medium", "Medium", "max_budget_usd parameter; cost tracking dashboard"],
         ],
-        col_widths=[4, 2.5, 2.5, 7]
+        col_widths="auto"
     )
 
 
 def build_timeline(doc):
     """Section 8: Timeline."""
+    status = {"done": "✅ Complete", "todo": "🔴 TODO"}
     doc.add_page_break()
     add_heading_styled(doc, "8. Deliverables & Timeline", 1)
     add_accent_bar(doc)
@@ -586,21 +395,21 @@ def build_timeline(doc):
     add_styled_table(doc,
         ["#", "Deliverable", "Format", "Status"],
         [
-            ["1", "Architecture documentation (this document)", "MD / DOCX", "✅ Complete"],
-            ["2", "CLI comparison (Cursor vs Claude Code, 9 dimensions)", "MD", "✅ Complete"],
-            ["3", "Hook systems analysis", "MD", "✅ Complete"],
-            ["4", "Agent architecture evaluation", "MD", "✅ Complete"],
-            ["5", "Consultant Paper (Pyramid Principle)", "MD / DOCX", "✅ Complete"],
-            ["6", "Fidelity Architecture Proposal", "MD", "✅ Complete"],
-            ["7", "Functioning webhook server on Azure", "Python/FastAPI", "🔴 TODO"],
-            ["8", "Multi-agent pipeline", "Python", "🔴 TODO"],
-            ["9", "Live monitoring dashboard", "HTMX/WebSocket", "🔴 TODO"],
-            ["10", "End-to-end demo", "Live", "🔴 TODO"],
+            ["1", "Architecture documentation (this document)", "MD / DOCX", "done"],
+            ["2", "CLI comparison (Cursor vs Claude Code, 9 dimensions)", "MD", "done"],
+            ["3", "Hook systems analysis", "MD", "done"],
+            ["4", "Agent architecture evaluation", "MD", "done"],
+            ["5", "Consultant Paper (Pyramid Principle)", "MD / DOCX", "done"],
+            ["6", "Fidelity Architecture Proposal", "MD", "done"],
+            ["7", "Functioning webhook server on Azure", "Python/FastAPI", "todo"],
+            ["8", "Multi-agent pipeline", "Python", "todo"],
+            ["9", "Live monitoring dashboard", "HTMX/WebSocket", "todo"],
+            ["10", "End-to-end demo", "Live", "todo"],
         ],
-        col_widths=[1, 6, 3.5, 3]
+        col_widths="auto", formats={"Status": status}
     )
 
-    doc.add_paragraph().space_after = Pt(6)
+    add_spacer(doc, 6)
 
     add_heading_styled(doc, "Phase 2: Production Integration (Feb–Apr 2026)", 2)
 
@@ -613,10 +422,10 @@ def build_timeline(doc):
             ["4", "Security hardening", "Will's team"],
             ["5", "Agent Teams upgrade (if needed)", "SG"],
         ],
-        col_widths=[1, 8, 5]
+        col_widths="auto"
     )
 
-    doc.add_paragraph().space_after = Pt(6)
+    add_spacer(doc, 6)
 
     add_heading_styled(doc, "Phase 3: Ongoing Operations (Apr–Sep 2026)", 2)
 
@@ -628,7 +437,7 @@ def build_timeline(doc):
             ["3", "New agent types (CI-fixer, docs agent)", "SG"],
             ["4", "Monitoring and alerting via Azure Monitor", "Will's team"],
         ],
-        col_widths=[1, 8, 5]
+        col_widths="auto"
     )
 
 
@@ -651,7 +460,7 @@ def build_success_criteria(doc):
             ["6", "Observability", "Full visibility", "Dashboard shows live logs, steps, and costs"],
             ["7", "Data integrity", "100% verified", "Fidelity Gates show zero data loss"],
         ],
-        col_widths=[1, 3.5, 4, 5.5]
+        col_widths="auto"
     )
 
 
@@ -677,7 +486,49 @@ def build_references(doc):
     add_styled_table(doc,
         ["Source", "Relevance"],
         refs,
-        col_widths=[7, 9]
+        col_widths="auto"
+    )
+
+
+def build_appendix_glossary(doc):
+    """Appendix A: Glossary."""
+    doc.add_page_break()
+    add_heading_styled(doc, "Appendix A: Glossary", 1)
+    add_accent_bar(doc)
+
+    add_styled_table(doc,
+        ["Term", "Definition"],
+        [
+            ["Built-in Subagents", "Claude Code's native system for spawning specialized agents via .claude/agents/ Markdown files"],
+            ["Subagent", "A specialized agent spawned by a parent agent, with its own context window and tool restrictions"],
+            ["Agent Team", "Claude Code's multi-agent system where teammates communicate directly (peer-to-peer)"],
+            ["MCP", "Model Context Protocol — standard for connecting LLMs to external data sources and tools"],
+            ["Fidelity Gate", "A verification checkpoint that compares expected data (manifest) with actual data (receipt)"],
+            ["Manager Pattern", "Orchestration approach where a central agent delegates to specialists without doing work itself"],
+        ],
+        col_widths=[4, 12]
+    )
+
+
+def build_appendix_research(doc):
+    """Appendix B: Research Artifacts."""
+    doc.add_page_break()
+    add_heading_styled(doc, "Appendix B: Research Artifacts", 1)
+    add_accent_bar(doc)
+
+    add_body(doc, "The following research documents were produced during the evaluation phase "
+                  "and are available for reference:")
+
+    add_styled_table(doc,
+        ["Document", "Content"],
+        [
+            ["RESEARCH-CLI-HOOKS-ARCHITECTURE-DE.md", "Cursor CLI vs Claude Code CLI comparison (German)"],
+            ["RESEARCH-CLI-HOOKS-ARCHITECTURE-EN.md", "Same document in English"],
+            ["PROPOSAL-FIDELITY-ARCHITECTURE-THEAUDITOR.md", "Database-First architecture analysis"],
+            ["QA-ARCHITECTURE-DECISIONS.md", "6 key architecture questions answered with sources"],
+            ["PROJECT-PLAN.md", "Full project plan with timeline, scope, and business strategy"],
+        ],
+        col_widths="auto"
     )
 
 
@@ -706,10 +557,10 @@ def build_appendix_fastapi(doc):
             ["TOP: Frontend / Dashboard", "What the user sees — the 'pretty shell'", "HTMX / React / Next.js"],
             ["BOTTOM: Backend / Server", "Where the logic happens — the 'brain'", "Python with FastAPI"],
         ],
-        col_widths=[4, 6, 4]
+        col_widths="auto"
     )
 
-    doc.add_paragraph().space_after = Pt(4)
+    add_spacer(doc, 4)
 
     add_heading_styled(doc, "Responsibilities of FastAPI", 3)
     add_bullet(doc, 'Acts as the "Orchestration Server" (the conductor of the orchestra)')
@@ -752,7 +603,7 @@ def build_appendix_fastapi(doc):
         col_widths=[5, 11]
     )
 
-    doc.add_paragraph().space_after = Pt(6)
+    add_spacer(doc, 6)
 
     add_quote(doc, (
         '"FastAPI is the Python framework we use for our server. While the frontend can be JavaScript, '
@@ -788,10 +639,10 @@ def build_appendix_methodology(doc):
             ["Proposal Template", "Ex-McKinsey/BCG (SlideWorks)",
              "Systematic proposals achieve 55% higher win rates."],
         ],
-        col_widths=[3, 4, 9]
+        col_widths="auto"
     )
 
-    doc.add_paragraph().space_after = Pt(6)
+    add_spacer(doc, 6)
 
     add_heading_styled(doc, "Phase 2: Technical Research", 2)
 
@@ -804,10 +655,10 @@ def build_appendix_methodology(doc):
             ["Discord (Claude Code Community)", "Agent Teams vs Subagents costs. Graphiti rejected. Session limits."],
             ["claude-hub / e2b-dev Templates", "Production FastAPI + Agent SDK. Docker isolation. Webhook signatures."],
         ],
-        col_widths=[5, 11]
+        col_widths="auto"
     )
 
-    doc.add_paragraph().space_after = Pt(6)
+    add_spacer(doc, 6)
 
     add_heading_styled(doc, "Phase 3: Synthesis", 2)
 
@@ -832,64 +683,118 @@ def build_appendix_methodology(doc):
             ["Update: PROJECT-PLAN.md", "~10 min", "Tech decision, deliverables, change log"],
             ["Total", "~70 min", "From blank file to finished consulting document"],
         ],
-        col_widths=[5, 2.5, 8.5]
+        col_widths="auto"
     )
 
 
-def build_footer(doc):
-    """Add footer to all sections."""
-    for section in doc.sections:
-        footer = section.footer
-        footer.is_linked_to_previous = False
-        p = footer.paragraphs[0] if footer.paragraphs else footer.add_paragraph()
-        p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        run = p.add_run("SG Consulting  |  Technical Architecture Proposal  |  February 2026  |  CONFIDENTIAL")
-        run.font.size = Pt(7)
-        run.font.color.rgb = WARM_GRAY
-        run.font.name = "Calibri"
-
-
-def main():
-    doc = Document()
-
-    # ── Page Setup ──
-    for section in doc.sections:
-        section.top_margin = Cm(2)
-        section.bottom_margin = Cm(2)
-        section.left_margin = Cm(2.5)
-        section.right_margin = Cm(2.5)
-
-    # ── Default Font ──
-    style = doc.styles["Normal"]
-    font = style.font
-    font.name = "Calibri"
-    font.size = Pt(10.5)
-    font.color.rgb = CHARCOAL
-
-    # ── Build Sections ──
-    build_cover_page(doc)
-    build_exec_summary(doc)
-    build_situation(doc)
-    build_complication(doc)
-    build_resolution(doc)
-    build_fidelity(doc)
-    build_costs(doc)
-    build_risks(doc)
-    build_timeline(doc)
-    build_success_criteria(doc)
-    build_references(doc)
-    build_appendix_fastapi(doc)
-    build_appendix_methodology(doc)
-    build_footer(doc)
-
-    # ── Save ──
-    out = "CONSULTANT-PAPER-AGENT-ARCHITECTURE.docx"
-    doc.save(out)
-    print(f"[OK] Generated: {out}")
-    print(f"     Pages: ~20+ (estimated)")
-    print(f"     Sections: 10 + 4 Appendices")
-    print(f"     Tables: 18 styled tables")
-    print(f"     Color scheme: Navy (#003366) + Electric Blue (#0096D6)")
+# ── Document Outline (rendered in this order) ──
+SECTIONS = [
+    build_cover_page,
+    build_exec_summary,
+    build_situation,
+    build_complication,
+    build_resolution,
+    build_fidelity,
+    build_costs,
+    build_risks,
+    build_timeline,
+    build_success_criteria,
+    build_references,
+    build_appendix_glossary,
+    build_appendix_research,
+    build_appendix_fastapi,
+    build_appendix_methodology,
+]
+
+
+def selected_sections(only=None, fields=None):
+    """SECTIONS (or the build_* functions named in only), bound to FIELDS updated by fields."""
+    return bind_fields([fn for fn in SECTIONS if not only or fn.__name__ in only], {**FIELDS, **(fields or {})})
+
+
+def render(out_dir=".", cache_dir=CACHE_DIR, jobs=1, draft=False, only=None, fields=None, optimize=False):
+    """Build the paper (or only the build_* sections named in only) into out_dir;
+    returns (path, section report, layout, written)."""
+    version = helper_version(sys.modules[__name__], sections=SECTIONS)
+    fields = {**FIELDS, **(fields or {})}
+    out = os.path.join(out_dir, output_name(OUTPUT, only, draft=draft))
+    report, layout, written = build_document(out, docx_sections(function_sections(selected_sections(only, fields))),
+                                             fields["footer"], version, cache_dir, jobs, draft, optimize)
+    return out, report, layout, written
+
+
+def patch(out_dir=".", cache_dir=CACHE_DIR, only=None, fields=None):
+    """Re-render the build_* sections named in only inside the saved paper in out_dir;
+    returns (path, section report, written, patch stats)."""
+    version = helper_version(sys.modules[__name__], sections=SECTIONS)
+    fields = {**FIELDS, **(fields or {})}
+    out = os.path.join(out_dir, OUTPUT)
+    report, written, stats = patch_document(out, docx_sections(function_sections(selected_sections(only, fields))),
+                                            [fn.__name__ for fn in SECTIONS], version, cache_dir)
+    return out, report, written, stats
+
+
+def export(fmt, out_dir=".", only=None):
+    """Write the paper (or only the build_* sections named in only) as fmt ("html" or "md")
+    into out_dir, from the same document tree as the DOCX; returns (path, written)."""
+    out = os.path.join(out_dir, output_name(OUTPUT, only, fmt))
+    return out, write_export(record(selected_sections(only)).nodes, fmt, out)
+
+
+def main(argv=None):
+    args = parse_generator_args(__file__, argv)
+    cache_dir = None if args.no_cache else args.cache_dir
+    jobs = args.jobs or os.cpu_count()
+    if args.merge:
+        try:
+            report = merge_manifest(args.merge, render, FIELDS, OUTPUT, args.out_dir, jobs,
+                                    cache_dir=cache_dir, draft=args.draft, only=args.only)
+        except ValueError as e:  # a malformed manifest
+            sys.exit(f"[ERROR] {e}")
+        print_merge_report(args.merge, args.out_dir, report)
+        return
+    if args.patch:
+        start = time.perf_counter()
+        try:
+            out, report, written, stats = patch(".", cache_dir, args.patch)
+        except (OSError, ValueError) as e:  # no saved document, or one built without section bookmarks
+            sys.exit(f"[ERROR] {e}")
+        print_patch_report(os.path.basename(out), report, time.perf_counter() - start, stats, written)
+        return
+
+    for fmt in args.format:
+        if fmt != "docx":
+            start = time.perf_counter()
+            out, written = export(fmt, ".", args.only)
+            print(f"[OK] {'Generated' if written else 'Unchanged'}: {os.path.basename(out)}  "
+                  f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+    if "docx" not in args.format:
+        return
+
+    start = time.perf_counter()
+    if args.profile is not None:
+        tracemalloc.start()
+
+    # ── Build Sections (unchanged ones come from the section cache) ──
+    out, report, layout, written = render(".", cache_dir, jobs, args.draft, args.only, optimize=args.optimize)
+    out = os.path.basename(out)
+    seconds = time.perf_counter() - start
+    if args.profile is not None:
+        tracemalloc.stop()
+
+    # ── Report (measured, not estimated) ──
+    parts = zip_parts(out)
+    print_build_report(out, report, parts, seconds, layout, written)
+    print("     Color scheme: Navy (#003366) + Electric Blue (#0096D6)")
+    if args.profile is not None:
+        path = write_profile(args.profile or out + ".profile.json", out, report, parts, seconds, layout)
+        print(f"     Profile: {path}")
+    if args.redline:
+        try:
+            path, _, stats = redline_file(args.redline, out)
+        except (OSError, ValueError) as e:  # no earlier revision there, or not a .docx package
+            sys.exit(f"[ERROR] {args.redline}: {e}")
+        print(f"     Redline: {path} against {args.redline} ({redline_note(stats)})")
 
 
 if __name__ == "__main__":
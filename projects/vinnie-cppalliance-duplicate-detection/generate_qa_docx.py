@@ -1,260 +1,69 @@
 """
 Generate McKinsey-style Word document for the Q&A Architecture Decisions.
-Run: python generate_qa_docx.py
+Run: python generate_qa_docx.py [--list] [--only NAME,...] [--draft] [--optimize] [--no-cache] [--jobs N]
+     python generate_qa_docx.py --patch NAME[,NAME...]   (re-render sections inside the saved .docx)
+     python generate_qa_docx.py --merge revisions.jsonl [--out-dir DIR]
+     python generate_qa_docx.py --redline OLD.docx   (also <output>.redline.docx, changes since OLD tracked)
 Output: QA-ARCHITECTURE-DECISIONS.docx
 """
 
-from docx import Document
-from docx.shared import Pt, Cm, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.enum.table import WD_TABLE_ALIGNMENT
-from docx.oxml.ns import nsdecls
-from docx.oxml import parse_xml
-
-# ── Color Palette (same as Consultant Paper) ──
-NAVY = RGBColor(0x00, 0x33, 0x66)
-DARK_BLUE = RGBColor(0x00, 0x52, 0x8A)
-ELECTRIC = RGBColor(0x00, 0x96, 0xD6)
-CHARCOAL = RGBColor(0x33, 0x33, 0x33)
-WHITE = RGBColor(0xFF, 0xFF, 0xFF)
-WARM_GRAY = RGBColor(0x6B, 0x6B, 0x6B)
-GREEN_ACCENT = RGBColor(0x00, 0x7A, 0x33)
-RED_ACCENT = RGBColor(0xCC, 0x00, 0x00)
-
-TBL_HEADER_BG = "003366"
-TBL_ALT_BG = "F0F4F8"
-TBL_BORDER_COLOR = "B0BEC5"
-ACCENT_BAR_COLOR = "0096D6"
-
-
-def set_keep_with_next(paragraph):
-    """Keep this paragraph on the same page as the next one."""
-    pPr = paragraph._p.get_or_add_pPr()
-    keep = parse_xml(f'<w:keepNext {nsdecls("w")} />')
-    pPr.append(keep)
-
-
-def set_keep_together(paragraph):
-    """Prevent this paragraph from splitting across pages."""
-    pPr = paragraph._p.get_or_add_pPr()
-    keep = parse_xml(f'<w:keepLines {nsdecls("w")} />')
-    pPr.append(keep)
-
-
-def set_page_break_before(paragraph):
-    """Start this paragraph on a new page WITHOUT adding an empty paragraph.
-    Unlike doc.add_page_break(), this never creates blank pages."""
-    pPr = paragraph._p.get_or_add_pPr()
-    pb = parse_xml(f'<w:pageBreakBefore {nsdecls("w")} />')
-    pPr.append(pb)
-
-
-def set_cell_bg(cell, color_hex):
-    shading = parse_xml(f'<w:shd {nsdecls("w")} w:fill="{color_hex}"/>')
-    cell._tc.get_or_add_tcPr().append(shading)
-
-
-def set_cell_borders(cell, color="B0BEC5", sz="4"):
-    tc = cell._tc
-    tcPr = tc.get_or_add_tcPr()
-    borders = parse_xml(
-        f'<w:tcBorders {nsdecls("w")}>'
-        f'  <w:top w:val="single" w:sz="{sz}" w:space="0" w:color="{color}"/>'
-        f'  <w:left w:val="single" w:sz="{sz}" w:space="0" w:color="{color}"/>'
-        f'  <w:bottom w:val="single" w:sz="{sz}" w:space="0" w:color="{color}"/>'
-        f'  <w:right w:val="single" w:sz="{sz}" w:space="0" w:color="{color}"/>'
-        f'</w:tcBorders>'
-    )
-    tcPr.append(borders)
-
-
-def add_styled_table(doc, headers, rows, col_widths=None):
-    table = doc.add_table(rows=1 + len(rows), cols=len(headers))
-    table.alignment = WD_TABLE_ALIGNMENT.CENTER
-    table.autofit = True
-
-    for i, h in enumerate(headers):
-        cell = table.rows[0].cells[i]
-        cell.text = ""
-        p = cell.paragraphs[0]
-        run = p.add_run(h)
-        run.bold = True
-        run.font.size = Pt(9)
-        run.font.color.rgb = WHITE
-        run.font.name = "Calibri"
-        p.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        set_cell_bg(cell, TBL_HEADER_BG)
-        set_cell_borders(cell, TBL_HEADER_BG, "6")
-
-    for r_idx, row_data in enumerate(rows):
-        for c_idx, val in enumerate(row_data):
-            cell = table.rows[r_idx + 1].cells[c_idx]
-            cell.text = ""
-            p = cell.paragraphs[0]
-            text = str(val)
-            if text.startswith("**") and text.endswith("**"):
-                run = p.add_run(text.strip("*"))
-                run.bold = True
-            else:
-                run = p.add_run(text)
-            run.font.size = Pt(9)
-            run.font.color.rgb = CHARCOAL
-            run.font.name = "Calibri"
-            p.alignment = WD_ALIGN_PARAGRAPH.LEFT
-            set_cell_borders(cell, TBL_BORDER_COLOR)
-            if r_idx % 2 == 1:
-                set_cell_bg(cell, TBL_ALT_BG)
-
-    if col_widths:
-        for row in table.rows:
-            for i, w in enumerate(col_widths):
-                if i < len(row.cells):
-                    row.cells[i].width = Cm(w)
-    return table
-
-
-def add_accent_bar(doc, sz="12"):
-    p = doc.add_paragraph()
-    p.alignment = WD_ALIGN_PARAGRAPH.LEFT
-    pPr = p._p.get_or_add_pPr()
-    borders = parse_xml(
-        f'<w:pBorders {nsdecls("w")}>'
-        f'  <w:bottom w:val="single" w:sz="{sz}" w:space="1" w:color="{ACCENT_BAR_COLOR}"/>'
-        f'</w:pBorders>'
-    )
-    pPr.append(borders)
-    p.space_after = Pt(6)
-
-
-def add_heading_styled(doc, text, level=1):
-    h = doc.add_heading(text, level=level)
-    for run in h.runs:
-        if level == 1:
-            run.font.color.rgb = NAVY
-            run.font.size = Pt(22)
-        elif level == 2:
-            run.font.color.rgb = DARK_BLUE
-            run.font.size = Pt(16)
-        elif level == 3:
-            run.font.color.rgb = ELECTRIC
-            run.font.size = Pt(13)
-        run.font.name = "Calibri"
-    return h
-
-
-def add_body(doc, text, bold=False, italic=False, color=None):
-    p = doc.add_paragraph()
-    run = p.add_run(text)
-    run.font.size = Pt(10.5)
-    run.font.name = "Calibri"
-    run.font.color.rgb = color or CHARCOAL
-    run.bold = bold
-    run.italic = italic
-    p.space_after = Pt(4)
-    p.space_before = Pt(2)
-    return p
-
-
-def add_quote(doc, text):
-    p = doc.add_paragraph()
-    pPr = p._p.get_or_add_pPr()
-    borders = parse_xml(
-        f'<w:pBorders {nsdecls("w")}>'
-        f'  <w:left w:val="single" w:sz="24" w:space="8" w:color="{ACCENT_BAR_COLOR}"/>'
-        f'</w:pBorders>'
-    )
-    pPr.append(borders)
-    ind = parse_xml(f'<w:ind {nsdecls("w")} w:left="720"/>')
-    pPr.append(ind)
-    run = p.add_run(text)
-    run.font.size = Pt(10)
-    run.font.name = "Calibri"
-    run.font.color.rgb = WARM_GRAY
-    run.italic = True
-    p.space_after = Pt(8)
-    return p
-
-
-def add_code_block(doc, text):
-    p = doc.add_paragraph()
-    pPr = p._p.get_or_add_pPr()
-    shading = parse_xml(f'<w:shd {nsdecls("w")} w:fill="F5F5F5"/>')
-    pPr.append(shading)
-    borders = parse_xml(
-        f'<w:pBorders {nsdecls("w")}>'
-        f'  <w:top w:val="single" w:sz="4" w:space="1" w:color="DDDDDD"/>'
-        f'  <w:left w:val="single" w:sz="4" w:space="4" w:color="DDDDDD"/>'
-        f'  <w:bottom w:val="single" w:sz="4" w:space="1" w:color="DDDDDD"/>'
-        f'  <w:right w:val="single" w:sz="4" w:space="4" w:color="DDDDDD"/>'
-        f'</w:pBorders>'
-    )
-    pPr.append(borders)
-    run = p.add_run(text)
-    run.font.size = Pt(8.5)
-    run.font.name = "Consolas"
-    run.font.color.rgb = CHARCOAL
-    p.space_after = Pt(6)
-    return p
-
-
-def add_bullet(doc, text, bold_prefix=""):
-    p = doc.add_paragraph(style="List Bullet")
-    p.clear()
-    if bold_prefix:
-        run = p.add_run(bold_prefix)
-        run.bold = True
-        run.font.size = Pt(10)
-        run.font.name = "Calibri"
-        run.font.color.rgb = CHARCOAL
-    run = p.add_run(text)
-    run.font.size = Pt(10)
-    run.font.name = "Calibri"
-    run.font.color.rgb = CHARCOAL
-    return p
-
-
-def build_cover(doc):
+import os
+import sys
+import time
+import tracemalloc
+
+from docx_render.cli import GENERATOR_OUTPUTS, output_name, parse_generator_args
+
+if __name__ == "__main__":
+    # --help, --list and a mistyped --only are answered before python-docx loads
+    parse_generator_args(__file__)
+
+from docx_render import (
+    GREEN_ACCENT, RED_ACCENT,
+    add_cover_title, add_cover_subtitle, add_cover_meta, set_page_break_before,
+    add_styled_table, add_accent_bar, add_spacer, add_heading_styled, add_body,
+    add_quote, add_code_block, add_bullet,
+    print_build_report, write_profile, zip_parts,
+    CACHE_DIR, function_sections, helper_version, record, write_export,
+    bind_fields, merge_manifest, print_merge_report,
+)
+from docx_render.build import build_document
+from docx_render.patch import patch_document, print_patch_report
+from docx_render.redline import redline_file, redline_note
+from docx_render.ir_docx import docx_sections
+
+OUTPUT = GENERATOR_OUTPUTS["generate_qa_docx"]
+FOOTER_TEXT = "SG Consulting  |  Architecture Decisions Q&A  |  February 2026  |  INTERNAL"
+
+# Merge fields (--merge MANIFEST sets them per record)
+FIELDS = {
+    "document_type": "Internal Q&A Reference",
+    "date": "February 10, 2026",
+    "context": "Multi-Agent Code Review System for LLVM/Clang",
+    "version": "1.0",
+    "footer": FOOTER_TEXT,
+}
+
+
+def build_cover(doc, fields=FIELDS):
+    """Build the cover page."""
     for _ in range(4):
-        doc.add_paragraph().space_after = Pt(20)
+        add_spacer(doc, 20)
     add_accent_bar(doc, sz="48")  # THICK bar — visible on cover
 
-    p = doc.add_paragraph()
-    p.alignment = WD_ALIGN_PARAGRAPH.LEFT
-    run = p.add_run("Architecture Decisions")
-    run.font.size = Pt(36)
-    run.font.color.rgb = NAVY
-    run.font.name = "Calibri"
-    run.bold = True
-    p.space_after = Pt(4)
-
-    p = doc.add_paragraph()
-    p.alignment = WD_ALIGN_PARAGRAPH.LEFT
-    run = p.add_run("Questions & Answers\nMulti-Agent Code Review System for LLVM/Clang")
-    run.font.size = Pt(20)
-    run.font.color.rgb = ELECTRIC
-    run.font.name = "Calibri"
-    p.space_after = Pt(30)
+    add_cover_title(doc, "Architecture Decisions")
+    add_cover_subtitle(doc, "Questions & Answers\nMulti-Agent Code Review System for LLVM/Clang")
 
     add_accent_bar(doc, sz="48")  # THICK bar — visible on cover
 
     meta = [
-        ("Document Type", "Internal Q&A Reference"),
-        ("Date", "February 10, 2026"),
-        ("Context", "Multi-Agent Code Review System for LLVM/Clang"),
-        ("Version", "1.0"),
+        ("Document Type", fields["document_type"]),
+        ("Date", fields["date"]),
+        ("Context", fields["context"]),
+        ("Version", fields["version"]),
     ]
     for label, value in meta:
-        p = doc.add_paragraph()
-        run = p.add_run(f"{label}:  ")
-        run.font.size = Pt(10)
-        run.font.color.rgb = WARM_GRAY
-        run.font.name = "Calibri"
-        run.bold = True
-        run = p.add_run(value)
-        run.font.size = Pt(10)
-        run.font.color.rgb = CHARCOAL
-        run.font.name = "Calibri"
-        p.space_after = Pt(2)
+        add_cover_meta(doc, label, value)
     doc.add_page_break()
 
 
@@ -286,31 +95,26 @@ def build_q1(doc):
             ["Daemon mode", "No", "No -- but SDK embeds into FastAPI", "Claude Code"],
             ["Multi-model support", "GPT-5, Claude, Gemini, Grok", "Anthropic-only", "Cursor CLI"],
         ],
-        col_widths=[3.5, 4.5, 4.5, 3.5]
+        col_widths="auto"
     )
 
-    doc.add_paragraph().space_after = Pt(6)
+    add_spacer(doc, 6)
     add_body(doc, "The decision is based on three capabilities Cursor CLI lacks entirely:", bold=True)
-    add_bullet(doc, " -- agents defined as Python objects, callable natively from FastAPI", "Python SDK")
-    add_bullet(doc, " -- built-in feature for multi-agent orchestration without external frameworks", "Subagents")
-    add_bullet(doc, " -- PreToolUse, PostToolUse, SessionStart, Stop, etc., all functional in headless mode", "15 Hook Events")
+    add_bullet(doc, " -- agents defined as Python objects, callable natively from FastAPI", bold_prefix="Python SDK")
+    add_bullet(doc, " -- built-in feature for multi-agent orchestration without external frameworks", bold_prefix="Subagents")
+    add_bullet(doc, " -- PreToolUse, PostToolUse, SessionStart, Stop, etc., all functional in headless mode", bold_prefix="15 Hook Events")
 
-    doc.add_paragraph().space_after = Pt(4)
+    add_spacer(doc, 4)
     add_body(doc, (
         "Cursor CLI is an excellent tool for interactive development, but it lacks the programmatic "
         "orchestration layer we need for a webhook-driven multi-agent system."
     ))
 
-    h = add_heading_styled(doc, "Sources", 3)
-    set_keep_with_next(h)
-    b1 = add_bullet(doc, 'docs.cursor.com/context/codebase-indexing -- "Cursor indexes your codebase... When you open a project" (IDE feature)')
-    set_keep_with_next(b1)
-    b2 = add_bullet(doc, "docs.cursor.com/en/cli/overview -- no mention of indexing")
-    set_keep_with_next(b2)
-    b3 = add_bullet(doc, 'Discord: Tee (Cursor team) -- "Cursor CLI does not index codebase, this is only done by the IDE"')
-    set_keep_with_next(b3)
-    b4 = add_bullet(doc, "code.claude.com/docs/en/headless -- programmatic usage with SDK")
-    set_keep_with_next(b4)
+    add_heading_styled(doc, "Sources", 3)
+    add_bullet(doc, 'docs.cursor.com/context/codebase-indexing -- "Cursor indexes your codebase... When you open a project" (IDE feature)')
+    add_bullet(doc, "docs.cursor.com/en/cli/overview -- no mention of indexing")
+    add_bullet(doc, 'Discord: Tee (Cursor team) -- "Cursor CLI does not index codebase, this is only done by the IDE"')
+    add_bullet(doc, "code.claude.com/docs/en/headless -- programmatic usage with SDK")
     add_bullet(doc, "code.claude.com/docs/en/hooks-guide -- 15 event types")
 
 
@@ -341,11 +145,11 @@ def build_q2(doc):
     add_code_block(doc, flow)
 
     add_heading_styled(doc, "Key Points", 3)
-    add_bullet(doc, " -- developers interact only with GitHub, the server handles everything", "No local setup required")
-    add_bullet(doc, " -- managed centrally on the server, not per-developer", "Single ANTHROPIC_API_KEY")
-    add_bullet(doc, " -- visible in the monitoring dashboard", "Token costs tracked per agent run")
-    add_bullet(doc, " -- dashboard can expose a manual trigger endpoint", "Optional direct access")
-    add_bullet(doc, " -- GitHub webhook signatures ensure only legitimate events are processed", "Access control")
+    add_bullet(doc, " -- developers interact only with GitHub, the server handles everything", bold_prefix="No local setup required")
+    add_bullet(doc, " -- managed centrally on the server, not per-developer", bold_prefix="Single ANTHROPIC_API_KEY")
+    add_bullet(doc, " -- visible in the monitoring dashboard", bold_prefix="Token costs tracked per agent run")
+    add_bullet(doc, " -- dashboard can expose a manual trigger endpoint", bold_prefix="Optional direct access")
+    add_bullet(doc, " -- GitHub webhook signatures ensure only legitimate events are processed", bold_prefix="Access control")
 
 
 def build_q3(doc):
@@ -366,10 +170,10 @@ def build_q3(doc):
             ["nginx reverse proxy", "24/7 (HTTPS termination)", "$0"],
             ["Azure VM (B2ms)", "24/7", "~$60/month (MS credits)"],
         ],
-        col_widths=[5, 5, 5]
+        col_widths="auto"
     )
 
-    doc.add_paragraph().space_after = Pt(6)
+    add_spacer(doc, 6)
     add_heading_styled(doc, "What Runs On-Demand (Event-Triggered)", 3)
 
     add_styled_table(doc,
@@ -379,10 +183,10 @@ def build_q3(doc):
             ["Coding Agent", "Knowledge agent returns context", "Minutes", "~$0.50-2.00"],
             ["Review Agent", "Coding agent completes changes", "Seconds-minutes", "~$0.10-0.30"],
         ],
-        col_widths=[4, 4, 3.5, 3.5]
+        col_widths="auto"
     )
 
-    doc.add_paragraph().space_after = Pt(6)
+    add_spacer(doc, 6)
     add_quote(doc, (
         "Analogy: A doctor on call -- not operating 24/7, but reachable 24/7. "
         "The server is the hospital that never closes. The agents are the specialists called in when needed."
@@ -411,10 +215,10 @@ def build_q4(doc):
             ["Coding Agent", "Opus 4.6", "C++ quality demands the best model", "~$0.50-2.00 (most expensive)"],
             ["Review Agent", "Sonnet 4", "Review quality, fewer tokens", "~$0.10-0.30 (medium)"],
         ],
-        col_widths=[3, 2.5, 5.5, 5]
+        col_widths="auto"
     )
 
-    doc.add_paragraph().space_after = Pt(4)
+    add_spacer(doc, 4)
     add_body(doc, (
         "The cost gradient works naturally: the knowledge agent runs most frequently (every event) "
         "but is the cheapest. The expensive coding agent only runs when actual code changes are needed."
@@ -436,10 +240,10 @@ def build_q4(doc):
             ["Azure Key Vault", "~$1", "MS credits", "--"],
             ["Total infrastructure", "~$66/month", "MS credits", "76+ months"],
         ],
-        col_widths=[4, 3, 4, 4]
+        col_widths="auto"
     )
 
-    doc.add_paragraph().space_after = Pt(6)
+    add_spacer(doc, 6)
     add_heading_styled(doc, "Comparison with Alternatives", 3)
 
     add_styled_table(doc,
@@ -449,7 +253,7 @@ def build_q4(doc):
             ["GitHub Runners (current)", "$0 infra + API + dev time", "Free infra but 2-5 min/interaction = costly in dev hours"],
             ["LangGraph/CrewAI stack", "~$200+ + API tokens", "Additional SaaS fees, complexity overhead"],
         ],
-        col_widths=[4, 4, 8]
+        col_widths="auto"
     )
 
 
@@ -462,9 +266,9 @@ def build_q5(doc):
 
     add_heading_styled(doc, "Layer 1: Scoped System Prompts", 3)
     add_body(doc, "Each agent receives ONLY the instructions relevant to its role. No agent sees the full system context:")
-    add_bullet(doc, ' "Query Pinecone and SQLite. Return structured context. DO NOT write code."', "Knowledge Agent: ")
-    add_bullet(doc, ' "Implement changes based on context. Clean diffs. Clear commits."', "Coding Agent: ")
-    add_bullet(doc, ' "Review changes. Respond ALL CLEAR or return specific feedback."', "Review Agent: ")
+    add_bullet(doc, ' "Query Pinecone and SQLite. Return structured context. DO NOT write code."', bold_prefix="Knowledge Agent: ")
+    add_bullet(doc, ' "Implement changes based on context. Clean diffs. Clear commits."', bold_prefix="Coding Agent: ")
+    add_bullet(doc, ' "Review changes. Respond ALL CLEAR or return specific feedback."', bold_prefix="Review Agent: ")
 
     add_heading_styled(doc, "Layer 2: Tool Restrictions", 3)
 
@@ -476,10 +280,10 @@ def build_q5(doc):
             ["Review Agent", "Read, Grep, Glob, Bash (tests only)", "Edit, Write"],
             ["Orchestrator", "None (delegates only)", "ALL coding tools"],
         ],
-        col_widths=[3.5, 6, 5.5]
+        col_widths="auto"
     )
 
-    doc.add_paragraph().space_after = Pt(6)
+    add_spacer(doc, 6)
     add_heading_styled(doc, "Layer 3: Execution Limits", 3)
 
     add_styled_table(doc,
@@ -490,10 +294,10 @@ def build_q5(doc):
             ["Review loop iterations", "Max 3", "Prevent endless coding/review cycles"],
             ["Context window", "Each agent starts fresh", "No accumulated bloat across agents"],
         ],
-        col_widths=[4, 4, 8]
+        col_widths="auto"
     )
 
-    doc.add_paragraph().space_after = Pt(6)
+    add_spacer(doc, 6)
     add_heading_styled(doc, "Layer 4: Context Passing (Not Sharing)", 3)
 
     flow = (
@@ -530,10 +334,10 @@ def build_q6(doc):
             ["Coding Agent", "Senior C++ developer", "Read, Edit, Write, Bash, Git", "Opus 4.6", "HIGH"],
             ["Review Agent", "Code reviewer / QA", "Read, Grep, Glob, Bash", "Sonnet 4", "MEDIUM"],
         ],
-        col_widths=[3, 3.5, 3.5, 3, 3]
+        col_widths="auto"
     )
 
-    doc.add_paragraph().space_after = Pt(6)
+    add_spacer(doc, 6)
 
     add_quote(doc, (
         '"CRITICAL: YOU ARE FORBIDDEN FROM CALLING AGENTS OTHER THAN THE ONES LISTED. '
@@ -564,23 +368,18 @@ def build_q6(doc):
     )
     add_code_block(doc, pipeline)
 
-    h_analogy = add_heading_styled(doc, "Professional Specialization Analogies", 3)
-    set_keep_with_next(h_analogy)
-    set_keep_together(h_analogy)
-    b1 = add_bullet(doc, " is like a research librarian -- finds information but never writes the paper", "Knowledge Agent")
-    set_keep_with_next(b1)
-    b2 = add_bullet(doc, " is like a senior developer -- writes code but doesn't review its own work", "Coding Agent")
-    set_keep_with_next(b2)
-    b3 = add_bullet(doc, " is like a QA engineer -- validates but never implements", "Review Agent")
-    set_keep_with_next(b3)
-    add_bullet(doc, " is like a project manager -- coordinates but never codes", "Orchestrator")
+    add_heading_styled(doc, "Professional Specialization Analogies", 3)
+    add_bullet(doc, " is like a research librarian -- finds information but never writes the paper", bold_prefix="Knowledge Agent")
+    add_bullet(doc, " is like a senior developer -- writes code but doesn't review its own work", bold_prefix="Coding Agent")
+    add_bullet(doc, " is like a QA engineer -- validates but never implements", bold_prefix="Review Agent")
+    add_bullet(doc, " is like a project manager -- coordinates but never codes", bold_prefix="Orchestrator")
 
     # pageBreakBefore on heading — never creates blank pages
     h_upgrade = add_heading_styled(doc, "Upgrade Path", 3)
     set_page_break_before(h_upgrade)
-    add_bullet(doc, " -- responds to check_run failures, fixes build errors", "CI-Fixer Agent")
-    add_bullet(doc, " -- generates/updates docs when code changes", "Documentation Agent")
-    add_bullet(doc, " -- scans changes for vulnerabilities before PR creation", "Security Agent")
+    add_bullet(doc, " -- responds to check_run failures, fixes build errors", bold_prefix="CI-Fixer Agent")
+    add_bullet(doc, " -- generates/updates docs when code changes", bold_prefix="Documentation Agent")
+    add_bullet(doc, " -- scans changes for vulnerabilities before PR creation", bold_prefix="Security Agent")
 
     add_body(doc, "The architecture scales horizontally by adding agents, not by making existing agents more complex.")
 
@@ -608,50 +407,97 @@ def build_correction(doc):
     add_body(doc, "Not on indexing performance.", bold=True)
 
 
-def build_footer(doc):
-    for section in doc.sections:
-        footer = section.footer
-        footer.is_linked_to_previous = False
-        p = footer.paragraphs[0] if footer.paragraphs else footer.add_paragraph()
-        p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        run = p.add_run("SG Consulting  |  Architecture Decisions Q&A  |  February 2026  |  INTERNAL")
-        run.font.size = Pt(7)
-        run.font.color.rgb = WARM_GRAY
-        run.font.name = "Calibri"
-
-
-def main():
-    doc = Document()
-
-    for section in doc.sections:
-        section.top_margin = Cm(2)
-        section.bottom_margin = Cm(2)
-        section.left_margin = Cm(2.5)
-        section.right_margin = Cm(2.5)
-
-    style = doc.styles["Normal"]
-    font = style.font
-    font.name = "Calibri"
-    font.size = Pt(10.5)
-    font.color.rgb = CHARCOAL
-
-    build_cover(doc)
-    build_q1(doc)
-    build_q2(doc)
-    build_q3(doc)
-    build_q4(doc)
-    build_q5(doc)
-    build_q6(doc)
-    build_correction(doc)
-    build_footer(doc)
-
-    out = "QA-ARCHITECTURE-DECISIONS.docx"
-    doc.save(out)
-    print(f"[OK] Generated: {out}")
-    print(f"     Pages: ~12+ (estimated)")
-    print(f"     Questions: 6 + Correction Notice")
-    print(f"     Tables: 11 styled tables")
-
+# ── Document Outline (rendered in this order) ──
+SECTIONS = [build_cover, build_q1, build_q2, build_q3, build_q4, build_q5, build_q6, build_correction]
+
+
+def selected_sections(only=None, fields=None):
+    """SECTIONS (or the build_* functions named in only), bound to FIELDS updated by fields."""
+    return bind_fields([fn for fn in SECTIONS if not only or fn.__name__ in only], {**FIELDS, **(fields or {})})
+
+
+def render(out_dir=".", cache_dir=CACHE_DIR, jobs=1, draft=False, only=None, fields=None, optimize=False):
+    """Build the Q&A (or only the build_* sections named in only) into out_dir;
+    returns (path, section report, layout, written)."""
+    version = helper_version(sys.modules[__name__], sections=SECTIONS)
+    fields = {**FIELDS, **(fields or {})}
+    out = os.path.join(out_dir, output_name(OUTPUT, only, draft=draft))
+    report, layout, written = build_document(out, docx_sections(function_sections(selected_sections(only, fields))),
+                                             fields["footer"], version, cache_dir, jobs, draft, optimize)
+    return out, report, layout, written
+
+
+def patch(out_dir=".", cache_dir=CACHE_DIR, only=None, fields=None):
+    """Re-render the build_* sections named in only inside the saved Q&A in out_dir;
+    returns (path, section report, written, patch stats)."""
+    version = helper_version(sys.modules[__name__], sections=SECTIONS)
+    fields = {**FIELDS, **(fields or {})}
+    out = os.path.join(out_dir, OUTPUT)
+    report, written, stats = patch_document(out, docx_sections(function_sections(selected_sections(only, fields))),
+                                            [fn.__name__ for fn in SECTIONS], version, cache_dir)
+    return out, report, written, stats
+
+
+def export(fmt, out_dir=".", only=None):
+    """Write the Q&A (or only the build_* sections named in only) as fmt ("html" or "md")
+    into out_dir, from the same document tree as the DOCX; returns (path, written)."""
+    out = os.path.join(out_dir, output_name(OUTPUT, only, fmt))
+    return out, write_export(record(selected_sections(only)).nodes, fmt, out)
+
+
+def main(argv=None):
+    args = parse_generator_args(__file__, argv)
+    cache_dir = None if args.no_cache else args.cache_dir
+    jobs = args.jobs or os.cpu_count()
+    if args.merge:
+        try:
+            report = merge_manifest(args.merge, render, FIELDS, OUTPUT, args.out_dir, jobs,
+                                    cache_dir=cache_dir, draft=args.draft, only=args.only)
+        except ValueError as e:  # a malformed manifest
+            sys.exit(f"[ERROR] {e}")
+        print_merge_report(args.merge, args.out_dir, report)
+        return
+    if args.patch:
+        start = time.perf_counter()
+        try:
+            out, report, written, stats = patch(".", cache_dir, args.patch)
+        except (OSError, ValueError) as e:  # no saved document, or one built without section bookmarks
+            sys.exit(f"[ERROR] {e}")
+        print_patch_report(os.path.basename(out), report, time.perf_counter() - start, stats, written)
+        return
+
+    for fmt in args.format:
+        if fmt != "docx":
+            start = time.perf_counter()
+            out, written = export(fmt, ".", args.only)
+            print(f"[OK] {'Generated' if written else 'Unchanged'}: {os.path.basename(out)}  "
+                  f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+    if "docx" not in args.format:
+        return
+
+    start = time.perf_counter()
+    if args.profile is not None:
+        tracemalloc.start()
+
+    # Unchanged sections come from the section cache
+    out, report, layout, written = render(".", cache_dir, jobs, args.draft, args.only, optimize=args.optimize)
+    out = os.path.basename(out)
+    seconds = time.perf_counter() - start
+    if args.profile is not None:
+        tracemalloc.stop()
+
+    parts = zip_parts(out)
+    print_build_report(out, report, parts, seconds, layout, written)
+    print("     Questions: 6 + Correction Notice")
+    if args.profile is not None:
+        path = write_profile(args.profile or out + ".profile.json", out, report, parts, seconds, layout)
+        print(f"     Profile: {path}")
+    if args.redline:
+        try:
+            path, _, stats = redline_file(args.redline, out)
+        except (OSError, ValueError) as e:  # no earlier revision there, or not a .docx package
+            sys.exit(f"[ERROR] {args.redline}: {e}")
+        print(f"     Redline: {path} against {args.redline} ({redline_note(stats)})")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,380 @@
+"""
+Compile the Markdown deliverables in this folder into McKinsey-style Word documents.
+Run: python md_to_docx.py [FILE.md ...] [--out-dir DIR]
+Output: <name>.docx for every source (all *.md in this folder by default, except the
+        sources of generate_docx.py / generate_qa_docx.py, which own those .docx files)
+
+Single streaming pass: tokenize() yields one block per Markdown construct and
+compile_markdown() hands it straight to the styling helpers of docx_render,
+so the Word version can no longer drift away from the Markdown source.
+"""
+
+import argparse
+import functools
+import glob
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+from docx_render import (
+    add_heading_styled,
+    add_accent_bar,
+    add_body,
+    add_bullet,
+    add_quote,
+    add_code_block,
+    add_styled_table,
+    add_spacer,
+    pages_note,
+    write_profile,
+    zip_parts,
+    CACHE_DIR,
+    helper_version,
+)
+from docx_render.build import add_build_arguments, build_document
+from docx_render.cli import GENERATOR_OUTPUTS, output_name
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Documents a generator script builds; their .md is a reference copy, not a source
+GENERATED = {os.path.splitext(output)[0] for output in GENERATOR_OUTPUTS.values()}
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+FENCE_RE = re.compile(r"^\s*(`{3,}|~{3,})\s*([\w+#.-]*)")
+RULE_RE = re.compile(r"^\s{0,3}([-*_])(\s*\1){2,}\s*$")
+BULLET_RE = re.compile(r"^(\s*)[-*+]\s+(.*)$")
+NUMBER_RE = re.compile(r"^(\s*)(\d+)[.)]\s+(.*)$")
+TABLE_SEP_RE = re.compile(r"^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$")
+
+LINK_RE = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+ITALIC_RE = re.compile(r"(?<![\w*])\*(?=\S)(.+?)(?<=\S)\*(?![\w*])")
+CODE_RE = re.compile(r"`([^`]*)`")
+
+
+# ── Inline Markdown ──
+
+def plain(text):
+    """Strip inline Markdown (links, bold, italic, code spans) to plain text."""
+    text = LINK_RE.sub(r"\1", text)
+    text = BOLD_RE.sub(r"\1", text)
+    text = ITALIC_RE.sub(r"\1", text)
+    text = CODE_RE.sub(r"\1", text)
+    return text.replace("\\|", "|").replace("<br>", "\n")
+
+
+def split_label(text):
+    """Split a leading **bold label** off a line: returns (label, rest)."""
+    if text.startswith("**"):
+        end = text.find("**", 2)
+        if end > 2:
+            return plain(text[2:end]), plain(text[end + 2:])
+    return "", plain(text)
+
+
+def table_cells(line):
+    """Split a pipe-table row into cells, honouring escaped pipes."""
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    cells = [c.strip() for c in re.split(r"(?<!\\)\|", line)]
+    out = []
+    for c in cells:
+        # Whole-cell bold keeps the **…** marker: add_styled_table renders it bold
+        if c.startswith("**") and c.endswith("**") and len(c) > 4 and "**" not in c[2:-2]:
+            out.append("**" + plain(c[2:-2]) + "**")
+        else:
+            out.append(plain(c))
+    return out
+
+
+# ── Tokenizer ──
+
+def tokenize(lines):
+    """Yield (kind, level, payload) blocks from an iterable of Markdown lines.
+
+    kind is one of: heading, paragraph, bullet, number, quote, code, table, rule.
+    Only one line of lookahead is kept (a pipe row waiting for its separator),
+    so arbitrarily long sources stream through in constant memory per block.
+    """
+    para = []        # logical lines of the open paragraph (hard breaks split)
+    para_break = False
+    quote = []
+    item = None      # open list item: [kind, level, text]
+    table = None     # [headers, rows]
+    header = None    # pipe row waiting for a |---| separator
+    fence = None     # [marker, lang, lines]
+
+    def flush():
+        nonlocal para, para_break, quote, item, table, header
+        blocks = []
+        if header is not None:
+            para.append(plain(header.strip()))
+            header = None
+        para_break = False
+        if para:
+            blocks.append(("paragraph", 0, para))
+            para = []
+        if quote:
+            blocks.append(("quote", 0, "\n".join(quote)))
+            quote = []
+        if item:
+            blocks.append(tuple(item))
+            item = None
+        if table:
+            blocks.append(("table", 0, table))
+            table = None
+        return blocks
+
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+
+        if fence is not None:
+            stripped = line.strip()
+            if stripped.startswith(fence[0]) and not stripped.strip(fence[0][0]):
+                yield ("code", 0, (fence[1], "\n".join(fence[2])))
+                fence = None
+            else:
+                fence[2].append(line)
+            continue
+
+        if header is not None:
+            if TABLE_SEP_RE.match(line) and "-" in line:
+                table = [table_cells(header), []]
+                header = None
+                continue
+            # A lone pipe row is just text
+            para.append(plain(header.strip()))
+            header = None
+            para_break = True
+        if table is not None:
+            if line.lstrip().startswith("|"):
+                table[1].append(table_cells(line))
+                continue
+            yield from flush()
+
+        m = FENCE_RE.match(line)
+        if m:
+            yield from flush()
+            fence = [m.group(1), m.group(2), []]
+            continue
+
+        if not line.strip():
+            yield from flush()
+            continue
+
+        m = HEADING_RE.match(line)
+        if m:
+            yield from flush()
+            yield ("heading", len(m.group(1)), plain(m.group(2)))
+            continue
+
+        if RULE_RE.match(line):
+            yield from flush()
+            yield ("rule", 0, None)
+            continue
+
+        if line.lstrip().startswith(">"):
+            if not quote:
+                yield from flush()
+            quote.append(re.sub(r"^\s*>+\s?", "", line))
+            continue
+
+        if line.lstrip().startswith("|"):
+            yield from flush()
+            header = line
+            continue
+
+        m = BULLET_RE.match(line) or NUMBER_RE.match(line)
+        if m:
+            yield from flush()
+            depth = len(m.group(1).expandtabs(4)) // 2
+            if m.re is BULLET_RE:
+                item = ["bullet", depth, m.group(2)]
+            else:
+                item = ["number", depth, (m.group(2), m.group(3))]
+            continue
+
+        if item is not None and line[:1].isspace():
+            # Lazy continuation line of the open list item
+            if item[0] == "bullet":
+                item[2] += " " + line.strip()
+            else:
+                item[2] = (item[2][0], item[2][1] + " " + line.strip())
+            continue
+
+        if quote or item is not None:
+            yield from flush()
+        text = line.strip().rstrip("\\").rstrip()
+        if para and not para_break:
+            para[-1] += " " + text
+        else:
+            para.append(text)
+        para_break = line.endswith("  ") or line.endswith("\\")
+
+    if fence is not None:
+        yield ("code", 0, (fence[1], "\n".join(fence[2])))
+    yield from flush()
+
+
+def split_sections(lines):
+    """Split Markdown lines into chunks at # / ## headings outside code fences.
+
+    Such a heading flushes every open block in tokenize(), so compiling the
+    chunks one after another yields exactly the blocks of the whole file.
+    """
+    chunk = []
+    fence = None
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        if fence is not None:
+            stripped = line.strip()
+            if stripped.startswith(fence) and not stripped.strip(fence[0]):
+                fence = None
+        else:
+            m = FENCE_RE.match(line)
+            if m:
+                fence = m.group(1)
+            else:
+                m = HEADING_RE.match(line)
+                if m and len(m.group(1)) <= 2 and chunk:
+                    yield chunk
+                    chunk = []
+        chunk.append(raw)
+    if chunk:
+        yield chunk
+
+
+def markdown_sources(directory):
+    """The Markdown deliverables in directory (generator previews, *.preview.md,
+    documents read back by docx_to_md.py, *.edited.md, and the .md twins of
+    GENERATED documents excluded)."""
+    return sorted(p for p in glob.glob(os.path.join(directory, "*.md"))
+                  if not p.endswith((".preview.md", ".edited.md"))
+                  and os.path.splitext(os.path.basename(p))[0] not in GENERATED)
+
+
+# ── Compiler ──
+
+def compile_markdown(doc, blocks, on_page=0):
+    """Stream tokenize() blocks into doc. Returns (blocks compiled, document title).
+
+    on_page is the number of blocks already on the current page: a ## heading
+    only starts a new page when it is non-zero.
+    """
+    count = 0
+    title = ""
+    for kind, level, payload in blocks:
+        count += 1
+        if kind == "heading":
+            if level <= 2:
+                if level == 2 and on_page:
+                    doc.add_page_break()
+                    on_page = 0
+                title = title or payload
+                add_heading_styled(doc, payload, 1)
+                add_accent_bar(doc)
+            else:
+                add_heading_styled(doc, payload, 2 if level == 3 else 3)
+        elif kind == "paragraph":
+            for line in payload:
+                label, rest = split_label(line)
+                if label and not rest.strip():
+                    add_body(doc, label, bold=True)
+                else:
+                    add_body(doc, rest, bold_prefix=label)
+        elif kind == "bullet":
+            label, rest = split_label(payload)
+            add_bullet(doc, rest, level=level, bold_prefix=label)
+        elif kind == "number":
+            number, text = payload
+            label, rest = split_label(text)
+            if label:
+                add_body(doc, rest, bold_prefix=f"{number}. {label}")
+            else:
+                add_body(doc, f"{number}. {rest}")
+        elif kind == "quote":
+            add_quote(doc, plain(payload).strip())
+        elif kind == "code":
+            add_code_block(doc, payload[1])
+        elif kind == "table":
+            headers, rows = payload
+            width = len(headers)
+            rows = [(r + [""] * width)[:width] for r in rows]
+            add_styled_table(doc, headers, rows, col_widths="auto")
+            add_spacer(doc, 4)
+        elif kind == "rule":
+            continue
+        on_page += 1
+    return count, title
+
+
+def render_file(src, out_dir, cache_dir=CACHE_DIR, version="", jobs=1, draft=False, optimize=False):
+    """Compile one Markdown file, reusing cached # / ## sections.
+
+    Returns the output path, block count, section report, layout estimate and
+    whether the file was written (False: already identical on disk).
+    """
+    count = 0
+    title = ""
+    sections = []
+    on_page = 0
+    with open(src, encoding="utf-8") as f:
+        # One pass: each chunk is tokenized once, for the title, count and page state and to compile
+        for chunk in split_sections(f):
+            blocks = list(tokenize(chunk))
+            count += len(blocks)
+            title = title or next((payload for kind, level, payload in blocks
+                                   if kind == "heading" and level <= 2), "")
+            # The page-break decision for a leading ## depends on what came before
+            source = f"on_page={on_page}\n" + "".join(chunk)
+            render = functools.partial(compile_markdown, blocks=blocks, on_page=on_page)
+            sections.append((chunk[0].strip(), source, render))
+            if any(kind != "rule" for kind, _, _ in blocks):
+                on_page = 1
+
+    out = os.path.join(out_dir, output_name(os.path.basename(src), draft=draft))
+    report, layout, written = build_document(out, sections, f"SG Consulting  |  {title}", version, cache_dir, jobs,
+                                             draft, optimize)
+    return out, count, report, layout, written
+
+
+def main(argv=None):
+    parser = add_build_arguments(argparse.ArgumentParser(description="Compile Markdown deliverables to DOCX."))
+    parser.add_argument("sources", nargs="*", help="Markdown files (default: every *.md in this folder)")
+    parser.add_argument("--out-dir", default=HERE, help="Directory for the generated .docx files (default: this folder)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Trace per-section memory and write <output>.profile.json next to each file")
+    args = parser.parse_args(argv)
+
+    sources = args.sources or markdown_sources(HERE)
+    owners = {os.path.splitext(output)[0]: script for script, output in GENERATOR_OUTPUTS.items()}
+    for src in sources:
+        owner = owners.get(os.path.splitext(os.path.basename(src))[0])
+        if owner:
+            parser.error(f"{src}: its .docx is built by {owner}.py, not from the Markdown")
+    os.makedirs(args.out_dir, exist_ok=True)
+    cache_dir = None if args.no_cache else args.cache_dir
+    version = helper_version(sys.modules[__name__])
+    if args.profile:
+        tracemalloc.start()
+    total = time.perf_counter()
+    for src in sources:
+        start = time.perf_counter()
+        out, count, report, layout, written = render_file(src, args.out_dir, cache_dir, version, args.jobs or os.cpu_count(),
+                                                          args.draft, args.optimize)
+        seconds = time.perf_counter() - start
+        hits = sum(1 for s in report if s["status"] == "hit")
+        tables = sum(s["tables"] for s in report)
+        print(f"[OK] {'Generated' if written else 'Unchanged'}: {out}  ({pages_note(layout)}{count} blocks, {tables} tables, "
+              f"{hits}/{len(report)} sections cached, {seconds:.2f}s)")
+        if args.profile:
+            write_profile(out + ".profile.json", out, report, zip_parts(out), seconds, layout)
+    print(f"     {len(sources)} documents in {time.perf_counter() - total:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
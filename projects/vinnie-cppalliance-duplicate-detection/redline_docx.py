@@ -0,0 +1,43 @@
+"""
+Redline two revisions of a Word deliverable.
+Run: python redline_docx.py OLD.docx NEW.docx [-o OUT.docx] [--author NAME] [--date ISO]
+Output: <NEW>.redline.docx, the new revision with every change from the old one tracked
+
+Blocks are aligned by content hash and only the changed ones are diffed
+word by word (see docx_render/redline.py); the styling is the new
+revision's, so a version 1.1 render redlined against the 1.0 package the
+client has is what they review with Accept / Reject:
+
+    python redline_docx.py v1.0/CONSULTANT-PAPER-AGENT-ARCHITECTURE.docx CONSULTANT-PAPER-AGENT-ARCHITECTURE.docx
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from docx_render.redline import DEFAULT_AUTHOR, date_stamp, redline_file, redline_note
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Redline two revisions of a Word deliverable.")
+    parser.add_argument("old", help="The revision the reader has (.docx)")
+    parser.add_argument("new", help="The new revision (.docx)")
+    parser.add_argument("-o", "--out", help="Output file (default: <new>.redline.docx)")
+    parser.add_argument("--author", default=DEFAULT_AUTHOR, help=f"Author of the changes (default: {DEFAULT_AUTHOR})")
+    parser.add_argument("--date", type=date_stamp,
+                        help="Date of the changes, ISO 8601 (default: none, for a reproducible file)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        out, written, stats = redline_file(args.old, args.new, args.out, args.author, args.date)
+    except (OSError, ValueError) as e:  # missing file, not a .docx package
+        sys.exit(f"[ERROR] {args.old} -> {args.new}: {e}")
+    print(f"[OK] {'Generated' if written else 'Unchanged'}: {out}  "
+          f"({redline_note(stats)}, {(time.perf_counter() - start) * 1000:.0f} ms)")
+    print(f"     {os.path.basename(args.old)} -> {os.path.basename(args.new)}, changes by {args.author}")
+
+
+if __name__ == "__main__":
+    main()
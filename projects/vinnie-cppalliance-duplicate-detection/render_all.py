@@ -0,0 +1,154 @@
+"""
+Render every deliverable in one warm interpreter.
+Run: python render_all.py [--only NAME ...] [--out-dir DIR] [--no-cache] [--jobs N] [--watch]
+Output: the generator documents plus <name>.docx for every *.md in this folder
+
+python-docx is imported once for the whole batch instead of once per script,
+and every document opens its compiled theme (page setup, styles, footer)
+from .docx-cache instead of redoing that setup (see docx_render.doc_styles).
+A Markdown source whose .docx a generator already
+produces (the paper, the Q&A) is left to that generator.
+
+--watch keeps the process resident after the first build. It watches the
+Markdown sources, the generators and docx_render (see docx_render.watch).
+On a change it re-imports the changed code and rebuilds only the affected
+documents, usually with every untouched section still cached. Each output
+is replaced atomically (docx_render.build.save_atomic).
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import time
+import traceback
+
+START = time.perf_counter()
+
+import docx_render
+import generate_docx
+import generate_qa_docx
+import md_to_docx
+from docx_render.build import add_build_arguments
+from docx_render.watch import Watcher
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_DIR = os.path.dirname(os.path.abspath(docx_render.__file__))
+GENERATORS = (generate_docx, generate_qa_docx)
+# docx_render modules in import order, for re-importing after an edit
+PACKAGE_MODULES = ("cli", "oxml_fragments", "doc_styles", "reproducible", "ir", "table_source", "layout_estimate",
+                   "column_widths", "oxml_table", "helpers", "ir_docx", "ir_html", "ir_markdown", "docx_reader",
+                   "build_report",
+                   "parallel_render", "section_cache", "streaming_docx", "optimize", "build", "merge",
+                   "patch", "redline", "service")
+
+
+def deliverables():
+    """[(name, render(out_dir, cache_dir, jobs, draft, optimize) -> (out, report, layout, written))] in build order."""
+    items = [(os.path.splitext(g.OUTPUT)[0], g.render) for g in GENERATORS]
+    taken = {name for name, _ in items}
+    version = None
+    for src in md_to_docx.markdown_sources(HERE):
+        name = os.path.splitext(os.path.basename(src))[0]
+        if name in taken:
+            continue
+        version = version or docx_render.helper_version(md_to_docx)
+
+        def render(out_dir, cache_dir, jobs, draft=False, optimize=False, src=src, version=version):
+            out, _, report, layout, written = md_to_docx.render_file(src, out_dir, cache_dir, version, jobs, draft,
+                                                                     optimize)
+            return out, report, layout, written
+        items.append((name, render))
+    return items
+
+
+def reload_changed(changed):
+    """Re-import the rendering code among the changed paths.
+
+    Returns the deliverables to rebuild, or None for all of them.
+    """
+    stems = {os.path.splitext(os.path.basename(p))[0] for p in changed}
+    if any(os.path.dirname(p) == PACKAGE_DIR for p in changed):
+        for name in PACKAGE_MODULES:
+            module = sys.modules.get(f"docx_render.{name}")
+            if module is not None:  # one not imported yet (lazy exports) loads fresh when first used
+                importlib.reload(module)
+        importlib.reload(docx_render)
+        for module in (md_to_docx,) + GENERATORS:
+            importlib.reload(module)
+        return None
+
+    markdown = {name for name, _ in deliverables()} - {os.path.splitext(g.OUTPUT)[0] for g in GENERATORS}
+    names = {os.path.splitext(os.path.basename(p))[0] for p in changed if p.endswith(".md")} & markdown
+    if "md_to_docx" in stems:
+        importlib.reload(md_to_docx)
+        names |= markdown
+    for g in GENERATORS:
+        if g.__name__ in stems:
+            importlib.reload(g)
+            names.add(os.path.splitext(g.OUTPUT)[0])
+    return names
+
+
+def watch(args, cache_dir, jobs):
+    """Rebuild the affected deliverables whenever a source or module changes."""
+    watcher = Watcher([HERE, PACKAGE_DIR], poll=args.poll)
+    print(f"     Watching {HERE} ({watcher.mode}); Ctrl+C to stop")
+    try:
+        while True:
+            changed = watcher.changes()
+            start = time.perf_counter()
+            try:
+                names = reload_changed(changed)
+                for name, render in deliverables():
+                    if (names is None or name in names) and (not args.only or name in args.only):
+                        out, report, layout, written = render(args.out_dir, cache_dir, jobs, args.draft, optimize=args.optimize)
+                        hits = sum(1 for s in report if s["status"] == "hit")
+                        print(f"[OK] {'Rebuilt' if written else 'Unchanged'}: {out}  ({docx_render.pages_note(layout)}{hits}/{len(report)} "
+                              f"sections cached, {(time.perf_counter() - start) * 1000:.0f} ms after the change)")
+            except Exception:
+                # A half-finished edit must not take the daemon down
+                traceback.print_exc()
+    except KeyboardInterrupt:
+        print()
+    finally:
+        watcher.close()
+
+
+def main(argv=None):
+    parser = add_build_arguments(argparse.ArgumentParser(description="Render every deliverable in one process."))
+    parser.add_argument("--only", action="append", metavar="NAME",
+                        help="Render only this deliverable (output name without .docx; repeatable)")
+    parser.add_argument("--out-dir", default=".", help="Directory for the generated .docx files")
+    parser.add_argument("--watch", action="store_true",
+                        help="Stay resident and rebuild the affected documents on every change")
+    parser.add_argument("--poll", action="store_true", help="With --watch: poll mtimes instead of inotify")
+    args = parser.parse_args(argv)
+
+    items = deliverables()
+    if args.only:
+        unknown = set(args.only) - {name for name, _ in items}
+        if unknown:
+            parser.error(f"unknown deliverable(s): {', '.join(sorted(unknown))}")
+        items = [(name, render) for name, render in items if name in args.only]
+    os.makedirs(args.out_dir, exist_ok=True)
+    cache_dir = None if args.no_cache else args.cache_dir
+    jobs = args.jobs or os.cpu_count()
+
+    docx_render.new_document()  # python-docx and the template, ahead of the timed builds
+    print(f"     Start-up (imports, template, styles): {time.perf_counter() - START:.2f}s")
+    total = time.perf_counter()
+    for name, render in items:
+        start = time.perf_counter()
+        out, report, layout, written = render(args.out_dir, cache_dir, jobs, args.draft, optimize=args.optimize)
+        hits = sum(1 for s in report if s["status"] == "hit")
+        print(f"[OK] {'Generated' if written else 'Unchanged'}: {out}  ({docx_render.pages_note(layout)}{hits}/{len(report)} sections cached, "
+              f"{time.perf_counter() - start:.2f}s)")
+    print(f"     {len(items)} documents in {time.perf_counter() - total:.2f}s")
+    if args.watch:
+        watch(args, cache_dir, jobs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
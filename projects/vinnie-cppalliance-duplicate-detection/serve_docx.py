@@ -0,0 +1,60 @@
+"""
+Serve the Word deliverables from a local rendering service.
+Run: python serve_docx.py [--host HOST] [--port PORT] [--jobs N] [--cache-mb MB]
+Output: none on disk; GET/POST http://HOST:PORT/documents/<id>.docx returns the package
+
+Each document is rendered once at start-up and kept as a merge template in
+a pool of warm worker processes; a request only fills in its cover/footer
+fields, and repeated requests come from an in-memory LRU cache (see
+docx_render/service.py):
+
+    curl -o proposal.docx "http://127.0.0.1:8765/documents/paper.docx?prepared_for=ACME"
+    curl -o qa.docx -d '{"version": "1.1"}' http://127.0.0.1:8765/documents/qa.docx
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+import generate_docx
+import generate_qa_docx
+from docx_render.section_cache import CACHE_DIR
+from docx_render.service import CACHE_BYTES, build_templates, serve
+
+DOCUMENTS = {"paper": generate_docx, "qa": generate_qa_docx}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the Word deliverables from a local rendering service.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765, 0: any free port)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: one per CPU)")
+    parser.add_argument("--cache-mb", type=float, default=CACHE_BYTES / 2**20,
+                        help=f"Size of the rendered-package cache in MB (default: {CACHE_BYTES // 2**20}, 0: off)")
+    parser.add_argument("--no-cache", action="store_true", help="Render the templates without the section cache")
+    args = parser.parse_args(argv)
+
+    try:
+        templates = build_templates(DOCUMENTS, None if args.no_cache else CACHE_DIR)
+    except (OSError, ValueError) as e:
+        sys.exit(f"[ERROR] templates: {e}")
+
+    def ready(address, seconds):
+        host, port = address
+        print(f"[OK] Serving: http://{host}:{port}/documents/{{{','.join(DOCUMENTS)}}}.docx  "
+              f"({args.jobs} workers warm in {seconds * 1000:.0f} ms, cache {args.cache_mb:g} MB)")
+        for doc_id, (template, output) in templates.items():
+            print(f"     {doc_id}: {output}  fields: {', '.join(template.fields)}")
+
+    try:
+        asyncio.run(serve(templates, args.host, args.port, args.jobs, int(args.cache_mb * 2**20), ready))
+    except OSError as e:  # port in use
+        sys.exit(f"[ERROR] {args.host}:{args.port}: {e}")
+    except KeyboardInterrupt:
+        print("     stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import itertools
+import os
+import sys
+
+import pytest
+
+# The generators and entry scripts are flat modules in the project folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    """An empty section cache of the test's own."""
+    return str(tmp_path / "cache")
+
+
+@pytest.fixture
+def build(tmp_path):
+    """build(generator, **render arguments) -> (package bytes, section report),
+    each call into a directory of its own and without the section cache
+    unless cache_dir is given."""
+    runs = itertools.count()
+
+    def build(generator, **kwargs):
+        out_dir = tmp_path / f"build{next(runs)}"
+        out_dir.mkdir()
+        kwargs.setdefault("cache_dir", None)
+        out, report, _, _ = generator.render(str(out_dir), **kwargs)
+        with open(out, "rb") as f:
+            return f.read(), report
+
+    return build
@@ -0,0 +1,25 @@
+import zipfile
+
+import docx
+
+import generate_docx
+import generate_qa_docx
+from docx_render.cli import output_name
+
+
+def test_output_names():
+    assert output_name("PAPER.docx") == "PAPER.docx"
+    assert output_name("PAPER.docx", ["build_costs"]) == "PAPER.partial.docx"
+    assert output_name("PAPER.docx", draft=True) == "PAPER.draft.docx"
+    assert output_name("PAPER.docx", ["build_costs"], "html") == "PAPER.partial.preview.html"
+    assert output_name("NOTES.md", fmt="md") == "NOTES.preview.md"
+
+
+def test_draft_build_leaves_the_deliverable(tmp_path):
+    for generator in (generate_docx, generate_qa_docx):
+        out = generator.render(str(tmp_path), None, draft=True)[0]
+        assert out.endswith(".draft.docx")
+        with zipfile.ZipFile(out) as z:
+            assert {i.compress_type for i in z.infolist()} == {zipfile.ZIP_STORED}
+        assert docx.Document(out).paragraphs
+    assert not (tmp_path / generate_docx.OUTPUT).exists()
@@ -0,0 +1,43 @@
+import pytest
+
+import generate_docx
+import generate_qa_docx
+from docx_render.cli import SECTION_PREFIX, outline, parse_generator_args
+
+
+@pytest.mark.parametrize("generator", [generate_docx, generate_qa_docx])
+def test_outline_matches_the_sections(generator):
+    _, sections, fields = outline(generator.__file__)
+    assert [SECTION_PREFIX + name for name, _ in sections] == [fn.__name__ for fn in generator.SECTIONS]
+    assert all(summary for _, summary in sections)
+    assert fields == list(generator.FIELDS)
+
+
+def test_list_prints_the_outline(capsys):
+    with pytest.raises(SystemExit) as stop:
+        parse_generator_args(generate_docx.__file__, ["--list"])
+    assert stop.value.code == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split()[0] == "cover_page"
+    assert "appendix_glossary" in {line.split()[0] for line in lines if line}
+    assert lines[-1].startswith("Merge fields: prepared_for")
+
+
+def test_only_takes_names_in_outline_order():
+    args = parse_generator_args(generate_docx.__file__, ["--only", "risks, build_costs", "--only", "cover_page"])
+    assert args.only == ["build_cover_page", "build_costs", "build_risks"]
+    assert parse_generator_args(generate_docx.__file__, []).only is None
+
+
+def test_unknown_section_is_an_error(capsys):
+    with pytest.raises(SystemExit) as stop:
+        parse_generator_args(generate_docx.__file__, ["--only", "costs,nonesuch"])
+    assert stop.value.code == 2
+    assert "unknown section(s): nonesuch" in capsys.readouterr().err
+
+
+def test_only_builds_a_partial_document(tmp_path):
+    out, report, _, _ = generate_docx.render(str(tmp_path), None, only=["build_costs", "build_risks"])
+    assert out.endswith(".partial.docx")
+    assert [s["name"] for s in report] == ["build_costs", "build_risks"]
+    assert not (tmp_path / generate_docx.OUTPUT).exists()
@@ -0,0 +1,48 @@
+from docx.shared import Cm
+
+from docx_render.column_widths import MAX_WIDTH_SHARE, MIN_WIDTH_CM, SAMPLE_ROWS, measured_widths
+
+USABLE = Cm(16)
+
+
+def _widths(headers, rows, col_widths="auto"):
+    rows, emu = measured_widths(headers, rows, col_widths, USABLE)
+    return list(rows), emu
+
+
+def test_widths_fill_the_usable_width():
+    rows, emu = _widths(["Term", "Definition"], [["MCP", "Model Context Protocol for tools and data"]])
+    assert abs(sum(emu) - USABLE) <= len(emu)
+    assert emu[1] > emu[0]
+
+
+def test_long_cell_is_capped():
+    rows, emu = _widths(["#", "Text", "Note"], [["1", "word " * 200, "short note"]])
+    assert emu[1] <= USABLE * MAX_WIDTH_SHARE + 1
+    assert emu[0] >= Cm(MIN_WIDTH_CM) - 1 and emu[2] > emu[0]
+
+
+def test_empty_column_gets_the_minimum():
+    rows, emu = _widths(["Term", "", "Definition"], [["Fidelity Gate", "", "Compares the manifest with the receipt"],
+                                                     ["Manager Pattern", "", "Delegates to specialists"]])
+    assert abs(emu[1] - Cm(MIN_WIDTH_CM)) <= 1
+    assert abs(sum(emu) - USABLE) <= len(emu)
+
+
+def test_fixed_columns_keep_their_width():
+    rows, emu = _widths(["#", "Text", "Note"], [["1", "some text", "a note"]], [2, None, (None, 3)])
+    assert emu[0] == Cm(2) and abs(emu[2] - Cm(3)) <= 1
+    assert abs(emu[1] - USABLE * MAX_WIDTH_SHARE) <= 1  # the rest of the 11 cm would pass the cap
+
+
+def test_rows_past_the_sample_are_kept_but_not_measured():
+    def source():
+        for i in range(SAMPLE_ROWS):
+            yield [str(i), "short"]
+        yield ["x", "a much longer cell than any in the sample " * 5]
+        for i in range(1000):
+            yield [str(i), "short"]
+
+    rows, emu = _widths(["#", "Text"], source())
+    assert len(rows) == SAMPLE_ROWS + 1001 and rows[SAMPLE_ROWS][0] == "x"
+    assert emu == _widths(["#", "Text"], [[str(i), "short"] for i in range(SAMPLE_ROWS)])[1]
@@ -0,0 +1,26 @@
+from docx.shared import RGBColor
+
+from docx_render import GREEN_ACCENT, Tree, add_body, new_document
+from docx_render.ir_docx import render_build
+from docx_render.ir_html import to_html
+
+
+def test_palette_color_becomes_token():
+    tree = Tree()
+    add_body(tree, "x", color=GREEN_ACCENT)
+    assert tree.nodes[-1]["color"] == "GREEN_ACCENT"
+
+
+def test_off_palette_color_keeps_hex():
+    tree = Tree()
+    add_body(tree, "off palette", color=RGBColor(1, 2, 3))
+    assert tree.nodes[-1]["color"] == "010203"
+    assert 'style="color: #010203"' in to_html(tree.nodes)
+
+    def build(doc):
+        add_body(doc, "off palette", color=RGBColor(1, 2, 3))
+
+    doc = new_document(cache_dir=None)
+    render_build(build, doc)
+    run = doc.paragraphs[-1].runs[-1]
+    assert run.text == "off palette" and run.font.color.rgb == RGBColor(1, 2, 3)
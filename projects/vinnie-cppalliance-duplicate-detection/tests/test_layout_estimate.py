@@ -0,0 +1,65 @@
+from docx.oxml.ns import qn
+from docx.shared import Pt
+
+from docx_render import (add_accent_bar, add_body, add_bullet, add_code_block, add_heading_styled, add_spacer,
+                         add_styled_table, new_document)
+from docx_render.layout_estimate import MAX_KEPT_LIST, apply_keep_hints
+
+
+def _kept(p, tag):
+    pPr = p._p.pPr
+    return pPr is not None and pPr.find(qn(f"w:{tag}")) is not None
+
+
+def _paragraph(doc, text):
+    return next(p for p in doc.paragraphs if p.text == text)
+
+
+def test_heading_keeps_a_short_list():
+    doc = new_document(cache_dir=None)
+    add_heading_styled(doc, "Short", 2)
+    for i in range(3):
+        add_bullet(doc, f"short {i}")
+    add_heading_styled(doc, "Long", 2)
+    for i in range(MAX_KEPT_LIST + 1):
+        add_bullet(doc, f"long {i}")
+    apply_keep_hints(doc)
+    assert [_kept(_paragraph(doc, f"short {i}"), "keepNext") for i in range(3)] == [True, True, False]
+    assert not any(_kept(_paragraph(doc, f"long {i}"), "keepNext") for i in range(MAX_KEPT_LIST + 1))
+
+
+def test_lead_in_stays_with_its_table_and_header_row():
+    doc = new_document(cache_dir=None)
+    add_body(doc, "Costs per month")
+    add_styled_table(doc, ["Item", "Cost"], [["Runner", "$0"], ["API", "$40"]])
+    add_body(doc, "The following applies:")
+    add_body(doc, "Plain text")
+    add_body(doc, "Closing remark")
+    apply_keep_hints(doc)
+    assert _kept(_paragraph(doc, "Costs per month"), "keepNext")
+    assert _kept(_paragraph(doc, "The following applies:"), "keepNext")
+    assert not _kept(_paragraph(doc, "Plain text"), "keepNext")
+    table = doc.tables[0]
+    assert all(_kept(p, "keepNext") for p in table.rows[0].cells[0].paragraphs)
+    assert not any(_kept(p, "keepNext") for p in table.rows[1].cells[0].paragraphs)
+
+
+def test_code_is_not_split_and_hints_are_idempotent():
+    doc = new_document(cache_dir=None)
+    add_code_block(doc, "line 1\nline 2")
+    add_body(doc, "After")
+    assert apply_keep_hints(doc) > 0
+    assert all(_kept(p, "keepLines") for p in doc.paragraphs if p.style.style_id == "Code")
+    assert apply_keep_hints(doc) == 0
+
+
+
+def test_helper_spacing_reaches_the_xml():
+    doc = new_document(cache_dir=None)
+    body = add_body(doc, "Text")
+    spacer = add_spacer(doc, 12)
+    bar = add_accent_bar(doc)
+    assert body.paragraph_format.space_after is None  # from the Body style
+    assert (body.style.paragraph_format.space_before, body.style.paragraph_format.space_after) == (Pt(2), Pt(4))
+    assert spacer._p.pPr.find(qn("w:spacing")).get(qn("w:after")) == "240"
+    assert bar.paragraph_format.space_after == Pt(6)
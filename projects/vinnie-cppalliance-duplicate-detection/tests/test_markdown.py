@@ -0,0 +1,39 @@
+import os
+import re
+
+import pytest
+
+import generate_docx
+import generate_qa_docx
+import md_to_docx
+from docx_render import record
+from docx_render.cli import GENERATOR_OUTPUTS
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Top-level chapters, whatever level they sit at ("5. Database-First ..." is a Heading 2)
+CHAPTER_RE = re.compile(r"^(Executive Summary|\d+\. |Appendix|Q\d+)")
+
+
+def _chapters(headings):
+    """Chapter keys (text before any ':') of heading texts, in order."""
+    return [h.split(":")[0].strip() for h in headings if CHAPTER_RE.match(h)]
+
+
+@pytest.mark.parametrize("generator", [generate_docx, generate_qa_docx])
+def test_generator_has_every_markdown_chapter(generator):
+    with open(os.path.join(HERE, os.path.splitext(generator.OUTPUT)[0] + ".md"), encoding="utf-8") as f:
+        markdown = [text for kind, _, text in md_to_docx.tokenize(f.read().splitlines()) if kind == "heading"]
+    built = [n["text"] for n in record(generator.SECTIONS).nodes if n["type"] == "heading"]
+    assert _chapters(built) == _chapters(markdown)
+
+
+def test_markdown_sources_skip_generated_twins():
+    stems = {os.path.splitext(os.path.basename(p))[0] for p in md_to_docx.markdown_sources(HERE)}
+    assert not stems & {os.path.splitext(o)[0] for o in GENERATOR_OUTPUTS.values()}
+    assert GENERATOR_OUTPUTS == {"generate_docx": generate_docx.OUTPUT, "generate_qa_docx": generate_qa_docx.OUTPUT}
+
+
+def test_markdown_twin_is_refused(tmp_path):
+    with pytest.raises(SystemExit):
+        md_to_docx.main([os.path.join(HERE, generate_docx.OUTPUT[:-5] + ".md"), "--out-dir", str(tmp_path)])
+    assert not list(tmp_path.iterdir())
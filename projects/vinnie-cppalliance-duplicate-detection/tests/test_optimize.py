@@ -0,0 +1,71 @@
+import io
+import zipfile
+
+import pytest
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+from lxml import etree
+
+import generate_docx
+from docx_render import new_document
+from docx_render.optimize import optimize_package, render_fingerprint
+from docx_render.patch import patch_document
+
+
+def _trees(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as z:
+        return {name: etree.fromstring(z.read(name)) for name in z.namelist() if name.endswith((".xml", ".rels"))}
+
+
+def _package(doc):
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def test_generated_package_keeps_its_rendering(tmp_path):
+    with open(generate_docx.render(str(tmp_path), None)[0], "rb") as f:
+        data = f.read()
+    optimized, stats = optimize_package(data)
+    assert render_fingerprint(_trees(optimized)) == render_fingerprint(_trees(data))
+    assert len(optimized) < len(data) and stats["bytes_after"] == len(optimized)
+    assert optimize_package(optimized)[0] == optimized
+
+
+def test_hoisted_borders_land_in_schema_order():
+    doc = new_document(cache_dir=None)
+    table = doc.add_table(rows=2, cols=2)
+    border = '<w:{0} w:val="single" w:sz="4" w:space="0" w:color="D0D0D0"/>'
+    for cell in table._tbl.iter(qn("w:tc")):
+        cell.get_or_add_tcPr().append(parse_xml(
+            f'<w:tcBorders {nsdecls("w")}>' + "".join(border.format(side) for side in ("top", "left", "bottom", "right"))
+            + "</w:tcBorders>"))
+    optimized, stats = optimize_package(_package(doc))
+    assert stats["tables_hoisted"] == 1 and stats["cell_borders_dropped"] == 4
+    tblPr = _trees(optimized)["word/document.xml"].find(f".//{qn('w:tblPr')}")
+    order = [etree.QName(child).localname for child in tblPr]
+    assert order.index("tblBorders") == order.index("tblW") + 1
+    assert order.index("tblBorders") < order.index("tblLook")
+
+
+def test_merged_runs_keep_their_spaces():
+    doc = new_document(cache_dir=None)
+    p = doc.add_paragraph()
+    for text in ("Hello", " ", "world  "):
+        p.add_run(text)
+    optimized, stats = optimize_package(_package(doc))
+    assert stats["runs_merged"] == 2
+    t = [el for el in _trees(optimized)["word/document.xml"].iter(qn("w:t"))]
+    assert [el.text for el in t] == ["Hello world  "]
+    assert t[0].get("{http://www.w3.org/XML/1998/namespace}space") == "preserve"
+
+
+def test_patch_needs_a_full_build_after_optimize(tmp_path):
+    out = generate_docx.render(str(tmp_path), None, optimize=True)[0]
+    names = [fn.__name__ for fn in generate_docx.SECTIONS]
+
+    def caption(doc):  # a style the optimizer pruned: no section of the paper uses it
+        doc.add_paragraph("Figure 1", style="Caption")
+
+    with pytest.raises(ValueError, match="does not define; build it in full"):
+        patch_document(out, [("build_exec_summary", "caption", caption)], names, cache_dir=None)
@@ -0,0 +1,49 @@
+import io
+import os
+import zipfile
+
+import pytest
+from docx.oxml.ns import qn
+from lxml import etree
+
+import generate_docx
+from docx_render.merge import replace_parts
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_patched_package_equals_full_render(tmp_path):
+    cache = str(tmp_path / "cache")
+    patched, full = tmp_path / "patched", tmp_path / "full"
+    patched.mkdir()
+    full.mkdir()
+    generate_docx.render(str(patched), cache, fields={"prepared_for": "First Client"})
+    out, report, written, stats = generate_docx.patch(str(patched), cache, ["build_cover_page"],
+                                                      fields={"prepared_for": "Second Client"})
+    reference = generate_docx.render(str(full), cache, fields={"prepared_for": "Second Client"})[0]
+    assert written and stats["sections"] == ["build_cover_page"]
+    assert [r["name"] for r in report] == ["build_cover_page"]
+    assert _read(out) == _read(reference)
+
+
+def test_patch_without_changes_leaves_file(tmp_path):
+    cache = str(tmp_path / "cache")
+    out = generate_docx.render(str(tmp_path), cache)[0]
+    before = _read(out)
+    assert not generate_docx.patch(str(tmp_path), cache, ["build_costs"])[2]
+    assert _read(out) == before
+
+
+def test_patch_needs_section_bookmarks(tmp_path, build):
+    data, _ = build(generate_docx)
+    with zipfile.ZipFile(io.BytesIO(data)) as z:
+        document = etree.fromstring(z.read("word/document.xml"))
+    for mark in list(document.iter(qn("w:bookmarkStart"), qn("w:bookmarkEnd"))):
+        mark.getparent().remove(mark)
+    with open(os.path.join(tmp_path, generate_docx.OUTPUT), "wb") as f:
+        f.write(replace_parts(data, {"word/document.xml": etree.tostring(document)}))
+    with pytest.raises(ValueError, match="no bookmark"):
+        generate_docx.patch(str(tmp_path), None, ["build_cover_page"])
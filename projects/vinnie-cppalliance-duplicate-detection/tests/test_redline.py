@@ -0,0 +1,78 @@
+import io
+import random
+import zipfile
+
+import pytest
+
+import generate_docx
+from docx_render.docx_reader import read_nodes
+from docx_render.redline import DOCUMENT_PART, diff_opcodes, redline_file, redline_package
+
+
+def _apply(a, b, opcodes):
+    out = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == "equal":
+            assert a[i1:i2] == b[j1:j2]
+            out += a[i1:i2]
+        else:
+            out += b[j1:j2]
+    return out
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_diff_opcodes_turn_a_into_b(seed):
+    rng = random.Random(seed)
+    a = [rng.choice("abcde") for _ in range(rng.randrange(30))]
+    b = [rng.choice("abcde") for _ in range(rng.randrange(30))]
+    opcodes = diff_opcodes(a, b)
+    assert _apply(a, b, opcodes) == b
+    assert {tag for tag, *_ in opcodes} <= {"equal", "delete", "insert", "replace"}
+
+
+def test_diff_opcodes_past_max_edits_replace_all():
+    assert diff_opcodes(list("abc"), list("xyz"), max_edits=1) == [("replace", 0, 3, 0, 3)]
+    assert diff_opcodes(list("abc"), list("abc")) == [("equal", 0, 3, 0, 3)]
+
+
+@pytest.fixture(scope="module")
+def revisions(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("revisions")
+    paths = []
+    for name, client in (("old", "First Client"), ("new", "Second Client")):
+        (tmp / name).mkdir()
+        paths.append(generate_docx.render(str(tmp / name), None, fields={"prepared_for": client})[0])
+    return paths
+
+
+def _texts(path, changes):
+    return [node.get("value") or node.get("text") for node in read_nodes(path, changes)]
+
+
+def test_redline_tracks_changes(revisions, tmp_path):
+    old, new = revisions
+    out, written, stats = redline_file(old, new, str(tmp_path / "out.redline.docx"), "Reviewer")
+    with zipfile.ZipFile(out) as z:
+        xml = z.read(DOCUMENT_PART).decode("utf-8")
+    assert written and stats["edited"] and stats["words_inserted"] and stats["words_deleted"]
+    assert "<w:ins " in xml and "<w:del " in xml and 'w:author="Reviewer"' in xml
+    # Accepting every change gives the new revision back, rejecting them the old one
+    assert _texts(new, "accept") != _texts(old, "accept")
+    assert _texts(out, "accept") == _texts(new, "accept")
+    assert _texts(out, "reject") == _texts(old, "accept")
+
+
+def test_redline_against_itself_is_unchanged(revisions):
+    with open(revisions[1], "rb") as f:
+        data = f.read()
+    redlined, stats = redline_package(data, data)
+    assert redlined == data
+    assert not (stats["inserted"] or stats["deleted"] or stats["edited"])
+
+
+def test_redline_rejects_non_docx():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as z:
+        z.writestr("readme.txt", "not a document")
+    with pytest.raises(ValueError, match="not a Word document"):
+        redline_package(buffer.getvalue(), b"not a zip")
@@ -0,0 +1,24 @@
+import pytest
+
+import generate_docx
+import generate_qa_docx
+
+
+@pytest.mark.parametrize("generator", [generate_docx, generate_qa_docx])
+def test_serial_parallel_and_cached_builds_are_identical(generator, build, cache_dir):
+    serial, report = build(generator)
+    assert {s["status"] for s in report} == {"off"}
+    assert build(generator, jobs=2)[0] == serial
+
+    cold, report = build(generator, cache_dir=cache_dir, jobs=2)
+    assert {s["status"] for s in report} == {"miss"}
+    warm, report = build(generator, cache_dir=cache_dir)
+    assert {s["status"] for s in report} == {"hit"}
+    assert cold == warm == serial
+
+
+def test_fields_change_only_their_sections(build, cache_dir):
+    build(generate_docx, cache_dir=cache_dir)
+    _, report = build(generate_docx, cache_dir=cache_dir, fields={"prepared_for": "ACME"})
+    missed = [s["name"] for s in report if s["status"] == "miss"]
+    assert missed and len(missed) < len(report)
@@ -0,0 +1,84 @@
+import os
+
+from docx.oxml.ns import qn
+from lxml import etree
+
+from docx_render import add_body, add_styled_table, new_document
+from docx_render import section_cache
+from docx_render.section_cache import prune_cache, render_sections, section_key
+
+
+def _sections(text="Body text"):
+    def intro(doc):
+        add_body(doc, text)
+
+    def table(doc):
+        add_styled_table(doc, ["Term", "Definition"], [["MCP", "Model Context Protocol"]])
+
+    return [("intro", text, intro), ("table", "table", table)]
+
+
+def _canonical(el):
+    return etree.tostring(el, method="c14n", exclusive=True)
+
+
+def _build(sections, cache_dir):
+    doc = new_document(cache_dir=None)
+    report = render_sections(doc, sections, cache_dir=cache_dir, version="test")
+    return etree.tostring(doc.element.body), report
+
+
+def test_second_build_hits_with_the_same_body(cache_dir):
+    first, report = _build(_sections(), cache_dir)
+    assert [r["status"] for r in report] == ["miss", "miss"]
+    second, report = _build(_sections(), cache_dir)
+    assert [r["status"] for r in report] == ["hit", "hit"]
+    assert second == first
+
+
+def test_changed_section_misses_alone(cache_dir):
+    _build(_sections(), cache_dir)
+    body, report = _build(_sections("Other text"), cache_dir)
+    assert [r["status"] for r in report] == ["miss", "hit"]
+    assert b"Other text" in body
+
+
+def test_stored_fragment_round_trips(cache_dir):
+    sections = _sections()
+    body = etree.fromstring(_build(sections, cache_dir)[0])
+    with open(os.path.join(cache_dir, section_key("table", "table", "test") + ".xml"), "rb") as f:
+        stored = etree.fromstring(f.read())
+    assert [el.tag for el in stored] == [qn("w:tbl")]
+    assert _canonical(stored[0]) == _canonical(body.find(qn("w:tbl")))
+
+
+def test_pruned_fragment_renders_again(cache_dir):
+    first, _ = _build(_sections(), cache_dir)
+    for name in os.listdir(cache_dir):
+        os.remove(os.path.join(cache_dir, name))
+    body, report = _build(_sections(), cache_dir)
+    assert [r["status"] for r in report] == ["miss", "miss"]
+    assert body == first
+
+
+def test_fragment_pruned_after_read_is_still_a_hit(cache_dir, monkeypatch):
+    first, _ = _build(_sections(), cache_dir)
+
+    def pruned(path, *args):  # another build deletes the file between read and touch
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(section_cache.os, "utime", pruned)
+    body, report = _build(_sections(), cache_dir)
+    assert [r["status"] for r in report] == ["hit", "hit"]
+    assert body == first
+
+
+def test_prune_drops_least_recently_used(tmp_path):
+    for age, name in enumerate(["new.xml", "kept.xml", "old.xml", "write.xml.1.tmp"]):
+        path = tmp_path / name
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (1000 - age, 1000 - age))
+    deleted = prune_cache(str(tmp_path), max_bytes=250, keep={str(tmp_path / "kept.xml")})
+    assert deleted == 1
+    assert sorted(os.listdir(tmp_path)) == ["kept.xml", "new.xml", "write.xml.1.tmp"]
+    assert prune_cache(str(tmp_path), max_bytes=250) == 0
@@ -0,0 +1,125 @@
+import asyncio
+import re
+
+import pytest
+
+import generate_docx
+import generate_qa_docx
+from docx_render.service import PackageCache, RenderService, RequestError, build_templates, normalize_fields
+
+
+@pytest.fixture(scope="module")
+def templates(tmp_path_factory):
+    return build_templates({"paper": generate_docx, "qa": generate_qa_docx},
+                           str(tmp_path_factory.mktemp("cache")))
+
+
+def _serve(templates, client):
+    """Run client(service, host, port) against a started one-worker service."""
+    async def run():
+        service = RenderService(templates, jobs=1)
+        host, port = await service.start()
+        try:
+            return await client(service, host, port)
+        finally:
+            await service.close()
+    return asyncio.run(run())
+
+
+async def _request(host, port, raw):
+    """(status, {lower-case header: value}, body) of one raw request on a new connection."""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(raw)
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+    headers = dict((k.lower(), v) for k, v in re.findall(r"(?m)^([\w-]+): *(.*?)\r$", head))
+    body = await reader.readexactly(int(headers["content-length"]))
+    writer.close()
+    return int(head.split(" ", 2)[1]), headers, body
+
+
+def _get(path):
+    return f"GET {path} HTTP/1.1\r\nHost: test\r\nConnection: close\r\n\r\n".encode("latin-1")
+
+
+# ── Cache ──
+
+def test_package_cache_evicts_least_recently_used():
+    cache = PackageCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    assert cache.get("a") == b"1234"  # a is now the most recent
+    cache.put("c", b"1234")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234" and cache.get("c") == b"1234"
+    assert cache.stats()["evictions"] == 1 and cache.bytes == 8
+
+
+def test_package_cache_skips_oversized_packages():
+    cache = PackageCache(max_bytes=4)
+    cache.put("a", b"12345")
+    assert cache.get("a") is None and cache.bytes == 0
+
+
+# ── Fields ──
+
+def test_normalize_fields(templates):
+    template = templates["paper"][0]
+    fields = normalize_fields(template, {"prepared_for": "  ACME\nCorp  ", "version": ""})
+    assert fields["prepared_for"] == "ACME Corp"
+    assert fields["version"] == generate_docx.FIELDS["version"]
+    assert fields.keys() == generate_docx.FIELDS.keys()
+
+
+@pytest.mark.parametrize("overrides", [{"bogus": "x"}, {"version": 2}])
+def test_normalize_fields_rejects_bad_fields(templates, overrides):
+    with pytest.raises(RequestError) as e:
+        normalize_fields(templates["paper"][0], overrides)
+    assert e.value.status == 400
+
+
+# ── HTTP ──
+
+def test_rendered_document_equals_render_and_is_cached(templates, tmp_path):
+    async def client(service, host, port):
+        first = await _request(host, port, _get("/documents/paper.docx?prepared_for=ACME%20Corp"))
+        body = b'{"prepared_for": "ACME Corp"}'
+        second = await _request(host, port, b"POST /documents/paper.docx HTTP/1.1\r\nHost: test\r\n"
+                                              b"Content-Length: %d\r\nConnection: close\r\n\r\n%s" % (len(body), body))
+        return first, second, service.renders
+
+    first, second, renders = _serve(templates, client)
+    reference = generate_docx.render(str(tmp_path), None, fields={"prepared_for": "ACME Corp"})[0]
+    with open(reference, "rb") as f:
+        assert first[2] == f.read()
+    assert (first[0], first[1]["x-cache"], second[0], second[1]["x-cache"]) == (200, "miss", 200, "hit")
+    assert second[2] == first[2] and first[1]["etag"] == second[1]["etag"] and renders == 1
+
+
+@pytest.mark.parametrize("raw, status", [
+    (_get("/documents/paper.docx?bogus=1"), 400),
+    (_get("/documents/nope.docx"), 404),
+    (_get("/nowhere"), 404),
+    (b"DELETE /stats HTTP/1.1\r\nConnection: close\r\n\r\n", 405),
+    (b"POST /documents/qa.docx HTTP/1.1\r\nContent-Length: 3\r\nConnection: close\r\n\r\n[1]", 400),
+    (b"NONSENSE\r\n\r\n", 400),
+    (b"GET /stats HTTP/1.1\r\nContent-Length: -5\r\n\r\n", 400),
+])
+def test_error_statuses(templates, raw, status):
+    async def client(service, host, port):
+        return await _request(host, port, raw)
+
+    got, headers, body = _serve(templates, client)
+    assert got == status and headers["content-type"] == "application/json" and b'"error"' in body
+
+
+def test_cancelled_caller_does_not_fail_shared_render(templates):
+    async def client(service, host, port):
+        first = asyncio.ensure_future(service.render("qa", {"version": "9.9"}))
+        second = asyncio.ensure_future(service.render("qa", {"version": "9.9"}))
+        await asyncio.sleep(0)
+        first.cancel()
+        data, _, cached = await second
+        return first.cancelled(), data, cached, service.renders
+
+    cancelled, data, cached, renders = _serve(templates, client)
+    assert cancelled and data.startswith(b"PK") and not cached and renders == 1
@@ -0,0 +1,59 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+import generate_docx
+import render_all
+
+
+@pytest.fixture
+def reloaded(monkeypatch):
+    """The modules reload_changed() re-imports, without re-importing them."""
+    modules = []
+    monkeypatch.setattr(importlib, "reload", lambda module: modules.append(module.__name__) or module)
+    return modules
+
+
+def _path(name, directory=render_all.HERE):
+    return os.path.join(directory, name)
+
+
+def _stem(output):
+    return os.path.splitext(output)[0]
+
+
+def test_markdown_edit_rebuilds_that_document(reloaded):
+    assert render_all.reload_changed([_path("PROJECT-PLAN.md")]) == {"PROJECT-PLAN"}
+    assert reloaded == []
+
+
+def test_generator_markdown_twin_rebuilds_nothing(reloaded):
+    assert render_all.reload_changed([_path(_stem(generate_docx.OUTPUT) + ".md")]) == set()
+
+
+def test_generator_edit_rebuilds_its_document(reloaded):
+    names = render_all.reload_changed([_path("generate_docx.py"), _path("RESEARCH.md")])
+    assert names == {_stem(generate_docx.OUTPUT), "RESEARCH"}
+    assert reloaded == ["generate_docx"]
+
+
+def test_compiler_edit_rebuilds_every_markdown_document(reloaded):
+    names = render_all.reload_changed([_path("md_to_docx.py")])
+    generated = {_stem(g.OUTPUT) for g in render_all.GENERATORS}
+    assert names == {name for name, _ in render_all.deliverables()} - generated
+    assert reloaded == ["md_to_docx"]
+
+
+def test_package_edit_rebuilds_everything(reloaded):
+    assert render_all.reload_changed([_path("helpers.py", render_all.PACKAGE_DIR)]) is None
+    package = [f"docx_render.{m}" for m in render_all.PACKAGE_MODULES if f"docx_render.{m}" in sys.modules]
+    assert reloaded[:len(package)] == package and "docx_render.section_cache" in package
+    assert reloaded[-3:] == ["md_to_docx", "generate_docx", "generate_qa_docx"]
+
+
+def test_package_edit_skips_modules_not_imported(reloaded, monkeypatch):
+    monkeypatch.delitem(sys.modules, "docx_render.service", raising=False)
+    assert render_all.reload_changed([_path("service.py", render_all.PACKAGE_DIR)]) is None
+    assert "docx_render.service" not in reloaded